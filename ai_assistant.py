@@ -3,10 +3,23 @@ AI Assistant Module
 Integrates Google Gemini for comprehensive chemistry and materials science answers.
 """
 
+import asyncio
 import os
-import re
-from google import genai
-from knowledge_base import textbook_kb
+import threading
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+from http_client import RETRY_STATUSES, get_http_service
+from prompts import (CALCULATION_EXPLANATION, CONTEXT_SECTION, HISTORY_SECTION, OUTLINE_SECTION,
+                     QUESTION_SECTION, SUMMARY_SECTION, SYSTEM_PROMPT)
+from request_executor import current_request
+from response_cache import get_response_cache, response_key
+from retrieval import estimate_tokens, pack_passages
+from session_store import Session
+from single_flight import SingleFlight
+
+# Gemini only caches prompts of at least this many tokens (2.5 Flash)
+CONTEXT_CACHE_MIN_TOKENS = 1024
 
 
 class AIAssistant:
@@ -14,25 +27,73 @@ class AIAssistant:
     
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
+        # Pooled connections, retries and circuit breaker for Gemini
+        self.http = get_http_service("gemini")
         if self.api_key:
-            self.client = genai.Client(api_key=self.api_key)
+            # The Gemini SDK is slow to import, so only load it when it is used
+            from google import genai
+            self.client = genai.Client(api_key=self.api_key, http_options=self.http_options())
             self.model = 'gemini-2.5-flash'  # Fast and efficient!
         else:
             self.client = None
             self.model = None
+        # Approximate tokens of textbook text included in each prompt
+        self.context_token_budget = int(os.getenv("CONTEXT_TOKEN_BUDGET", 600))
+        # Provider-side cache of the system prompt (off unless enabled)
+        self.context_cache_enabled = os.getenv("GEMINI_CONTEXT_CACHE", "False") == "True"
+        self.context_cache_ttl = float(os.getenv("GEMINI_CONTEXT_CACHE_TTL", 3600))
+        self._cache_name: Optional[str] = None
+        self._cache_renew_at = 0.0
+        self._cache_lock = threading.Lock()
+        self._system_config = None
+        # Identical prompts sent at the same moment share one Gemini call
+        self._flights = SingleFlight()
+        self._usage = {'requests': 0, 'prompt_tokens': 0, 'cached_tokens': 0}
+        self._usage_lock = threading.Lock()
         
+    def http_options(self):
+        """
+        SDK HTTP options from the shared Gemini HTTP service: its pooled
+        keep-alive client (shared by all worker threads), timeout and
+        jittered retries.
+        """
+        from google.genai import types
+        return types.HttpOptions(
+            httpx_client=self.http.client,
+            async_client_args=self.http.client_args(),
+            timeout=int(self.http.timeout * 1000),
+            retry_options=types.HttpRetryOptions(
+                attempts=self.http.retries + 1,
+                initial_delay=self.http.backoff,
+                max_delay=self.http.backoff_cap,
+                jitter=1.0,
+                http_status_codes=sorted(RETRY_STATUSES),
+            ),
+        )
+    
+    async def aclose(self):
+        """Close the SDK's async connections (the sync pool is the shared HTTP service's)."""
+        if self.client is not None:
+            await self.client.aio.aclose()
+
     def is_available(self) -> bool:
         """Check if AI assistant is available."""
         return self.client is not None and self.model is not None
     
     def get_relevant_context(self, query: str) -> str:
         """Get relevant context from textbook and chemistry knowledge."""
+        from knowledge_base import get_knowledge_library
+        
         context_parts = []
         
-        # Search textbook for relevant information
-        textbook_result = textbook_kb.smart_search(query)
-        if textbook_result:
-            context_parts.append(f"=== Materials Science Textbook ===\n{textbook_result[:2000]}")
+        # Pack the best passages from keyword and vector search into the
+        # context token budget, naming documents other than the textbook
+        library = get_knowledge_library()
+        passages = library.label_documents(library.hybrid_search(query, top_k=8))
+        packed = pack_passages(passages, self.context_token_budget)
+        if packed:
+            textbook_result = "\n\n".join(packed)
+            context_parts.append(f"=== Materials Science Textbook ===\n{textbook_result}")
         
         # Add chemistry context hints based on keywords
         query_lower = query.lower()
@@ -59,97 +120,545 @@ Format: calc: type | param=value | param2=value""")
         
         return "\n\n".join(context_parts) if context_parts else ""
     
-    def generate_response(self, user_message: str, conversation_history: list = None) -> str:
-        """Generate AI response with context from textbook and chemistry knowledge."""
+    @staticmethod
+    def history_messages(user_message: str, conversation_history=None) -> list:
+        """
+        The earlier messages included in the prompt, already cleaned and
+        compacted: a Session's messages, or a client-sent history list
+        turned into a throwaway session.
+        """
+        if isinstance(conversation_history, Session):
+            return conversation_history.messages()
+        if conversation_history:
+            return Session.from_history(conversation_history, user_message).messages()
+        return []
+    
+    def build_prompt(self, user_message: str, conversation_history: list = None, context: str = None) -> str:
+        """
+        Build the per-request prompt: retrieved context, history and question.
+        
+        The fixed SYSTEM_PROMPT is not part of it; it goes to Gemini as the
+        system instruction (see generation_config()).
+        """
+        # Get relevant context
+        if context is None:
+            context = self.get_relevant_context(user_message)
+        
+        sections = []
+        if context:
+            sections.append(CONTEXT_SECTION.render(context=context))
+        
+        # Conversation history is bounded: a summary of older turns plus
+        # the last few messages
+        history = self.history_messages(user_message, conversation_history)
+        if history and history[0]['role'] == 'summary':
+            sections.append(SUMMARY_SECTION.render(summary=history[0]['content']))
+            history = history[1:]
+        if history:
+            sections.append(HISTORY_SECTION.render(history="\n".join(
+                f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}" for msg in history
+            )))
+        
+        sections.append(QUESTION_SECTION.render(question=user_message))
+        return "".join(sections)
+    
+    def generation_config(self):
+        """
+        Gemini request config carrying the system prompt: a reference to the
+        provider-side cache when context caching is on and available,
+        otherwise the system instruction itself (built once and reused).
+        """
+        cache_name = self._system_prompt_cache()
+        if cache_name:
+            from google.genai import types
+            return types.GenerateContentConfig(cached_content=cache_name)
+        if self._system_config is None:
+            from google.genai import types
+            self._system_config = types.GenerateContentConfig(system_instruction=SYSTEM_PROMPT)
+        return self._system_config
+    
+    def cached_system_prompt(self) -> str:
+        """
+        The system prompt stored in the context cache: SYSTEM_PROMPT plus
+        the textbook outline. The outline never changes, so once cached it
+        costs little per request, and it lifts the prompt past Gemini's
+        caching minimum, which SYSTEM_PROMPT alone is well under.
+        """
+        from knowledge_base import get_textbook_kb
+        outline = get_textbook_kb().toc.outline()
+        return SYSTEM_PROMPT + OUTLINE_SECTION.render(outline=outline) if outline else SYSTEM_PROMPT
+
+    def _system_prompt_cache(self) -> Optional[str]:
+        """Name of the cached system prompt, created or renewed when needed."""
+        if not self.context_cache_enabled:
+            return None
+        now = time.monotonic()
+        if self._cache_name and now < self._cache_renew_at:
+            return self._cache_name
+        with self._cache_lock:
+            if self._cache_name and now < self._cache_renew_at:
+                return self._cache_name
+            system_prompt = self.cached_system_prompt()
+            if estimate_tokens(system_prompt) < CONTEXT_CACHE_MIN_TOKENS:
+                print(f"⚠️ System prompt is below Gemini's {CONTEXT_CACHE_MIN_TOKENS}-token caching minimum "
+                      "(is the textbook loaded?); sending it as a system instruction")
+                self.context_cache_enabled = False
+                return None
+            try:
+                from google.genai import types
+                cache = self.client.caches.create(
+                    model=self.model,
+                    config=types.CreateCachedContentConfig(
+                        display_name="chemistry-chatbot-system-prompt",
+                        system_instruction=system_prompt,
+                        ttl=f"{int(self.context_cache_ttl)}s",
+                    ),
+                )
+            except Exception as e:
+                print(f"⚠️ Could not cache the system prompt, sending it inline: {e}")
+                self.context_cache_enabled = False
+                return None
+            self._cache_name = cache.name
+            # Renew a little before Gemini expires it
+            self._cache_renew_at = now + self.context_cache_ttl * 0.9
+            return self._cache_name
+    
+    def _forget_system_prompt_cache(self):
+        """Drop a cache Gemini no longer knows; the next request recreates it."""
+        with self._cache_lock:
+            self._cache_name = None
+    
+    def _generate(self, contents: str, system_prompt: bool = True, config=None):
+        """
+        generate_content() with the system prompt config. A call for the
+        same prompt already in flight (a class asking the same question at
+        once) is shared instead of repeated.
+        """
+        return self._flights.do((system_prompt, contents), self._generate_once, contents, system_prompt, config)
+    
+    def _generate_once(self, contents: str, system_prompt: bool = True, config=None):
+        """generate_content() with the system prompt config, retrying once without a lost cache."""
+        if system_prompt and config is None:
+            config = self.generation_config()
+        generate = self.client.models.generate_content
+        try:
+            response = self.http.call(generate, model=self.model, contents=contents, config=config)
+        except Exception:
+            if not (config and config.cached_content):
+                raise
+            self._forget_system_prompt_cache()
+            response = self.http.call(generate, model=self.model, contents=contents, config=self.generation_config())
+        self._record_usage(response)
+        return response
+    
+    def _open_stream(self, contents: str, config):
+        """Start a response stream; returns it with its first chunk (errors surface here)."""
+        stream = iter(self.client.models.generate_content_stream(model=self.model, contents=contents, config=config))
+        return stream, next(stream, None)
+    
+    async def _open_stream_async(self, contents: str, config):
+        """_open_stream() on the SDK's async client."""
+        stream = await self.client.aio.models.generate_content_stream(model=self.model, contents=contents, config=config)
+        return stream, await anext(stream, None)
+    
+    def _generate_stream(self, contents: str, config=None) -> Iterator:
+        """generate_content_stream() with the system prompt config, like _generate()."""
+        if config is None:
+            config = self.generation_config()
+        try:
+            stream, first = self.http.call(self._open_stream, contents, config)
+        except Exception:
+            if not config.cached_content:
+                raise
+            self._forget_system_prompt_cache()
+            stream, first = self.http.call(self._open_stream, contents, self.generation_config())
+        if first is None:
+            return
+        # Usage is complete on the last chunk
+        last = first
+        yield first
+        for chunk in stream:
+            last = chunk
+            yield chunk
+        self._record_usage(last)
+    
+    def _stream_text(self, contents: str, config=None) -> Iterator[str]:
+        """
+        Text pieces of a streamed answer. While the same prompt is already
+        streaming, this caller waits for that answer and gets it whole.
+        """
+        key = ("stream", contents)
+        future, leader = self._flights.begin(key)
+        if not leader:
+            text = future.result()
+            if text:
+                yield text
+            return
+        pieces, complete, error = [], False, None
+        try:
+            for chunk in self._generate_stream(contents, config):
+                if chunk.text:
+                    pieces.append(chunk.text)
+                    yield chunk.text
+            complete = True
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # An abandoned stream (client gone) shares nothing
+            self._flights.end(key, future, "".join(pieces) if complete and pieces else None, error)
+    
+    async def _stream_text_async(self, contents: str, config=None) -> AsyncIterator[str]:
+        """_stream_text() on the SDK's async client."""
+        key = ("stream", contents)
+        future, leader = self._flights.begin(key)
+        if not leader:
+            text = await asyncio.wrap_future(future)
+            if text:
+                yield text
+            return
+        pieces, complete, error = [], False, None
+        try:
+            async for chunk in self._generate_stream_async(contents, config=config):
+                if chunk.text:
+                    pieces.append(chunk.text)
+                    yield chunk.text
+            complete = True
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._flights.end(key, future, "".join(pieces) if complete and pieces else None, error)
+    
+    async def _generation_config_async(self):
+        """generation_config() without blocking the event loop while the system prompt cache is created."""
+        if self.context_cache_enabled:
+            return await asyncio.to_thread(self.generation_config)
+        return self.generation_config()
+    
+    async def _generate_async(self, contents: str, system_prompt: bool = True, config=None):
+        """_generate() on the SDK's async client, sharing in-flight calls with both serving modes."""
+        return await self._flights.do_async(
+            (system_prompt, contents), self._generate_once_async, contents, system_prompt, config
+        )
+    
+    async def _generate_once_async(self, contents: str, system_prompt: bool = True, config=None):
+        """_generate_once() on the SDK's async client."""
+        if system_prompt and config is None:
+            config = await self._generation_config_async()
+        generate = self.client.aio.models.generate_content
+        try:
+            response = await self.http.call_async(generate, model=self.model, contents=contents, config=config)
+        except Exception:
+            if not (config and config.cached_content):
+                raise
+            self._forget_system_prompt_cache()
+            response = await self.http.call_async(
+                generate, model=self.model, contents=contents, config=await self._generation_config_async()
+            )
+        self._record_usage(response)
+        return response
+    
+    async def _generate_stream_async(self, contents: str, config=None) -> AsyncIterator:
+        """_generate_stream() on the SDK's async client."""
+        if config is None:
+            config = await self._generation_config_async()
+        try:
+            stream, first = await self.http.call_async(self._open_stream_async, contents, config)
+        except Exception:
+            if not config.cached_content:
+                raise
+            self._forget_system_prompt_cache()
+            stream, first = await self.http.call_async(
+                self._open_stream_async, contents, await self._generation_config_async()
+            )
+        if first is None:
+            return
+        last = first
+        yield first
+        async for chunk in stream:
+            last = chunk
+            yield chunk
+        self._record_usage(last)
+    
+    def _record_usage(self, response):
+        """Add a response's prompt and cached token counts to usage_stats()."""
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is None:
+            return
+        with self._usage_lock:
+            self._usage['requests'] += 1
+            self._usage['prompt_tokens'] += usage.prompt_token_count or 0
+            self._usage['cached_tokens'] += usage.cached_content_token_count or 0
+    
+    def usage_stats(self) -> dict:
+        """Prompt tokens sent to Gemini and how many of them were served from a cache."""
+        with self._usage_lock:
+            usage = dict(self._usage)
+        usage['cached_ratio'] = round(usage['cached_tokens'] / usage['prompt_tokens'], 4) if usage['prompt_tokens'] else 0.0
+        usage['context_cache'] = self._cache_name if self.context_cache_enabled else None
+        usage['coalesced'] = self._flights.stats()['shared']
+        return usage
+    
+    def cache_key(self, user_message: str, conversation_history: list, context: str) -> str:
+        """Response cache key for a question asked with this context and history."""
+        return response_key(user_message, context, self.history_messages(user_message, conversation_history))
+    
+    def semantic_cache(self, user_message: str, conversation_history=None):
+        """
+        The paraphrase cache, or None when the answer depends on earlier
+        messages (follow-ups like "why?" must not match each other).
+        """
+        if self.history_messages(user_message, conversation_history):
+            return None
+        from semantic_cache import get_semantic_cache
+        return get_semantic_cache()
+    
+    def generate_response(self, user_message: str, conversation_history: list = None,
+                          use_cache: bool = True) -> str:
+        """
+        Generate AI response with context from textbook and chemistry knowledge.
+        
+        Answers are reused for the same question, context and history, and
+        for close paraphrases of earlier questions asked without history,
+        unless use_cache is False.
+        """
         if not self.is_available():
             return None  # Fall back to basic responses
         
         try:
-            # Get relevant context
-            context = self.get_relevant_context(user_message)
+            executor = current_request()
+            semantic_cache = self.semantic_cache(user_message, conversation_history) if use_cache else None
+            if semantic_cache:
+                cached = executor.run("semantic_cache", semantic_cache.lookup, user_message)
+                if cached is not None:
+                    return cached
             
-            # Build system prompt
-            system_prompt = """You are Chemistry Chatbot RGB 🧪, an expert chemistry and materials science assistant.
-
-You have access to:
-1. A comprehensive Materials Science & Engineering textbook (Callister 8th Edition)
-2. Chemistry databases for elements and compounds
-3. Advanced calculators for stoichiometry, solutions, pH, gas laws, etc.
-
-Your role:
-- Provide clear, accurate, and COMPLETE answers to chemistry and materials science questions
-- Use the textbook context when available to give detailed explanations
-- Explain concepts in an educational and encouraging way
-- When appropriate, suggest using the chatbot's built-in tools (element:, compound:, mass:, calc:)
-- Use emojis to make learning engaging
-- If calculations are needed, show the setup and guide users to use the calc: commands
-- Keep responses concise but complete (3-5 sentences for simple questions, more for complex ones)
-- Remember previous messages in the conversation and provide contextual responses
-
-Always be accurate and educational."""
-
-            # Add context if available
-            if context:
-                system_prompt += f"\n\n=== AVAILABLE CONTEXT ===\n{context}"
+            # Retrieval runs while the request config (and the system prompt
+            # cache, when due) is prepared
+            retrieval = executor.submit("retrieval", self.get_relevant_context, user_message)
+            config = self.generation_config()
+            context = executor.wait(retrieval, "", "retrieval")
+            key = self.cache_key(user_message, conversation_history, context) if use_cache else None
+            if key:
+                cached = get_response_cache().get(key)
+                if cached is not None:
+                    return cached
             
-            # Build conversation context with history
-            conversation_text = f"{system_prompt}\n\n"
+            conversation_text = self.build_prompt(user_message, conversation_history, context)
             
-            # Add conversation history if available
-            if conversation_history and len(conversation_history) > 1:
-                conversation_text += "=== Conversation History ===\n"
-                # Include last few exchanges for context (skip the current message)
-                for msg in conversation_history[-6:-1]:  # Last 3 exchanges
-                    role = msg.get('role', 'user')
-                    content = msg.get('content', '')
-                    if role == 'user':
-                        conversation_text += f"User: {content}\n"
-                    else:
-                        # Strip HTML tags for cleaner context
-                        clean_content = re.sub('<[^<]+?>', '', content)
-                        conversation_text += f"Assistant: {clean_content}\n"
-                conversation_text += "\n"
-            
-            # Add current question
-            conversation_text += f"=== Current Question ===\nUser: {user_message}\n\nProvide a complete, helpful answer:"
-            
-            # Generate response
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=conversation_text
+            # Generate response; past the request deadline, fall back to basic responses
+            response = executor.wait(
+                executor.submit("gemini", self._generate, conversation_text, True, config), name="gemini"
             )
+            if response is None:
+                return None
             
+            if key and response.text:
+                get_response_cache().put(key, response.text)
+                if semantic_cache:
+                    semantic_cache.add(user_message, response.text)
             return response.text
             
         except Exception as e:
             print(f"AI Error: {e}")
             return None  # Fall back to basic responses
     
+    def generate_response_stream(self, user_message: str, conversation_history: list = None,
+                                 use_cache: bool = True) -> Iterator[str]:
+        """
+        Generate an AI response piece by piece as Gemini produces it.
+        
+        Yields nothing when the AI is unavailable, fails or misses the
+        request deadline before the first piece, so callers can fall back to
+        basic responses. A cached answer is yielded whole; complete streamed
+        answers are added to the cache.
+        """
+        if not self.is_available():
+            return
+        
+        try:
+            executor = current_request()
+            semantic_cache = self.semantic_cache(user_message, conversation_history) if use_cache else None
+            if semantic_cache:
+                cached = executor.run("semantic_cache", semantic_cache.lookup, user_message)
+                if cached is not None:
+                    yield cached
+                    return
+            
+            retrieval = executor.submit("retrieval", self.get_relevant_context, user_message)
+            config = self.generation_config()
+            context = executor.wait(retrieval, "", "retrieval")
+            key = self.cache_key(user_message, conversation_history, context) if use_cache else None
+            if key:
+                cached = get_response_cache().get(key)
+                if cached is not None:
+                    yield cached
+                    return
+            
+            conversation_text = self.build_prompt(user_message, conversation_history, context)
+            # The first piece must arrive within the deadline; after that the
+            # client sees the answer coming
+            stream = self._stream_text(conversation_text, config)
+            first = executor.wait(executor.submit("gemini", next, stream, None), name="gemini")
+            if first is None:
+                return
+            pieces = [first]
+            yield first
+            for piece in stream:
+                pieces.append(piece)
+                yield piece
+            
+            if key and pieces:
+                get_response_cache().put(key, "".join(pieces))
+                if semantic_cache:
+                    semantic_cache.add(user_message, "".join(pieces))
+        
+        except Exception as e:
+            print(f"AI Stream Error: {e}")
+    
+    async def _prepare_async(self, user_message: str, conversation_history, use_cache: bool):
+        """
+        Everything generate_response_async() needs before calling Gemini.
+        
+        Retrieval runs in a worker thread while the paraphrase cache is
+        checked and the request config is built. Returns (cached answer,
+        response cache key, prompt, config, paraphrase cache); the key,
+        prompt and config are None when a cached answer was found.
+        """
+        executor = current_request()
+        context_task = asyncio.ensure_future(executor.run_async(
+            "retrieval", asyncio.to_thread(self.get_relevant_context, user_message), ""
+        ))
+        semantic_cache = self.semantic_cache(user_message, conversation_history) if use_cache else None
+        if semantic_cache:
+            cached = executor.run("semantic_cache", semantic_cache.lookup, user_message)
+            if cached is not None:
+                context_task.cancel()
+                return cached, None, None, None, semantic_cache
+        context, config = await asyncio.gather(context_task, self._generation_config_async())
+        key = self.cache_key(user_message, conversation_history, context) if use_cache else None
+        if key:
+            cached = get_response_cache().get(key)
+            if cached is not None:
+                return cached, None, None, None, semantic_cache
+        return None, key, self.build_prompt(user_message, conversation_history, context), config, semantic_cache
+    
+    async def generate_response_async(self, user_message: str, conversation_history: list = None,
+                                      use_cache: bool = True) -> str:
+        """generate_response() for the async serving mode; awaits Gemini instead of blocking a thread."""
+        if not self.is_available():
+            return None
+        
+        try:
+            cached, key, conversation_text, config, semantic_cache = await self._prepare_async(
+                user_message, conversation_history, use_cache
+            )
+            if cached is not None:
+                return cached
+            
+            # Past the request deadline, fall back to basic responses
+            response = await current_request().run_async(
+                "gemini", self._generate_async(conversation_text, config=config)
+            )
+            if response is None:
+                return None
+            
+            if key and response.text:
+                get_response_cache().put(key, response.text)
+                if semantic_cache:
+                    semantic_cache.add(user_message, response.text)
+            return response.text
+        
+        except Exception as e:
+            print(f"AI Error: {e}")
+            return None
+    
+    async def generate_response_stream_async(self, user_message: str, conversation_history: list = None,
+                                             use_cache: bool = True) -> AsyncIterator[str]:
+        """generate_response_stream() for the async serving mode."""
+        if not self.is_available():
+            return
+        
+        try:
+            cached, key, conversation_text, config, semantic_cache = await self._prepare_async(
+                user_message, conversation_history, use_cache
+            )
+            if cached is not None:
+                yield cached
+                return
+            
+            stream = self._stream_text_async(conversation_text, config)
+            first = await current_request().run_async("gemini", anext(stream, None))
+            if first is None:
+                return
+            pieces = [first]
+            yield first
+            async for piece in stream:
+                pieces.append(piece)
+                yield piece
+            
+            if key and pieces:
+                get_response_cache().put(key, "".join(pieces))
+                if semantic_cache:
+                    semantic_cache.add(user_message, "".join(pieces))
+        
+        except Exception as e:
+            print(f"AI Stream Error: {e}")
+    
     def generate_calculation_explanation(self, calc_type: str, result: dict) -> str:
         """Generate a natural language explanation of calculation results."""
         if not self.is_available():
             return None
         
         try:
-            prompt = f"""Explain this chemistry calculation result in 2-3 sentences.
-Be educational and encouraging. Use emojis.
-
-Calculation Type: {calc_type}
-Result: {result}
-
-Provide a brief, friendly explanation of what this result means."""
-
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt
-            )
+            prompt = CALCULATION_EXPLANATION.render(calc_type=calc_type, result=str(result))
+            response = self._generate(prompt, system_prompt=False)
             
             return response.text
             
         except Exception as e:
             print(f"AI Explanation Error: {e}")
             return None
+    
+    async def generate_calculation_explanation_async(self, calc_type: str, result: dict) -> str:
+        """generate_calculation_explanation() for the async serving mode."""
+        if not self.is_available():
+            return None
+        
+        try:
+            prompt = CALCULATION_EXPLANATION.render(calc_type=calc_type, result=str(result))
+            response = await self._generate_async(prompt, system_prompt=False)
+            return response.text
+        
+        except Exception as e:
+            print(f"AI Explanation Error: {e}")
+            return None
+
+
+# Shared instance, created on first use
+_ai_assistant = None
+_ai_assistant_lock = threading.Lock()
+
+
+def get_ai_assistant() -> AIAssistant:
+    """Return the shared AI assistant, connecting to Gemini on first call."""
+    global _ai_assistant
+    if _ai_assistant is None:
+        with _ai_assistant_lock:
+            if _ai_assistant is None:
+                _ai_assistant = AIAssistant()
+    return _ai_assistant
+
+
+async def close_ai_assistant_async():
+    """Close the shared assistant's async connections, if it was ever created."""
+    if _ai_assistant is not None:
+        await _ai_assistant.aclose()
 
 
-# Global instance
-ai_assistant = AIAssistant()
+def __getattr__(name):
+    # Keeps `from ai_assistant import ai_assistant` working
+    if name == "ai_assistant":
+        return get_ai_assistant()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
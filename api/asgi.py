@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Add parent directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the ASGI app (async chat, compound and explanation endpoints) from asgi_app.py
+from asgi_app import app
@@ -0,0 +1,268 @@
+"""
+ASGI Application
+Async serving mode. The chat, streaming chat, compound and explanation
+endpoints await their PubChem and Gemini calls on the event loop instead of
+holding a worker thread for seconds, so one process keeps hundreds of chats
+in flight. Local work (textbook search, calculators, element lookups) runs
+in worker threads, and every other route is served by the Flask app.
+
+Serve with any ASGI server, e.g. `uvicorn api.asgi:app`.
+"""
+
+import asyncio
+import json
+import re
+from typing import Optional
+
+from asgiref.wsgi import WsgiToAsgi
+
+import main
+from background_tasks import get_task_store
+from command_router import PrefixTrie
+from compound_cache import get_compound_cache
+from compound_db import get_compound_db
+from http_client import get_http_service
+from request_executor import current_request, request_scope
+
+# ──────────────────────────────────────────────
+# Outbound Calls
+# ──────────────────────────────────────────────
+
+async def fetch_compound_from_pubchem(compound_name: str) -> Optional[dict]:
+    """Async twin of main.fetch_compound_from_pubchem, on the service's async connection pool."""
+    response = await get_http_service("pubchem").get_async(main.pubchem_properties_url(compound_name))
+    return main.pubchem_record(response, compound_name)
+
+
+async def get_compound_info(compound_name: str) -> Optional[dict]:
+    """Async twin of main.get_compound_info."""
+    try:
+        info = get_compound_db().lookup(compound_name)
+        if info:
+            return info
+        return await get_compound_cache().get_async(compound_name, fetch_compound_from_pubchem)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def get_chat_response(user_message, conversation_history=None, use_cache=True):
+    """Async twin of main.get_chat_response."""
+    ai_assistant = main.get_ai_assistant()
+    if ai_assistant.is_available():
+        ai_response = await ai_assistant.generate_response_async(user_message, conversation_history, use_cache)
+        if ai_response:
+            return ai_response
+    return await asyncio.to_thread(main.get_fallback_response, user_message)
+
+# ──────────────────────────────────────────────
+# Chat Commands
+# ──────────────────────────────────────────────
+# Commands that wait on the network have async handlers here; the rest use
+# the handlers registered in main.py, run in a worker thread.
+
+ASYNC_COMMANDS = PrefixTrie()
+
+
+def async_command(prefix):
+    """Register an async chat command handler for messages starting with prefix."""
+    def register(handler):
+        ASYNC_COMMANDS.add(prefix, handler)
+        return handler
+    return register
+
+
+@async_command("compound:")
+async def compound_command(query, user_message, async_explanation):
+    info = await current_request().run_async("compound_lookup", get_compound_info(query))
+    if info and "error" not in info:
+        response = main.format_compound(info)
+    else:
+        response = await get_chat_response(user_message)
+    return {"response": response}
+
+
+@async_command("calc:")
+async def calc_command(query, user_message, async_explanation):
+    extra = {}
+    try:
+        calc_type, result = main.run_calc_command(query)
+        if "error" in result:
+            response = f"❌ <b>Calculation Error:</b> {result['error']}"
+        else:
+            response = f"🧮 <b>Calculation Result:</b><br><pre>{main.format_calc_result(result)}</pre>"
+            ai_assistant = main.get_ai_assistant()
+            if async_explanation:
+                if ai_assistant.is_available():
+                    extra["explanation_id"] = get_task_store().start(
+                        ai_assistant.generate_calculation_explanation_async(calc_type, result)
+                    )
+            else:
+                # One that misses the request deadline is handed to the task store
+                explanation = asyncio.ensure_future(
+                    ai_assistant.generate_calculation_explanation_async(calc_type, result)
+                )
+                ai_explanation = await current_request().run_async("explanation", asyncio.shield(explanation))
+                if ai_explanation:
+                    response += f"<br><br>💡 {ai_explanation}"
+                elif not explanation.done():
+                    extra["explanation_id"] = get_task_store().start(explanation)
+    except Exception as e:
+        response = main.calc_usage_error(e)
+    return {"response": response, **extra}
+
+
+async def handle_message(user_message, conversation_history, async_explanation=False, use_cache=True):
+    """Async twin of main.handle_message."""
+    if not user_message:
+        return {"response": "Please enter a message! 🧪"}
+
+    # Worker threads inherit the request scope, so handlers from main.py
+    # record their steps here too
+    with request_scope() as executor:
+        match = ASYNC_COMMANDS.match(user_message) or main.COMMANDS.match(user_message)
+        if match:
+            prefix, handler = match
+            query = user_message[len(prefix):].strip()
+            if asyncio.iscoroutinefunction(handler):
+                payload = await handler(query, user_message, async_explanation)
+            else:
+                payload = await asyncio.to_thread(handler, query, user_message, async_explanation)
+        else:
+            payload = {"response": await get_chat_response(user_message, conversation_history, use_cache)}
+    payload["timings"] = executor.timings()
+    return payload
+
+# ──────────────────────────────────────────────
+# Routes
+# ──────────────────────────────────────────────
+
+async def chat(scope, receive, send):
+    """POST /chat, as in main.chat()."""
+    data = await read_json(receive)
+    user_message = data.get("message", "").strip()
+    session = main.load_session(data, user_message)
+    payload = await handle_message(
+        user_message,
+        session,
+        data.get("async_explanation", main.ASYNC_CALC_EXPLANATIONS),
+        data.get("use_cache", True),
+    )
+    await send_json(send, main.record_exchange(session, user_message, payload))
+
+
+async def chat_stream(scope, receive, send):
+    """POST /chat/stream, as in main.chat_stream()."""
+    data = await read_json(receive)
+    user_message = data.get("message", "").strip()
+    session = main.load_session(data, user_message)
+    async_explanation = data.get("async_explanation", main.ASYNC_CALC_EXPLANATIONS)
+    use_cache = data.get("use_cache", True)
+    ai_assistant = main.get_ai_assistant()
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream; charset=utf-8"),
+                    (b"cache-control", b"no-cache"), (b"x-accel-buffering", b"no")],
+    })
+    is_command = main.COMMANDS.match(user_message) is not None
+    if user_message and not is_command and ai_assistant.is_available():
+        with request_scope() as executor:
+            text = ""
+            async for piece in ai_assistant.generate_response_stream_async(user_message, session, use_cache):
+                text += piece
+                await send_body(send, main.sse_event("token", {"text": piece}), more=True)
+            payload = {"response": text or await asyncio.to_thread(main.get_fallback_response, user_message)}
+        payload["timings"] = executor.timings()
+    else:
+        payload = await handle_message(user_message, session, async_explanation, use_cache)
+    task_id = payload.pop("explanation_id", None)
+    await send_body(send, main.sse_event("done", main.record_exchange(session, user_message, payload)),
+                    more=task_id is not None)
+    if task_id:
+        task = await get_task_store().wait_async(task_id, main.STREAM_EXPLANATION_WAIT)
+        await send_body(send, main.sse_event("explanation", main.explanation_payload(task)))
+
+
+async def compound(scope, receive, send, name):
+    """GET /compound/<name>, as in main.compound()."""
+    info = await get_compound_info(name)
+    if info:
+        await send_json(send, info)
+    else:
+        await send_json(send, {"error": "Compound not found"}, status=404)
+
+
+async def explanation(scope, receive, send, task_id):
+    """GET /explanation/<task_id>, as in main.explanation()."""
+    payload = main.explanation_payload(get_task_store().status(task_id))
+    await send_json(send, payload, status=404 if payload["status"] == "unknown" else 200)
+
+
+# (method, path pattern, handler); path groups are passed to the handler
+ROUTES = [
+    ("POST", re.compile(r"^/chat$"), chat),
+    ("POST", re.compile(r"^/chat/stream$"), chat_stream),
+    ("GET", re.compile(r"^/compound/([^/]+)$"), compound),
+    ("GET", re.compile(r"^/explanation/([^/]+)$"), explanation),
+]
+
+# ──────────────────────────────────────────────
+# ASGI Plumbing
+# ──────────────────────────────────────────────
+
+async def read_json(receive) -> dict:
+    """Read the whole request body as JSON (an empty object if there is none)."""
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    return json.loads(body) if body else {}
+
+
+async def send_body(send, text: str, more: bool = False):
+    """Send (part of) the response body."""
+    await send({"type": "http.response.body", "body": text.encode("utf-8"), "more_body": more})
+
+
+async def send_json(send, payload: dict, status: int = 200):
+    """Send a complete JSON response."""
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def lifespan(receive, send):
+    """Handle server startup and shutdown; closes pooled connections on shutdown."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            from ai_assistant import close_ai_assistant_async
+            await get_http_service("pubchem").aclose()
+            await close_ai_assistant_async()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+# Every route without an async handler, served by Flask in a worker thread
+flask_app = WsgiToAsgi(main.app)
+
+
+async def app(scope, receive, send):
+    """The ASGI application."""
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] == "http":
+        for method, pattern, handler in ROUTES:
+            match = pattern.match(scope["path"])
+            if match and scope["method"] == method:
+                return await handler(scope, receive, send, *match.groups())
+    return await flask_app(scope, receive, send)
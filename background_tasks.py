@@ -0,0 +1,117 @@
+"""
+Background Tasks Module
+Runs slow work (like AI explanations) off the request thread and keeps the
+results for a while so the client can fetch them with a follow-up request,
+or so a response still streaming can wait for them and send them on.
+"""
+
+import asyncio
+import os
+import threading
+import uuid
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional
+
+from memory_cache import LRUCache
+
+
+class TaskStore:
+    """Thread pool (or event loop) plus a bounded, expiring table of task results keyed by id."""
+
+    def __init__(self, max_workers: int = 4, ttl: float = 600, maxsize: int = 2048):
+        """
+        Args:
+            max_workers: Threads running tasks
+            ttl: Seconds a task and its result stay retrievable
+            maxsize: Maximum number of tasks remembered
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self.tasks = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> str:
+        """Start fn(*args, **kwargs) in the background and return its task id."""
+        task_id = uuid.uuid4().hex
+        self.tasks.set(task_id, self.executor.submit(fn, *args, **kwargs))
+        return task_id
+
+    def start(self, coroutine: Awaitable) -> str:
+        """
+        Run a coroutine as a task on the running event loop and return its
+        task id (the async serving mode's submit()).
+        """
+        task_id = uuid.uuid4().hex
+        self.tasks.set(task_id, asyncio.ensure_future(coroutine))
+        return task_id
+
+    def track(self, future: Future) -> str:
+        """Make work already running elsewhere retrievable by task id."""
+        task_id = uuid.uuid4().hex
+        self.tasks.set(task_id, future)
+        return task_id
+
+    def status(self, task_id: str) -> dict:
+        """
+        Look up a task.
+
+        Returns:
+            {"status": "pending"}, {"status": "done", "result": ...},
+            {"status": "error", "error": message} or {"status": "unknown"}
+            for ids that never existed or have expired
+        """
+        future: Optional[Future] = self.tasks.get(task_id)
+        if future is None:
+            return {"status": "unknown"}
+        return self._describe(future)
+
+    def wait(self, task_id: str, timeout: Optional[float] = None) -> dict:
+        """status() once the task has finished or timeout seconds have passed."""
+        future: Optional[Future] = self.tasks.get(task_id)
+        if future is None:
+            return {"status": "unknown"}
+        try:
+            future.result(timeout=timeout)
+        except (Exception, CancelledError):
+            pass                                  # Timed out or failed: see _describe
+        return self._describe(future)
+
+    async def wait_async(self, task_id: str, timeout: Optional[float] = None) -> dict:
+        """wait() for the event loop; the task keeps running if the wait times out."""
+        future = self.tasks.get(task_id)
+        if future is None:
+            return {"status": "unknown"}
+        if isinstance(future, Future):
+            future = asyncio.wrap_future(future)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except Exception:
+            pass
+        except CancelledError:
+            if not future.cancelled():
+                raise                             # The waiter itself was cancelled
+        return self._describe(future)
+
+    @staticmethod
+    def _describe(future) -> dict:
+        if not future.done():
+            return {"status": "pending"}
+        if future.cancelled():
+            return {"status": "error", "error": "Cancelled"}
+        error = future.exception()
+        if error is not None:
+            return {"status": "error", "error": str(error)}
+        return {"status": "done", "result": future.result()}
+
+
+# Shared instance, created on first use
+_task_store: Optional[TaskStore] = None
+_task_store_lock = threading.Lock()
+
+
+def get_task_store() -> TaskStore:
+    """Return the shared task store."""
+    global _task_store
+    if _task_store is None:
+        with _task_store_lock:
+            if _task_store is None:
+                _task_store = TaskStore(max_workers=int(os.getenv("BACKGROUND_WORKERS", 4)))
+    return _task_store
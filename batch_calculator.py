@@ -0,0 +1,423 @@
+"""
+Batch Calculator Module
+Vectorized versions of the chemistry calculators for whole columns of inputs.
+
+Every method takes columns (lists or arrays, one value per problem) and
+returns a dictionary of equal-length NumPy arrays with the same keys as the
+matching ChemistryCalculator method, plus an "error" column that holds a
+message for rows that could not be solved and None otherwise. Missing inputs
+are given as None, "" or NaN.
+"""
+
+import csv
+import inspect
+import io
+import json
+import math
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from chemistry_calculator import CALC_ALIASES, ChemistryCalculator
+from formula_cache import parse_formula
+
+Columns = Dict[str, np.ndarray]
+
+
+def as_float_array(values, length: Optional[int] = None) -> np.ndarray:
+    """Convert a column to float64, turning None and blanks into NaN."""
+    if values is None:
+        return np.full(length or 0, np.nan)
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'f':
+        return values.astype(np.float64, copy=False)
+    converted = []
+    for value in values:
+        if _is_missing(value):
+            converted.append(np.nan)
+            continue
+        try:
+            converted.append(float(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"Not a number: {value!r}")
+    return np.array(converted, dtype=np.float64)
+
+
+def _is_missing(value) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    return isinstance(value, float) and math.isnan(value)
+
+
+def _errors(length: int) -> np.ndarray:
+    return np.full(length, None, dtype=object)
+
+
+def _nature(pH: np.ndarray) -> np.ndarray:
+    nature = np.where(pH < 7, "Acidic", np.where(pH == 7, "Neutral", "Basic")).astype(object)
+    nature[np.isnan(pH)] = None
+    return nature
+
+
+class BatchCalculator:
+    """NumPy implementations of the ChemistryCalculator methods for many problems at once."""
+
+    AVOGADRO = ChemistryCalculator.AVOGADRO
+    GAS_CONSTANT = ChemistryCalculator.GAS_CONSTANT
+
+    # ==================== HELPERS ====================
+
+    def molar_masses(self, formulas: Iterable[str]):
+        """
+        Molar mass for every formula, parsing each distinct formula once.
+
+        Returns:
+            (molar masses with NaN for missing or invalid formulas, error column)
+        """
+        # Missing formulas become "" so they cannot pass as the string "None"
+        formulas = np.array(["" if _is_missing(formula) else str(formula).strip() for formula in formulas],
+                            dtype=object)
+        unique, inverse = np.unique(formulas.astype(str), return_inverse=True)
+        masses = np.full(len(unique), np.nan)
+        messages = np.full(len(unique), None, dtype=object)
+        for i, formula in enumerate(unique):
+            if not formula:
+                messages[i] = "Missing formula"
+                continue
+            try:
+                masses[i] = parse_formula(formula).molar_mass
+            except Exception as e:
+                messages[i] = str(e)
+        return masses[inverse], messages[inverse]
+
+    # ==================== STOICHIOMETRY ====================
+
+    def moles_to_grams(self, formula, moles) -> Columns:
+        """Convert moles to grams for each (formula, moles) pair."""
+        moles = as_float_array(moles)
+        molar_mass, error = self.molar_masses(formula)
+        error[np.isnan(moles) & (error == None)] = "Need formula and moles"  # noqa: E711
+        grams = moles * molar_mass
+        return {
+            "formula": np.asarray(formula, dtype=object),
+            "moles": moles,
+            "grams": np.round(grams, 4),
+            "molar_mass": np.round(molar_mass, 4),
+            "error": error,
+        }
+
+    def grams_to_moles(self, formula, grams) -> Columns:
+        """Convert grams to moles for each (formula, grams) pair."""
+        grams = as_float_array(grams)
+        molar_mass, error = self.molar_masses(formula)
+        error[np.isnan(grams) & (error == None)] = "Need formula and grams"  # noqa: E711
+        with np.errstate(divide='ignore', invalid='ignore'):
+            moles = grams / molar_mass
+        return {
+            "formula": np.asarray(formula, dtype=object),
+            "grams": grams,
+            "moles": np.round(moles, 4),
+            "molar_mass": np.round(molar_mass, 4),
+            "error": error,
+        }
+
+    def moles_to_molecules(self, moles) -> Columns:
+        """Convert moles to molecules."""
+        moles = as_float_array(moles)
+        return {
+            "moles": moles,
+            "molecules": moles * self.AVOGADRO,
+            "avogadro": np.full(len(moles), self.AVOGADRO),
+            "error": _errors(len(moles)),
+        }
+
+    def molecules_to_moles(self, molecules) -> Columns:
+        """Convert molecules to moles."""
+        molecules = as_float_array(molecules)
+        return {
+            "molecules": molecules,
+            "moles": np.round(molecules / self.AVOGADRO, 6),
+            "avogadro": np.full(len(molecules), self.AVOGADRO),
+            "error": _errors(len(molecules)),
+        }
+
+    # ==================== SOLUTION CHEMISTRY ====================
+
+    def calculate_molarity(self, moles=None, grams=None, formula=None, volume=None) -> Columns:
+        """Molarity from moles (or grams + formula) and volume in liters."""
+        length = len(next(c for c in (moles, grams, formula, volume) if c is not None))
+        moles = as_float_array(moles, length)
+        grams = as_float_array(grams, length)
+        volume = as_float_array(volume, length)
+        error = _errors(length)
+
+        if formula is not None:
+            molar_mass, formula_error = self.molar_masses(formula)
+            from_grams = np.isnan(moles) & ~np.isnan(grams)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                moles = np.where(from_grams, grams / molar_mass, moles)
+            error = np.where(from_grams, formula_error, error)
+
+        missing = np.isnan(moles) | np.isnan(volume)
+        error[missing & (error == None)] = "Need moles (or grams + formula) and volume in liters"  # noqa: E711
+        with np.errstate(divide='ignore', invalid='ignore'):
+            molarity = moles / volume
+        return {
+            "moles": np.round(moles, 4),
+            "volume_L": volume,
+            "molarity": np.round(molarity, 4),
+            "formula": np.asarray(formula if formula is not None else ["N/A"] * length, dtype=object),
+            "error": error,
+        }
+
+    def dilution(self, M1, V1, M2=None, V2=None) -> Columns:
+        """Solve M1V1 = M2V2 for whichever of M2 or V2 is missing in each row."""
+        M1 = as_float_array(M1)
+        V1 = as_float_array(V1)
+        M2 = as_float_array(M2, len(M1))
+        V2 = as_float_array(V2, len(M1))
+        error = _errors(len(M1))
+
+        initial = ~np.isnan(M1) & ~np.isnan(V1)
+        solve_M2 = initial & np.isnan(M2) & ~np.isnan(V2)
+        solve_V2 = initial & np.isnan(V2) & ~np.isnan(M2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            M2 = np.where(solve_M2, np.round(M1 * V1 / V2, 4), M2)
+            V2 = np.where(solve_V2, np.round(M1 * V1 / M2, 4), V2)
+        error[~(solve_M2 | solve_V2)] = "Need M1, V1, and either M2 or V2"
+        return {
+            "initial_molarity": M1,
+            "initial_volume": V1,
+            "final_molarity": M2,
+            "final_volume": V2,
+            "formula": np.full(len(M1), "M1V1 = M2V2", dtype=object),
+            "error": error,
+        }
+
+    # ==================== pH CALCULATIONS ====================
+
+    def calculate_pH(self, H) -> Columns:
+        """pH, pOH and [OH-] from [H+]."""
+        H = as_float_array(H)
+        error = _errors(len(H))
+        valid = H > 0
+        error[~valid] = "H+ concentration must be positive"
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pH = np.where(valid, -np.log10(H), np.nan)
+        pOH = 14 - pH
+        return {
+            "H_concentration": H,
+            "pH": np.round(pH, 2),
+            "pOH": np.round(pOH, 2),
+            "OH_concentration": 10 ** (-pOH),
+            "nature": _nature(pH),
+            "error": error,
+        }
+
+    def calculate_pOH(self, OH) -> Columns:
+        """pOH, pH and [H+] from [OH-]."""
+        OH = as_float_array(OH)
+        error = _errors(len(OH))
+        valid = OH > 0
+        error[~valid] = "OH- concentration must be positive"
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pOH = np.where(valid, -np.log10(OH), np.nan)
+        pH = 14 - pOH
+        return {
+            "OH_concentration": OH,
+            "pOH": np.round(pOH, 2),
+            "pH": np.round(pH, 2),
+            "H_concentration": 10 ** (-pH),
+            "nature": _nature(pH),
+            "error": error,
+        }
+
+    def pH_from_value(self, pH) -> Columns:
+        """All pH-related values from pH."""
+        pH = as_float_array(pH)
+        error = _errors(len(pH))
+        valid = (pH >= 0) & (pH <= 14)
+        error[~valid] = "pH must be between 0 and 14"
+        pH = np.where(valid, pH, np.nan)
+        pOH = 14 - pH
+        return {
+            "pH": pH,
+            "pOH": np.round(pOH, 2),
+            "H_concentration": 10 ** (-pH),
+            "OH_concentration": 10 ** (-pOH),
+            "nature": _nature(pH),
+            "error": error,
+        }
+
+    # ==================== GAS LAWS ====================
+
+    def ideal_gas_law(self, P=None, V=None, n=None, T=None) -> Columns:
+        """Solve PV = nRT for the one missing variable in each row."""
+        length = len(next(c for c in (P, V, n, T) if c is not None))
+        P, V, n, T = (as_float_array(c, length) for c in (P, V, n, T))
+        R = self.GAS_CONSTANT
+        error = _errors(length)
+
+        missing = np.stack([np.isnan(P), np.isnan(V), np.isnan(n), np.isnan(T)])
+        valid = missing.sum(axis=0) == 1
+        error[~valid] = "Provide exactly 3 variables (P, V, n, or T). Units: P(atm), V(L), n(mol), T(K)"
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            P = np.where(valid & missing[0], np.round(n * R * T / V, 4), P)
+            V = np.where(valid & missing[1], np.round(n * R * T / P, 4), V)
+            n = np.where(valid & missing[2], np.round(P * V / (R * T), 4), n)
+            T = np.where(valid & missing[3], np.round(P * V / (n * R), 4), T)
+        solved_for = np.array(["P", "V", "n", "T"], dtype=object)[missing.argmax(axis=0)]
+        solved_for[~valid] = None
+        return {
+            "P_atm": P, "V_L": V, "n_mol": n, "T_K": T,
+            "R": np.full(length, R), "solved_for": solved_for, "error": error,
+        }
+
+    def combined_gas_law(self, P1=None, V1=None, T1=None, P2=None, V2=None, T2=None) -> Columns:
+        """Solve (P1V1)/T1 = (P2V2)/T2 for the one missing variable in each row."""
+        length = len(next(c for c in (P1, V1, T1, P2, V2, T2) if c is not None))
+        P1, V1, T1, P2, V2, T2 = (as_float_array(c, length) for c in (P1, V1, T1, P2, V2, T2))
+        error = _errors(length)
+
+        names = ["P1", "V1", "T1", "P2", "V2", "T2"]
+        missing = np.stack([np.isnan(c) for c in (P1, V1, T1, P2, V2, T2)])
+        valid = missing.sum(axis=0) == 1
+        error[~valid] = "Provide 5 out of 6 variables. Units: P(atm), V(L), T(K)"
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            P2 = np.where(valid & missing[3], np.round(P1 * V1 * T2 / (T1 * V2), 4), P2)
+            V2 = np.where(valid & missing[4], np.round(P1 * V1 * T2 / (T1 * P2), 4), V2)
+            T2 = np.where(valid & missing[5], np.round(P2 * V2 * T1 / (P1 * V1), 4), T2)
+            P1 = np.where(valid & missing[0], np.round(P2 * V2 * T1 / (V1 * T2), 4), P1)
+            V1 = np.where(valid & missing[1], np.round(P2 * V2 * T1 / (P1 * T2), 4), V1)
+            T1 = np.where(valid & missing[2], np.round(P1 * V1 * T2 / (P2 * V2), 4), T1)
+        solved_for = np.array(names, dtype=object)[missing.argmax(axis=0)]
+        solved_for[~valid] = None
+        return {
+            "P1": P1, "V1": V1, "T1": T1, "P2": P2, "V2": V2, "T2": T2,
+            "solved_for": solved_for, "error": error,
+        }
+
+
+# Calculation type → method and input columns (aliases as in the calc: command)
+BATCH_CALCULATIONS = {
+    "moles_to_grams": ("moles_to_grams", ["formula", "moles"]),
+    "grams_to_moles": ("grams_to_moles", ["formula", "grams"]),
+    "moles_to_molecules": ("moles_to_molecules", ["moles"]),
+    "molecules_to_moles": ("molecules_to_moles", ["molecules"]),
+    "molarity": ("calculate_molarity", ["moles", "grams", "formula", "volume"]),
+    "dilution": ("dilution", ["M1", "V1", "M2", "V2"]),
+    "ph": ("calculate_pH", ["H"]),
+    "poh": ("calculate_pOH", ["OH"]),
+    "ph_value": ("pH_from_value", ["pH"]),
+    "ideal_gas": ("ideal_gas_law", ["P", "V", "n", "T"]),
+    "combined_gas": ("combined_gas_law", ["P1", "V1", "T1", "P2", "V2", "T2"]),
+}
+BATCH_ALIASES = {alias: name for alias, name in CALC_ALIASES.items() if name in BATCH_CALCULATIONS}
+
+
+def run_batch(calc_type: str, columns: Dict[str, List]) -> Columns:
+    """
+    Run one calculation type over columnar inputs.
+
+    Args:
+        calc_type: Calculation name or alias, as in the calc: command
+        columns: Input column name → values; names match the calc: parameters
+
+    Returns:
+        Result columns
+
+    Raises:
+        ValueError: For an unknown type, missing columns, ragged columns or
+            values that are not numbers
+    """
+    if not isinstance(calc_type, str):
+        raise ValueError("The calculation type must be a string")
+    name = calc_type.strip().lower()
+    name = BATCH_ALIASES.get(name, name)
+    if name not in BATCH_CALCULATIONS:
+        raise ValueError(f"Unknown calculation type '{calc_type}'. "
+                         f"Supported: {', '.join(sorted(BATCH_CALCULATIONS))}")
+    method, params = BATCH_CALCULATIONS[name]
+
+    inputs = {param: columns[param] for param in params if param in columns}
+    if not inputs:
+        raise ValueError(f"'{name}' needs columns from: {', '.join(params)}")
+    lengths = {len(values) for values in inputs.values()}
+    if len(lengths) != 1:
+        raise ValueError("All columns must have the same number of rows")
+
+    if method == "calculate_molarity" and "volume" not in inputs:
+        raise ValueError("'molarity' needs a volume column")
+    signature = inspect.signature(getattr(BatchCalculator, method))
+    missing = [param for param in params
+               if signature.parameters[param].default is inspect.Parameter.empty and param not in inputs]
+    if missing:
+        raise ValueError(f"'{name}' needs columns: {', '.join(missing)}")
+    return getattr(BatchCalculator(), method)(**inputs)
+
+
+def read_csv_columns(text: str) -> Dict[str, List]:
+    """Read CSV text with a header row into columns."""
+    reader = csv.reader(io.StringIO(text))
+    header = [name.strip() for name in next(reader, [])]
+    columns: Dict[str, List] = {name: [] for name in header}
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        for name, cell in zip(header, row + [""] * (len(header) - len(row))):
+            columns[name].append(cell.strip())
+    return columns
+
+
+def rows_to_columns(rows: List[dict]) -> Dict[str, List]:
+    """Turn a list of row dictionaries into columns."""
+    keys = []
+    for row in rows:
+        keys.extend(k for k in row if k not in keys)
+    return {key: [row.get(key) for row in rows] for key in keys}
+
+
+def _json_value(value):
+    if isinstance(value, (np.floating, float)):
+        value = float(value)
+        return None if math.isnan(value) or math.isinf(value) else value
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def iter_result_rows(result: Columns) -> Iterator[dict]:
+    """Yield one JSON-ready dictionary per result row."""
+    keys = list(result)
+    for values in zip(*(result[key] for key in keys)):
+        yield {key: _json_value(value) for key, value in zip(keys, values)}
+
+
+def stream_ndjson(result: Columns, chunk_rows: int = 500) -> Iterator[str]:
+    """Yield results as newline-delimited JSON, a chunk of rows at a time."""
+    chunk = []
+    for row in iter_result_rows(result):
+        chunk.append(json.dumps(row))
+        if len(chunk) >= chunk_rows:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def stream_csv(result: Columns, chunk_rows: int = 500) -> Iterator[str]:
+    """Yield results as CSV with a header row, a chunk of rows at a time."""
+    keys = list(result)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(keys)
+    for i, row in enumerate(iter_result_rows(result), 1):
+        writer.writerow(["" if row[key] is None else row[key] for key in keys])
+        if i % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,97 @@
+"""
+Cold Start Benchmark
+Measures how long a fresh interpreter takes to import the app and serve its
+first request, the way a serverless worker does after a cold start.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 5] [--repo PATH]
+
+Each run starts a new Python process with -X importtime, imports main,
+then sends one request through Flask's test client.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Requests timed after the import, one fresh process each
+ROUTES = [
+    ("GET", "/", None),
+    ("GET", "/element/Fe", None),
+    ("POST", "/chat", {"message": "calc: ph | H=0.001"}),
+    ("POST", "/chat", {"message": "textbook: annealing"}),
+]
+
+# Run inside the child process; prints the first-request time in ms
+CHILD_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+client = main.app.test_client()
+method, path, body = {route!r}
+if method == "GET":
+    client.get(path)
+else:
+    client.post(path, json=body)
+done = time.perf_counter()
+print(f"RESULT {{(imported - start) * 1000:.1f}} {{(done - imported) * 1000:.1f}}", file=sys.stderr)
+"""
+
+# Heavy dependencies whose presence at import time we want to track
+WATCHED_MODULES = ["numpy", "periodictable", "httpx", "google.genai", "knowledge_base"]
+
+
+def run_once(repo: str, route: tuple) -> dict:
+    """Start a fresh interpreter and time the import plus one request."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    env.pop("GEMINI_API_KEY", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT.format(route=route)],
+        cwd=repo, env=env, capture_output=True, text=True, check=True,
+    )
+
+    imported_at_startup = set()
+    import_ms = request_ms = 0.0
+    main_seen = False
+    for line in proc.stderr.splitlines():
+        if line.startswith("RESULT"):
+            _, import_ms, request_ms = line.split()
+        elif line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            if name == "main":
+                main_seen = True
+            elif not main_seen and name in WATCHED_MODULES:
+                imported_at_startup.add(name)
+
+    return {
+        "import_ms": float(import_ms),
+        "request_ms": float(request_ms),
+        "imported": sorted(imported_at_startup),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per route")
+    parser.add_argument("--repo", default=REPO_ROOT, help="checkout to benchmark")
+    args = parser.parse_args()
+
+    print(f"Cold start benchmark for {args.repo} ({args.runs} runs per route, median)")
+    print(f"{'route':<36} {'import ms':>10} {'request ms':>11} {'total ms':>9}  heavy modules loaded by import")
+    for route in ROUTES:
+        runs = [run_once(args.repo, route) for _ in range(args.runs)]
+        import_ms = statistics.median(r["import_ms"] for r in runs)
+        request_ms = statistics.median(r["request_ms"] for r in runs)
+        method, path, body = route
+        label = f"{method} {path}" + (f" {body['message']}" if body else "")
+        print(f"{label:<36} {import_ms:>10.1f} {request_ms:>11.1f} "
+              f"{import_ms + request_ms:>9.1f}  {', '.join(runs[-1]['imported']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
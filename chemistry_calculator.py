@@ -5,7 +5,9 @@ Provides calculation functions for stoichiometry, solutions, pH, gas laws, and m
 
 import math
 import re
-import periodictable
+import threading
+
+from formula_cache import parse_formula
 
 
 class ChemistryCalculator:
@@ -23,7 +25,7 @@ class ChemistryCalculator:
     def moles_to_grams(self, formula: str, moles: float) -> dict:
         """Convert moles to grams."""
         try:
-            molar_mass = periodictable.formula(formula).mass
+            molar_mass = parse_formula(formula).molar_mass
             grams = moles * molar_mass
             return {
                 "formula": formula,
@@ -37,7 +39,7 @@ class ChemistryCalculator:
     def grams_to_moles(self, formula: str, grams: float) -> dict:
         """Convert grams to moles."""
         try:
-            molar_mass = periodictable.formula(formula).mass
+            molar_mass = parse_formula(formula).molar_mass
             moles = grams / molar_mass
             return {
                 "formula": formula,
@@ -79,7 +81,7 @@ class ChemistryCalculator:
         """Calculate molarity (M = mol/L)."""
         try:
             if moles is None and grams is not None and formula is not None:
-                molar_mass = periodictable.formula(formula).mass
+                molar_mass = parse_formula(formula).molar_mass
                 moles = grams / molar_mass
             
             if moles is None or volume_L is None:
@@ -250,15 +252,14 @@ class ChemistryCalculator:
     def percent_composition(self, formula: str) -> dict:
         """Calculate mass percent of each element in a compound."""
         try:
-            compound = periodictable.formula(formula)
-            total_mass = compound.mass
+            compound = parse_formula(formula)
+            total_mass = compound.molar_mass
             
             # Get element composition
             element_masses = {}
-            for element, count in compound.atoms.items():
-                element_mass = element.mass * count
+            for symbol, count, element_mass in compound.composition:
                 percent = (element_mass / total_mass) * 100
-                element_masses[element.symbol] = {
+                element_masses[symbol] = {
                     "count": count,
                     "mass": round(element_mass, 4),
                     "percent": round(percent, 2)
@@ -280,8 +281,8 @@ class ChemistryCalculator:
         """Determine limiting reactant and theoretical yield."""
         try:
             # Calculate moles of each reactant
-            molar_mass1 = periodictable.formula(reactant1_formula).mass
-            molar_mass2 = periodictable.formula(reactant2_formula).mass
+            molar_mass1 = parse_formula(reactant1_formula).molar_mass
+            molar_mass2 = parse_formula(reactant2_formula).molar_mass
             
             moles1 = reactant1_grams / molar_mass1
             moles2 = reactant2_grams / molar_mass2
@@ -321,7 +322,86 @@ class ChemistryCalculator:
             }
         except Exception as e:
             return {"error": str(e)}
+    
+    # ==================== DISPATCH ====================
+
+    def run(self, calc_type: str, params: dict) -> dict:
+        """
+        Run a calculation by name or alias, as in the calc: command.
+
+        Args:
+            calc_type: Calculation name or alias ("ph", "mol to g", ...)
+            params: calc: parameter name → value
+
+        Returns:
+            The method's result, or {"error": ...} for an unknown type
+        """
+        name = calc_type.strip().lower()
+        name = CALC_ALIASES.get(name, name)
+        if name not in CALCULATIONS:
+            return {"error": f"Unknown calculation type '{calc_type}'"}
+        method, arguments = CALCULATIONS[name]
+        kwargs = {}
+        for argument, param in arguments.items():
+            if isinstance(param, tuple):
+                # Whole-number argument with a default (reaction coefficients)
+                param, default = param
+                kwargs[argument] = int(params.get(param, default))
+            else:
+                kwargs[argument] = params.get(param)
+        return getattr(self, method)(**kwargs)
+
+
+# Calculation type → method and its arguments (method argument → calc: parameter)
+CALCULATIONS = {
+    "moles_to_grams": ("moles_to_grams", {"formula": "formula", "moles": "moles"}),
+    "grams_to_moles": ("grams_to_moles", {"formula": "formula", "grams": "grams"}),
+    "moles_to_molecules": ("moles_to_molecules", {"moles": "moles"}),
+    "molecules_to_moles": ("molecules_to_moles", {"molecules": "molecules"}),
+    "molarity": ("calculate_molarity", {"moles": "moles", "grams": "grams", "formula": "formula",
+                                        "volume_L": "volume"}),
+    "dilution": ("dilution", {"M1": "M1", "V1": "V1", "M2": "M2", "V2": "V2"}),
+    "ph": ("calculate_pH", {"H_concentration": "H"}),
+    "poh": ("calculate_pOH", {"OH_concentration": "OH"}),
+    "ph_value": ("pH_from_value", {"pH": "pH"}),
+    "ideal_gas": ("ideal_gas_law", {"P": "P", "V": "V", "n": "n", "T": "T"}),
+    "combined_gas": ("combined_gas_law", {"P1": "P1", "V1": "V1", "T1": "T1",
+                                          "P2": "P2", "V2": "V2", "T2": "T2"}),
+    "percent": ("percent_composition", {"formula": "formula"}),
+    "limiting": ("limiting_reactant", {
+        "reactant1_formula": "r1", "reactant1_grams": "g1", "reactant1_coef": ("c1", 1),
+        "reactant2_formula": "r2", "reactant2_grams": "g2", "reactant2_coef": ("c2", 1),
+    }),
+}
+CALC_ALIASES = {
+    "moles to grams": "moles_to_grams", "mol to g": "moles_to_grams",
+    "grams to moles": "grams_to_moles", "g to mol": "grams_to_moles",
+    "mol to molecules": "moles_to_molecules", "molecules to mol": "molecules_to_moles",
+    "concentration": "molarity", "m1v1=m2v2": "dilution",
+    "ph_from_h": "ph", "ph_from_oh": "poh", "ph info": "ph_value",
+    "pv=nrt": "ideal_gas", "gas law": "ideal_gas", "gas laws": "combined_gas",
+    "percent_composition": "percent", "composition": "percent",
+    "limiting_reactant": "limiting", "limiting reagent": "limiting",
+}
+
+
+# Shared instance, created on first use
+_calculator = None
+_calculator_lock = threading.Lock()
+
+
+def get_calculator() -> ChemistryCalculator:
+    """Return the shared calculator."""
+    global _calculator
+    if _calculator is None:
+        with _calculator_lock:
+            if _calculator is None:
+                _calculator = ChemistryCalculator()
+    return _calculator
 
 
-# Global instance for easy import
-calculator = ChemistryCalculator()
+def __getattr__(name):
+    # Keeps `from chemistry_calculator import calculator` working
+    if name == "calculator":
+        return get_calculator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
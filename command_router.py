@@ -0,0 +1,149 @@
+"""
+Command Router Module
+Table-driven routing for chat messages: a prefix trie for commands such as
+"element:" and an Aho-Corasick keyword matcher for the offline answer
+intents, so a message is routed in one scan however many entries are
+registered.
+"""
+
+from collections import deque
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+# Trie node key holding the entry that ends at a node (never a character)
+_END = ""
+
+
+class PrefixTrie:
+    """Maps command prefixes to values; lookups walk the message once."""
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+        self._longest = 0
+
+    def add(self, prefix: str, value: Any):
+        """Register a (case-insensitive) prefix; a longer prefix wins over a shorter one."""
+        node = self._root
+        for char in prefix.lower():
+            node = node.setdefault(char, {})
+        node[_END] = (prefix.lower(), value)
+        self._longest = max(self._longest, len(prefix))
+
+    def match(self, text: str) -> Optional[Tuple[str, Any]]:
+        """The longest registered prefix of text (case-insensitive) and its value, or None."""
+        node = self._root
+        found = None
+        for char in text[:self._longest].lower():
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(_END, found)
+        return found
+
+    def prefixes(self) -> List[str]:
+        """Every registered prefix."""
+        prefixes, stack = [], [self._root]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char == _END:
+                    prefixes.append(child[0])
+                else:
+                    stack.append(child)
+        return sorted(prefixes)
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of keywords.
+
+    find() reports every keyword occurring anywhere in a text, overlapping
+    ones included ("phase diagram" and "ph"), in a single pass, exactly as
+    a `keyword in text` test per keyword would.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = frozenset(keyword.lower() for keyword in keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[FrozenSet[str]] = [frozenset()]
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(frozenset())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state] |= {keyword}
+
+        # Breadth-first: failure links point at the longest proper suffix
+        # that is also a path in the trie
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in self._goto[state].items():
+                queue.append(target)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[target] = self._goto[fallback].get(char, 0)
+                self._output[target] |= self._output[self._fail[target]]
+
+    def find(self, text: str) -> Set[str]:
+        """Every keyword that occurs in text (case-insensitive)."""
+        goto, fail, output = self._goto, self._fail, self._output
+        found: Set[str] = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class Intent(NamedTuple):
+    """
+    An offline answer chosen by keywords.
+
+    Matches when any keyword occurs in the message (or the whole message is
+    one of exact), at least one of requires occurs too (if given), and guard
+    (if given) accepts the lowercased message. respond(message, found) may
+    return None to let later intents answer.
+    """
+    name: str
+    keywords: Tuple[str, ...]
+    respond: Callable[[str, Set[str]], Optional[str]]
+    requires: Tuple[str, ...] = ()
+    exact: Tuple[str, ...] = ()
+    guard: Optional[Callable[[str], bool]] = None
+
+
+class IntentTable:
+    """Ordered intents answered from one keyword scan per message."""
+
+    def __init__(self, intents: List[Intent]):
+        self.intents = intents
+        self.matcher = KeywordMatcher(
+            keyword for intent in intents for keyword in intent.keywords + intent.requires
+        )
+
+    def respond(self, message: str) -> Optional[str]:
+        """The answer of the first matching intent that gives one, or None."""
+        lower = message.lower()
+        found = self.matcher.find(lower)
+        stripped = lower.strip()
+        for intent in self.intents:
+            if not (found.intersection(intent.keywords) or stripped in intent.exact):
+                continue
+            if intent.requires and not found.intersection(intent.requires):
+                continue
+            if intent.guard and not intent.guard(lower):
+                continue
+            answer = intent.respond(message, found)
+            if answer is not None:
+                return answer
+        return None
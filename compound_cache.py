@@ -0,0 +1,274 @@
+"""
+Compound Cache Module
+Persistent PubChem lookup cache: an in-process LRU in front of a local SQLite store.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+from memory_cache import LRUCache
+from single_flight import SingleFlight
+
+# Marks a name that PubChem does not know, so it is not looked up again
+NOT_FOUND = "__not_found__"
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "chemistry_chatbot_compounds.sqlite3")
+DEFAULT_TTL = 7 * 24 * 3600        # Found compounds: one week
+DEFAULT_NEGATIVE_TTL = 24 * 3600   # Unknown names: one day
+
+
+def normalize_compound_name(name: str) -> str:
+    """Case- and whitespace-insensitive cache key for a compound name."""
+    return " ".join(name.lower().split())
+
+
+class CompoundCache:
+    """
+    Caches compound records by normalized name and by PubChem CID.
+
+    Lookups check the in-process LRU first, then the SQLite file, and only
+    call the fetcher when both miss or the stored entry has expired;
+    concurrent misses for the same name share one fetch. Names the fetcher
+    does not find are cached as negative entries with their own, shorter
+    TTL. Fetcher errors are never cached.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL, memory_size: int = 512):
+        """
+        Args:
+            path: SQLite file for the persistent tier (None = memory only)
+            ttl: Lifetime of a found compound in seconds
+            negative_ttl: Lifetime of a not-found entry in seconds
+            memory_size: Number of names kept in the in-process LRU
+        """
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory = LRUCache(maxsize=memory_size)
+        self.disk_hits = 0
+        self.fetches = 0
+        self._lock = threading.Lock()
+        self._fetches = SingleFlight()
+        self._db = self._open(path) if path else None
+
+    def _open(self, path: str) -> Optional[sqlite3.Connection]:
+        """Open (and create) the SQLite store, or None if the path is unusable."""
+        try:
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS compounds ("
+                "cid INTEGER PRIMARY KEY, record TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS compound_names ("
+                "name TEXT PRIMARY KEY, cid INTEGER, fetched_at REAL NOT NULL)"
+            )
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            print(f"⚠️ Compound cache disabled for {path}: {e}")
+            return None
+
+    # ==================== LOOKUPS ====================
+
+    def get(self, name: str, fetch: Callable[[str], Optional[dict]]) -> Optional[dict]:
+        """
+        Return the compound record for a name, fetching it on a cache miss.
+
+        Args:
+            name: Compound name as typed by the user
+            fetch: Called with the name on a miss; returns a record dict with
+                a "cid" key, or None if the compound does not exist
+
+        Returns:
+            The compound record, or None if the compound is unknown
+        """
+        key = normalize_compound_name(name)
+        cached = self._cached(key)
+        if cached is not None:
+            return None if cached == NOT_FOUND else cached
+
+        return self._fetches.do(key, self._fetch, key, name, fetch)
+
+    async def get_async(self, name: str, fetch: Callable[[str], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        """get() with a coroutine fetcher, for the async serving mode."""
+        key = normalize_compound_name(name)
+        cached = self.memory.get(key)
+        if cached is None:
+            # SQLite reads and writes block, so they run off the event loop
+            cached = await asyncio.to_thread(self._cached, key)
+        if cached is not None:
+            return None if cached == NOT_FOUND else cached
+
+        return await self._fetches.do_async(key, self._fetch_async, key, name, fetch)
+
+    def _fetch(self, key: str, name: str, fetch: Callable[[str], Optional[dict]]) -> Optional[dict]:
+        # Another caller's fetch may have finished since this one missed
+        cached = self.memory.get(key)
+        if cached is not None:
+            return None if cached == NOT_FOUND else cached
+        self.fetches += 1
+        record = fetch(name)
+        self.put(key, record)
+        return record
+
+    async def _fetch_async(self, key: str, name: str, fetch: Callable[[str], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        cached = self.memory.get(key)
+        if cached is not None:
+            return None if cached == NOT_FOUND else cached
+        self.fetches += 1
+        record = await fetch(name)
+        await asyncio.to_thread(self.put, key, record)
+        return record
+
+    def _cached(self, key: str):
+        """The entry for a name from memory or disk (NOT_FOUND for unknown names), or None."""
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached
+        cached, remaining = self._load_name(key)
+        if cached is not None:
+            # Promoted with what is left of its lifetime, not a fresh one
+            self.disk_hits += 1
+            self._remember(key, cached, ttl=remaining)
+        return cached
+
+    def get_by_cid(self, cid: int) -> Optional[dict]:
+        """Return a cached compound record by PubChem CID, if present and fresh."""
+        cached = self.memory.get(("cid", cid))
+        if cached is not None:
+            return cached
+        record, remaining = self._load_cid(cid)
+        if record is not None:
+            self.memory.set(("cid", cid), record, ttl=remaining)
+        return record
+
+    def put(self, name: str, record: Optional[dict]):
+        """Store a record (or a negative entry when record is None) under a name."""
+        key = normalize_compound_name(name)
+        value = NOT_FOUND if record is None else record
+        self._remember(key, value)
+        self._store(key, record)
+
+    def _remember(self, key: str, value, ttl: Optional[float] = None):
+        """Keep an entry in memory for ttl seconds (default: a full lifetime)."""
+        if value == NOT_FOUND:
+            self.memory.set(key, value, ttl=self.negative_ttl if ttl is None else ttl)
+        else:
+            ttl = self.ttl if ttl is None else ttl
+            self.memory.set(key, value, ttl=ttl)
+            if value.get("cid") is not None:
+                self.memory.set(("cid", value["cid"]), value, ttl=ttl)
+
+    # ==================== SQLITE TIER ====================
+
+    def _load_name(self, key: str):
+        """(entry, seconds it has left) for a name, or (None, 0) if missing or expired."""
+        if self._db is None:
+            return None, 0
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT n.cid, n.fetched_at, c.record, c.fetched_at FROM compound_names n "
+                "LEFT JOIN compounds c ON c.cid = n.cid WHERE n.name = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None, 0
+        cid, name_fetched_at, record, record_fetched_at = row
+        if cid is None:
+            remaining = self.negative_ttl - (now - name_fetched_at)
+            return (NOT_FOUND, remaining) if remaining > 0 else (None, 0)
+        remaining = self.ttl - (now - record_fetched_at) if record is not None else 0
+        if remaining <= 0:
+            return None, 0
+        return json.loads(record), remaining
+
+    def _load_cid(self, cid: int):
+        """(record, seconds it has left) for a CID, or (None, 0) if missing or expired."""
+        if self._db is None:
+            return None, 0
+        with self._lock:
+            row = self._db.execute(
+                "SELECT record, fetched_at FROM compounds WHERE cid = ?", (cid,)
+            ).fetchone()
+        remaining = self.ttl - (time.time() - row[1]) if row is not None else 0
+        if remaining <= 0:
+            return None, 0
+        return json.loads(row[0]), remaining
+
+    def _store(self, key: str, record: Optional[dict]):
+        if self._db is None:
+            return
+        now = time.time()
+        cid = record.get("cid") if record else None
+        try:
+            with self._lock:
+                if cid is not None:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO compounds (cid, record, fetched_at) VALUES (?, ?, ?)",
+                        (cid, json.dumps(record), now)
+                    )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO compound_names (name, cid, fetched_at) VALUES (?, ?, ?)",
+                    (key, cid, now)
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not write compound cache: {e}")
+
+    # ==================== MAINTENANCE ====================
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the SQLite store; returns the number removed."""
+        if self._db is None:
+            return 0
+        now = time.time()
+        with self._lock:
+            removed = self._db.execute(
+                "DELETE FROM compound_names WHERE (cid IS NULL AND fetched_at < ?) "
+                "OR (cid IS NOT NULL AND fetched_at < ?)",
+                (now - self.negative_ttl, now - self.ttl)
+            ).rowcount
+            removed += self._db.execute(
+                "DELETE FROM compounds WHERE fetched_at < ?", (now - self.ttl,)
+            ).rowcount
+            self._db.commit()
+        return removed
+
+    def stats(self) -> dict:
+        """Return memory-tier counters plus disk hits and upstream fetches."""
+        return {
+            "memory": self.memory.stats(),
+            "disk_hits": self.disk_hits,
+            "fetches": self.fetches,
+            "coalesced": self._fetches.stats()["shared"],
+            "persistent": self._db is not None,
+        }
+
+
+# Shared instance, created on first use
+_compound_cache: Optional[CompoundCache] = None
+_compound_cache_lock = threading.Lock()
+
+
+def get_compound_cache() -> CompoundCache:
+    """Return the shared compound cache configured from the environment."""
+    global _compound_cache
+    if _compound_cache is None:
+        with _compound_cache_lock:
+            if _compound_cache is None:
+                _compound_cache = CompoundCache(
+                    path=os.getenv("COMPOUND_CACHE_PATH", DEFAULT_CACHE_PATH) or None,
+                    ttl=float(os.getenv("COMPOUND_CACHE_TTL", DEFAULT_TTL)),
+                    negative_ttl=float(os.getenv("COMPOUND_CACHE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL)),
+                )
+    return _compound_cache
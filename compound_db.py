@@ -0,0 +1,296 @@
+"""
+Compound Database Module
+Bundled read-only compound dataset, memory-mapped and consulted before PubChem.
+
+The database file maps normalized names and synonyms to compound records
+(CID, IUPAC name, formula, molecular weight, SMILES). Keys are stored sorted
+so a lookup is a binary search directly over the mapped file.
+"""
+
+import gzip
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from compound_cache import normalize_compound_name
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, "compounds.bin")
+DEFAULT_SEED_PATH = os.path.join(DATA_DIR, "compounds.tsv")
+
+# Layout: magic, key count, record count, key blob size, record blob size
+DB_MAGIC = b'CCMPDB01'
+DB_HEADER = struct.Struct('<8s4Q')
+UINT32 = struct.Struct('<I')
+
+# One compound: (cid, name, formula, weight, smiles)
+Record = Tuple[int, str, str, Optional[float], str]
+
+
+class CompoundDatabase:
+    """Read-only name → compound lookup over a memory-mapped database file."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._mm = None
+        self.num_keys = 0
+        self.num_records = 0
+        if os.path.exists(path):
+            try:
+                self._map(path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not load compound database {path}: {e}")
+                self._mm = None
+                self.num_keys = self.num_records = 0
+
+    def _map(self, path: str):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < DB_HEADER.size:
+            raise ValueError("file too short")
+        magic, self.num_keys, self.num_records, keys_len, records_len = DB_HEADER.unpack_from(self._mm)
+        if magic != DB_MAGIC:
+            raise ValueError("not a compound database")
+
+        # Section start offsets, in the order written by write_database()
+        offset = DB_HEADER.size
+        self._key_offsets = offset
+        offset += _padded(4 * (self.num_keys + 1))
+        self._key_records = offset
+        offset += _padded(4 * self.num_keys)
+        self._record_offsets = offset
+        offset += _padded(4 * (self.num_records + 1))
+        self._keys = offset
+        offset += _padded(keys_len)
+        self._records = offset
+
+    def __len__(self) -> int:
+        return self.num_records
+
+    def _key(self, i: int) -> bytes:
+        start = UINT32.unpack_from(self._mm, self._key_offsets + 4 * i)[0]
+        end = UINT32.unpack_from(self._mm, self._key_offsets + 4 * (i + 1))[0]
+        return self._mm[self._keys + start:self._keys + end]
+
+    def _record(self, record_id: int) -> dict:
+        start = UINT32.unpack_from(self._mm, self._record_offsets + 4 * record_id)[0]
+        end = UINT32.unpack_from(self._mm, self._record_offsets + 4 * (record_id + 1))[0]
+        cid, name, formula, weight, smiles = \
+            self._mm[self._records + start:self._records + end].decode('utf-8').split('\t')
+        return {
+            "name": name,
+            "molecular_formula": formula,
+            "molecular_weight": float(weight) if weight else None,
+            "smiles": smiles,
+            "cid": int(cid),
+        }
+
+    def lookup(self, name: str) -> Optional[dict]:
+        """
+        Find a compound by name or synonym.
+
+        Args:
+            name: Compound name as typed by the user
+
+        Returns:
+            Compound record in the same shape as a PubChem lookup, or None
+        """
+        if not self.num_keys:
+            return None
+        key = normalize_compound_name(name).encode('utf-8')
+        lo, hi = 0, self.num_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.num_keys and self._key(lo) == key:
+            record_id = UINT32.unpack_from(self._mm, self._key_records + 4 * lo)[0]
+            return self._record(record_id)
+        return None
+
+
+def _padded(size: int) -> int:
+    return size + (-size % 8)
+
+
+# ==================== BUILDING ====================
+
+def write_database(path: str, compounds: Iterable[Tuple[Record, List[str]]]) -> Tuple[int, int]:
+    """
+    Write a database file.
+
+    Args:
+        path: Output file
+        compounds: (record, names) pairs; every name and the record's own
+            name become lookup keys. When two compounds share a key, the one
+            listed first wins.
+
+    Returns:
+        Number of records and number of keys written
+    """
+    records = []
+    keys: Dict[bytes, int] = {}
+    for (cid, name, formula, weight, smiles), names in compounds:
+        record_id = len(records)
+        records.append('\t'.join([
+            str(cid), name, formula, "" if weight is None else f"{weight:g}", smiles
+        ]).encode('utf-8'))
+        for alias in [name, *names]:
+            key = normalize_compound_name(alias).encode('utf-8')
+            if key:
+                keys.setdefault(key, record_id)
+
+    sorted_keys = sorted(keys)
+    key_offsets = [0]
+    for key in sorted_keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+    record_offsets = [0]
+    for record in records:
+        record_offsets.append(record_offsets[-1] + len(record))
+
+    key_blob = b''.join(sorted_keys)
+    record_blob = b''.join(records)
+    sections = [
+        struct.pack(f'<{len(key_offsets)}I', *key_offsets),
+        struct.pack(f'<{len(sorted_keys)}I', *(keys[k] for k in sorted_keys)),
+        struct.pack(f'<{len(record_offsets)}I', *record_offsets),
+        key_blob,
+        record_blob,
+    ]
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(DB_HEADER.pack(DB_MAGIC, len(sorted_keys), len(records), len(key_blob), len(record_blob)))
+        for section in sections:
+            f.write(section)
+            f.write(b'\0' * (-len(section) % 8))
+    os.replace(tmp_path, path)
+    return len(records), len(sorted_keys)
+
+
+def formula_weight(formula: str) -> Optional[float]:
+    """Molecular weight computed from a formula, or None if it cannot be parsed."""
+    import periodictable
+    try:
+        return round(periodictable.formula(formula).mass, 3)
+    except Exception:
+        return None
+
+
+def read_seed_file(path: str) -> Iterator[Tuple[Record, List[str]]]:
+    """Read compounds from the tab-separated seed file (see data/compounds.tsv)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            cid, name, formula, weight, smiles, synonyms = line.split('\t')
+            weight = float(weight) if weight else formula_weight(formula)
+            names = [s for s in synonyms.split('|') if s]
+            yield (int(cid), name, formula, weight, smiles), names
+
+
+def _read_pubchem_table(directory: str, name: str) -> Iterator[List[str]]:
+    """Yield the tab-separated rows of a PubChem FTP 'Extras' file (plain or .gz)."""
+    for candidate in (name, f"{name}.gz"):
+        path = os.path.join(directory, candidate)
+        if os.path.exists(path):
+            opener = gzip.open if candidate.endswith('.gz') else open
+            with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    yield line.rstrip('\n').split('\t')
+            return
+    raise FileNotFoundError(f"{name} not found in {directory}")
+
+
+def read_pubchem_dump(directory: str, cids: Optional[List[int]] = None,
+                      max_synonyms: int = 20) -> Iterator[Tuple[Record, List[str]]]:
+    """
+    Read compounds from PubChem's FTP 'Extras' dump.
+
+    Expects CID-Title, CID-IUPAC, CID-Mass (CID, formula, ...), CID-SMILES
+    and CID-Synonym-filtered in directory. Molecular weights are computed
+    from the formula.
+
+    Args:
+        directory: Folder containing the dump files
+        cids: Only include these compounds, in this priority order (all if None)
+        max_synonyms: Synonyms kept per compound
+
+    Yields:
+        (record, names) pairs for write_database()
+    """
+    wanted = set(cids) if cids else None
+
+    def table(name: str) -> Dict[int, List[str]]:
+        rows = {}
+        for row in _read_pubchem_table(directory, name):
+            cid = int(row[0])
+            if wanted is None or cid in wanted:
+                rows[cid] = row[1:]
+        return rows
+
+    titles = table("CID-Title")
+    iupac = table("CID-IUPAC")
+    masses = table("CID-Mass")
+    smiles = table("CID-SMILES")
+
+    synonyms: Dict[int, List[str]] = {}
+    for row in _read_pubchem_table(directory, "CID-Synonym-filtered"):
+        cid = int(row[0])
+        if wanted is None or cid in wanted:
+            names = synonyms.setdefault(cid, [])
+            if len(names) < max_synonyms:
+                names.append(row[1])
+
+    for cid in (cids or sorted(titles)):
+        if cid not in masses:
+            continue
+        formula = masses[cid][0]
+        title = titles.get(cid, [""])[0]
+        name = iupac.get(cid, [title])[0] or title
+        record = (cid, name, formula, formula_weight(formula), smiles.get(cid, [""])[0])
+        yield record, [title, *synonyms.get(cid, [])]
+
+
+# Shared instance, mapped on first use
+_compound_db: Optional[CompoundDatabase] = None
+_compound_db_lock = threading.Lock()
+
+
+def get_compound_db() -> CompoundDatabase:
+    """Return the bundled compound database."""
+    global _compound_db
+    if _compound_db is None:
+        with _compound_db_lock:
+            if _compound_db is None:
+                _compound_db = CompoundDatabase(os.getenv("COMPOUND_DB_PATH", DEFAULT_DB_PATH))
+    return _compound_db
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the bundled compound database")
+    parser.add_argument("--seed", default=DEFAULT_SEED_PATH, help="tab-separated seed file")
+    parser.add_argument("--pubchem-dir", help="folder with PubChem FTP 'Extras' files; overrides --seed")
+    parser.add_argument("--cids", help="file with one CID per line, most common first")
+    parser.add_argument("--max-synonyms", type=int, default=20)
+    parser.add_argument("--output", default=DEFAULT_DB_PATH)
+    args = parser.parse_args()
+
+    if args.pubchem_dir:
+        cid_list = None
+        if args.cids:
+            with open(args.cids) as cid_file:
+                cid_list = [int(line) for line in cid_file if line.strip()]
+        source = read_pubchem_dump(args.pubchem_dir, cid_list, args.max_synonyms)
+    else:
+        source = read_seed_file(args.seed)
+
+    num_records, num_keys = write_database(args.output, source)
+    print(f"✅ Wrote {num_records} compounds ({num_keys} names) to {args.output}")
@@ -0,0 +1,96 @@
+"""
+Element Table Module
+Precomputed lookup table for chemical elements keyed by symbol, name and atomic number.
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+
+# Alternative spellings and historical names mapped to periodictable names
+ELEMENT_ALIASES = {
+    "aluminium": "aluminum",
+    "sulphur": "sulfur",
+    "caesium": "cesium",
+    "wolfram": "tungsten",
+}
+
+# Upper bound on ids accepted by one bulk lookup
+MAX_BULK_IDS = 200
+
+_table: Optional[Mapping[str, dict]] = None
+_table_lock = threading.Lock()
+
+
+def _build_table() -> Mapping[str, dict]:
+    """Create one serializable record per element and index it under every key."""
+    import periodictable
+
+    table: Dict[str, dict] = {}
+    by_name = {}
+    for el in periodictable.elements:
+        record = {
+            "name": el.name,
+            "symbol": el.symbol,
+            "number": el.number,
+            "mass": round(el.mass, 4),
+            "density": el.density if hasattr(el, "density") else "N/A",
+        }
+        table[el.symbol.lower()] = record
+        table[el.name.lower()] = record
+        table[str(el.number)] = record
+        by_name[el.name.lower()] = record
+
+    for alias, name in ELEMENT_ALIASES.items():
+        if name in by_name:
+            table[alias] = by_name[name]
+
+    return MappingProxyType(table)
+
+
+def get_element_table() -> Mapping[str, dict]:
+    """Return the read-only element table, building it on first call."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = _build_table()
+    return _table
+
+
+def lookup_element(key) -> Optional[dict]:
+    """
+    Find an element by symbol, name, alias or atomic number.
+
+    The returned record is shared by every caller and must not be modified.
+
+    Args:
+        key: Symbol ("Fe"), name ("iron"), alias ("sulphur") or number (26)
+
+    Returns:
+        The element record, or None if nothing matches
+    """
+    return get_element_table().get(str(key).strip().lower())
+
+
+def lookup_elements(keys: List[str]) -> Dict[str, list]:
+    """
+    Look up many elements at once.
+
+    Args:
+        keys: Symbols, names, aliases or atomic numbers
+
+    Returns:
+        Dictionary with the matched records in request order and the keys
+        that did not match
+    """
+    table = get_element_table()
+    elements = []
+    not_found = []
+    for key in keys:
+        record = table.get(key.strip().lower())
+        if record is None:
+            not_found.append(key)
+        else:
+            elements.append(record)
+    return {"elements": elements, "not_found": not_found}
@@ -0,0 +1,131 @@
+"""
+Embeddings Module
+Small CPU-only text embeddings from hashed word and character n-grams.
+
+No model download is needed: every feature is hashed into a fixed number of
+dimensions and the vector is L2-normalized, so the dot product of two
+embeddings is their cosine similarity.
+"""
+
+import re
+import zlib
+from typing import Iterable, List
+
+import numpy as np
+
+from search_index import STOP_WORDS, normalize_term, tokenize
+
+DEFAULT_DIM = 2048
+
+# Abbreviations spelled out before embedding, so "bcc" and "body-centered
+# cubic" end up close together
+ABBREVIATIONS = {
+    'bcc': 'body centered cubic',
+    'fcc': 'face centered cubic',
+    'hcp': 'hexagonal close packed',
+    'sc': 'simple cubic',
+    'apf': 'atomic packing factor',
+    'cte': 'coefficient thermal expansion',
+    'uts': 'ultimate tensile strength',
+    'ttt': 'time temperature transformation',
+    'cct': 'continuous cooling transformation',
+    'stp': 'standard temperature pressure',
+    'mw': 'molecular weight',
+}
+
+ABBREVIATION_PATTERN = re.compile(r"\b(" + "|".join(ABBREVIATIONS) + r")\b", re.IGNORECASE)
+
+# Question terms: decimals stay whole, one-character words are kept
+QUESTION_TOKEN_PATTERN = re.compile(r"\d+(?:\.\d+)?|[a-z0-9]+")
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+# Relative weights of the feature kinds
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.5
+CHAR_WEIGHT = 0.25
+
+
+def expand_abbreviations(text: str) -> str:
+    """Replace known abbreviations with their spelled-out form."""
+    return ABBREVIATION_PATTERN.sub(lambda m: ABBREVIATIONS[m.group(1).lower()], text)
+
+
+def question_terms(text: str) -> List[str]:
+    """
+    Terms of a short question. Unlike search_index.tokenize, numbers and
+    one-character words are kept: "2 moles" and "3 moles" differ.
+    """
+    return [
+        f"{float(word):g}" if word[0].isdigit() and NUMBER_PATTERN.fullmatch(word) else normalize_term(word)
+        for word in QUESTION_TOKEN_PATTERN.findall(expand_abbreviations(text).lower())
+        if word not in STOP_WORDS and word != "s"     # The "s" of "what's"
+    ]
+
+
+def numbers(text: str) -> List[float]:
+    """The numbers in a text, in order ("2.50" and "2.5" are equal)."""
+    return [float(number) for number in NUMBER_PATTERN.findall(text)]
+
+
+class HashingEmbedder:
+    """Maps text to unit vectors with the hashing trick over n-gram features."""
+
+    def __init__(self, dim: int = DEFAULT_DIM, char_ngram: int = 3, questions: bool = False):
+        """
+        Args:
+            dim: Number of dimensions features are hashed into
+            char_ngram: Length of the character n-grams taken from each word
+            questions: Embed question_terms() (numbers and one-character
+                words kept) instead of index terms
+        """
+        self.dim = dim
+        self.char_ngram = char_ngram
+        self.questions = questions
+        # feature -> (dimension, sign); words and n-grams repeat a lot when
+        # embedding a whole book
+        self._slots = {}
+
+    def _slot(self, feature: str):
+        slot = self._slots.get(feature)
+        if slot is None:
+            # crc32 is stable across processes (unlike hash()), so stored
+            # embeddings stay valid after a restart; one bit picks the sign
+            h = zlib.crc32(feature.encode('utf-8'))
+            slot = ((h >> 1) % self.dim, 1.0 if h & 1 else -1.0)
+            if len(self._slots) < 500000:
+                self._slots[feature] = slot
+        return slot
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed one text as a float32 unit vector (all zeros if it has no terms)."""
+        weights = {}
+
+        def add(feature: str, weight: float):
+            dim, sign = self._slot(feature)
+            weights[dim] = weights.get(dim, 0.0) + sign * weight
+
+        words = question_terms(text) if self.questions else tokenize(expand_abbreviations(text))
+        n = self.char_ngram
+        for i, word in enumerate(words):
+            add(f"w:{word}", WORD_WEIGHT)
+            if i:
+                add(f"b:{words[i - 1]} {word}", BIGRAM_WEIGHT)
+            padded = f" {word} "
+            for j in range(len(padded) - n + 1):
+                add(f"c:{padded[j:j + n]}", CHAR_WEIGHT)
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if weights:
+            vector[list(weights)] = list(weights.values())
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector /= norm
+        return vector
+
+    def embed_many(self, texts: Iterable[str]) -> np.ndarray:
+        """Embed several texts into the rows of a float32 matrix."""
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.embed(text)
+        return matrix
@@ -0,0 +1,86 @@
+"""
+Formula Cache Module
+Memoized chemical formula parsing shared by the calculator and the mass: command.
+"""
+
+import os
+import threading
+from typing import NamedTuple, Optional, Tuple
+
+from memory_cache import LRUCache
+
+
+class FormulaInfo(NamedTuple):
+    """Parsed formula with everything the calculators need."""
+    formula: str
+    molar_mass: float
+    # (symbol, atom count, mass contributed in g/mol) per element, in formula order
+    composition: Tuple[Tuple[str, float, float], ...]
+
+    @property
+    def atoms(self) -> dict:
+        """Atom counts keyed by element symbol."""
+        return {symbol: count for symbol, count, _ in self.composition}
+
+
+def normalize_formula(formula: str) -> str:
+    """Cache key for a formula: surrounding whitespace removed."""
+    return formula.strip()
+
+
+def _parse(formula) -> FormulaInfo:
+    import periodictable
+    compound = periodictable.formula(formula)
+    composition = tuple(
+        (element.symbol, count, element.mass * count)
+        for element, count in compound.atoms.items()
+    )
+    return FormulaInfo(str(formula), compound.mass, composition)
+
+
+class FormulaCache:
+    """Bounded cache from normalized formula string to FormulaInfo."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.cache = LRUCache(maxsize=maxsize)
+
+    def parse(self, formula: str) -> FormulaInfo:
+        """
+        Parse a formula, reusing the result for repeated formulas.
+
+        Raises:
+            Whatever periodictable raises for an invalid formula; failures
+            are not cached
+        """
+        if not isinstance(formula, str):
+            return _parse(formula)
+        key = normalize_formula(formula)
+        info = self.cache.get(key)
+        if info is None:
+            info = _parse(key)
+            self.cache.set(key, info)
+        return info
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        return self.cache.stats()
+
+
+# Shared instance, created on first use
+_formula_cache: Optional[FormulaCache] = None
+_formula_cache_lock = threading.Lock()
+
+
+def get_formula_cache() -> FormulaCache:
+    """Return the shared formula cache."""
+    global _formula_cache
+    if _formula_cache is None:
+        with _formula_cache_lock:
+            if _formula_cache is None:
+                _formula_cache = FormulaCache(int(os.getenv("FORMULA_CACHE_SIZE", 4096)))
+    return _formula_cache
+
+
+def parse_formula(formula: str) -> FormulaInfo:
+    """Parse a formula through the shared cache."""
+    return get_formula_cache().parse(formula)
@@ -0,0 +1,354 @@
+"""
+HTTP Client Module
+Shared outbound HTTP for PubChem and Gemini. Each service gets one pooled,
+thread-safe keep-alive client (so a TLS handshake is paid per connection,
+not per request) with timeouts, retries with jittered exponential backoff,
+and a circuit breaker that fails fast while the service keeps failing.
+
+Settings come from the environment, per service first and then for all
+services: PUBCHEM_HTTP_TIMEOUT, then HTTP_TIMEOUT, and so on.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+# Responses worth retrying: rate limited or a server-side failure
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_POOL_SIZE = 20
+DEFAULT_TIMEOUT = 10.0         # Seconds per attempt
+DEFAULT_RETRIES = 2            # Attempts after the first
+DEFAULT_BACKOFF = 0.25         # Seconds before the first retry (before jitter)
+DEFAULT_BACKOFF_CAP = 4.0
+DEFAULT_BREAKER_FAILURES = 5   # Consecutive failed calls that open the breaker
+DEFAULT_BREAKER_RESET = 30.0   # Seconds the breaker stays open
+
+# Per-service defaults that differ from the ones above
+SERVICE_DEFAULTS = {
+    "gemini": {"TIMEOUT": 30.0},   # Generating an answer takes seconds
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open."""
+
+
+def backoff_delay(attempt: int, base: float = DEFAULT_BACKOFF, cap: float = DEFAULT_BACKOFF_CAP) -> float:
+    """Seconds to wait before retry number attempt (0-based): full jitter over an exponential ceiling."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Closed while calls succeed. After failure_threshold consecutive
+    failures it opens and rejects calls for reset_timeout seconds, then
+    lets one trial call through (half open): success closes it again,
+    failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_BREAKER_FAILURES, reset_timeout: float = DEFAULT_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """"closed", "open" or "half_open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (claims the trial call when half open)."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+    def record_abandoned(self):
+        """
+        A call ended without an outcome (cancelled). It does not count
+        against the service, but an abandoned trial call reopens the
+        breaker rather than leaving it half open with the trial claimed.
+        """
+        with self._lock:
+            if self._trial:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+def _setting(service: str, name: str, default, kind=float):
+    """An HTTP setting for a service: {SERVICE}_HTTP_{NAME}, else HTTP_{NAME}, else the default."""
+    value = os.getenv(f"{service.upper()}_HTTP_{name}") or os.getenv(f"HTTP_{name}")
+    if value:
+        return kind(value)
+    return SERVICE_DEFAULTS.get(service, {}).get(name, default)
+
+
+class HttpService:
+    """Pooled HTTP clients, retry policy and circuit breaker for one upstream service."""
+
+    def __init__(self, name: str, pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 backoff_cap: float = DEFAULT_BACKOFF_CAP, breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            name: Service name, used in errors and stats
+            pool_size: Connections kept open to the service (per client)
+            timeout: Seconds per attempt
+            retries: Attempts after the first for connection errors, timeouts and RETRY_STATUSES
+            backoff: Base delay before a retry; doubles per retry, with full jitter
+            backoff_cap: Longest delay before a retry
+            breaker: Circuit breaker (a new one by default)
+        """
+        self.name = name
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker or CircuitBreaker()
+        self._client = None
+        self._async_client = None
+        self._async_loop = None
+        self._closing = set()
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "retries": 0, "failures": 0}
+
+    # ==================== CLIENTS ====================
+
+    def client_args(self) -> dict:
+        """Keyword arguments for an httpx client with this service's pool size and timeout."""
+        import httpx
+        return {
+            "limits": httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            "timeout": self.timeout,
+            "follow_redirects": True,
+        }
+
+    @property
+    def client(self):
+        """The shared httpx.Client (thread-safe; created on first use)."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import httpx
+                    self._client = httpx.Client(**self.client_args())
+        return self._client
+
+    @property
+    def async_client(self):
+        """The shared httpx.AsyncClient for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            import httpx
+            # Async clients are bound to the loop that first uses them
+            if self._async_client is not None:
+                self._discard_async_client()
+            self._async_client = httpx.AsyncClient(**self.client_args())
+            self._async_loop = loop
+        return self._async_client
+
+    def _discard_async_client(self):
+        """Close the pooled connections of the async client of a loop no longer used."""
+        client, loop = self._async_client, self._async_loop
+        self._async_client = self._async_loop = None
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+
+        async def close():
+            try:
+                await client.aclose()
+            except RuntimeError:
+                pass                              # The old loop is closed; its sockets are closed regardless
+
+        task = asyncio.get_running_loop().create_task(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def close(self):
+        """Close the pooled connections."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self):
+        """Close the async client's pooled connections."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    # ==================== REQUESTS ====================
+
+    def get(self, url: str, **kwargs):
+        """GET with retries and the circuit breaker; returns the final httpx.Response."""
+        return self.request("GET", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs):
+        """
+        Send a request, retrying connection errors, timeouts and
+        RETRY_STATUSES with jittered backoff.
+
+        Raises:
+            CircuitOpenError: While the breaker is open
+            httpx.HTTPError: When the last attempt fails to connect or times out
+        """
+        import httpx
+        self._admit()
+        with self._outcome():
+            for attempt in range(self.retries + 1):
+                try:
+                    response = self.client.request(method, url, **kwargs)
+                except httpx.TransportError:
+                    if attempt == self.retries:
+                        raise
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                        self._finished(response)
+                        return response
+                self._count("retries")
+                time.sleep(backoff_delay(attempt, self.backoff, self.backoff_cap))
+
+    async def get_async(self, url: str, **kwargs):
+        """get() on the async client."""
+        return await self.request_async("GET", url, **kwargs)
+
+    async def request_async(self, method: str, url: str, **kwargs):
+        """request() on the async client."""
+        import httpx
+        self._admit()
+        with self._outcome():
+            for attempt in range(self.retries + 1):
+                try:
+                    response = await self.async_client.request(method, url, **kwargs)
+                except httpx.TransportError:
+                    if attempt == self.retries:
+                        raise
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                        self._finished(response)
+                        return response
+                self._count("retries")
+                await asyncio.sleep(backoff_delay(attempt, self.backoff, self.backoff_cap))
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a call that does its own HTTP (an SDK method) under the circuit
+        breaker: any exception counts as a failure.
+        """
+        self._admit()
+        with self._outcome():
+            result = fn(*args, **kwargs)
+        self.breaker.record_success()
+        return result
+
+    async def call_async(self, fn: Callable, *args, **kwargs) -> Any:
+        """call() for a coroutine function."""
+        self._admit()
+        with self._outcome():
+            result = await fn(*args, **kwargs)
+        self.breaker.record_success()
+        return result
+
+    def _admit(self):
+        self._count("requests")
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open), try again shortly")
+
+    @contextmanager
+    def _outcome(self):
+        """Settle the breaker for an admitted call that raises: any exception is a failure, a cancellation abandons it."""
+        try:
+            yield
+        except Exception:
+            self._failed()
+            raise
+        except BaseException:
+            self.breaker.record_abandoned()
+            raise
+
+    def _finished(self, response):
+        # Client errors (404 for an unknown compound) mean the service is up
+        if response.status_code >= 500 or response.status_code == 429:
+            self._failed()
+        else:
+            self.breaker.record_success()
+
+    def _failed(self):
+        self._count("failures")
+        self.breaker.record_failure()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self) -> dict:
+        """Request, retry and failure counts and the breaker state."""
+        with self._lock:
+            counts = dict(self._counts)
+        return {**counts, "pool_size": self.pool_size, "breaker": self.breaker.stats()}
+
+
+# Shared services by name, created on first use
+_services: Dict[str, HttpService] = {}
+_services_lock = threading.Lock()
+
+
+def get_http_service(name: str) -> HttpService:
+    """Return the shared HTTP service for an upstream ("pubchem", "gemini"), configured from the environment."""
+    service = _services.get(name)
+    if service is None:
+        with _services_lock:
+            service = _services.get(name)
+            if service is None:
+                service = _services[name] = HttpService(
+                    name,
+                    pool_size=_setting(name, "POOL_SIZE", DEFAULT_POOL_SIZE, int),
+                    timeout=_setting(name, "TIMEOUT", DEFAULT_TIMEOUT),
+                    retries=_setting(name, "RETRIES", DEFAULT_RETRIES, int),
+                    backoff=_setting(name, "BACKOFF", DEFAULT_BACKOFF),
+                    breaker=CircuitBreaker(
+                        failure_threshold=_setting(name, "BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES, int),
+                        reset_timeout=_setting(name, "BREAKER_RESET", DEFAULT_BREAKER_RESET),
+                    ),
+                )
+    return service
+
+
+def http_stats() -> dict:
+    """stats() of every service used so far."""
+    return {name: service.stats() for name, service in list(_services.items())}
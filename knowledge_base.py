@@ -4,14 +4,34 @@ Provides search and retrieval functionality for the materials science textbook.
 """
 
 import os
-import re
-from typing import List, Dict, Optional
+import threading
+import time
+from bisect import bisect_right
+from typing import Iterator, List, Dict, Optional, Tuple
+
+from retrieval import reciprocal_rank_fusion
+from search_index import BM25Index, load_or_build_index, source_checksum, tokenize
+from textbook_toc import TableOfContents
+from vector_index import VectorIndex, load_or_build_vectors
 
 class TextbookKnowledgeBase:
     def __init__(self, textbook_path: str = "materials-science-textbook.txt"):
         """Initialize the knowledge base with the textbook."""
         self.textbook_path = textbook_path
+        self.name = os.path.basename(textbook_path)
         self.content = None
+        self.lines: List[str] = []
+        self.lines_lower: List[str] = []
+        self.line_offsets: List[int] = []
+        self._content_lower = ""
+        self._lower_offsets: List[int] = []
+        self._line_table_ready = False
+        self._line_table_lock = threading.Lock()
+        self.index: Optional[BM25Index] = None
+        self._vectors: Optional[VectorIndex] = None
+        self._vectors_lock = threading.Lock()
+        self._toc: Optional[TableOfContents] = None
+        self._toc_lock = threading.Lock()
         self.load_textbook()
     
     def load_textbook(self):
@@ -20,13 +40,64 @@ class TextbookKnowledgeBase:
             if os.path.exists(self.textbook_path):
                 with open(self.textbook_path, 'r', encoding='utf-8', errors='ignore') as f:
                     self.content = f.read()
-                print(f"✅ Loaded textbook: {len(self.content)} characters")
+                print(f"✅ Loaded {self.name}: {len(self.content)} characters")
             else:
                 print(f"⚠️ Textbook not found at {self.textbook_path}")
                 self.content = ""
         except Exception as e:
             print(f"❌ Error loading textbook: {e}")
             self.content = ""
+        self._line_table_ready = False
+        self._vectors = None
+        self._toc = None
+        self.index = load_or_build_index(self.textbook_path, self.content)
+    
+    def _ensure_line_table(self):
+        """Build the line table on first use; ranked search never needs it."""
+        if self._line_table_ready:
+            return
+        with self._line_table_lock:
+            if not self._line_table_ready:
+                self._build_line_table()
+                self._line_table_ready = True
+    
+    def _build_line_table(self):
+        """Split and lowercase the textbook once so searches never redo it."""
+        self.lines = self.content.split('\n')
+        self.lines_lower = [line.lower() for line in self.lines]
+        
+        # Start offset of every line in the original text
+        self.line_offsets = []
+        offset = 0
+        for line in self.lines:
+            self.line_offsets.append(offset)
+            offset += len(line) + 1
+        
+        # Lowercasing can change the length of some characters, so the
+        # lowercased text keeps its own offsets for mapping hits to lines
+        self._content_lower = '\n'.join(self.lines_lower)
+        self._lower_offsets = []
+        offset = 0
+        for line in self.lines_lower:
+            self._lower_offsets.append(offset)
+            offset += len(line) + 1
+    
+    def _matching_lines(self, needle_lower: str) -> Iterator[int]:
+        """Yield the index of every line containing needle_lower, in order."""
+        if not needle_lower or '\n' in needle_lower:
+            return
+        
+        self._ensure_line_table()
+        haystack = self._content_lower
+        offsets = self._lower_offsets
+        pos = haystack.find(needle_lower)
+        while pos != -1:
+            i = bisect_right(offsets, pos) - 1
+            yield i
+            # Skip to the next line: one hit per line is enough
+            if i + 1 >= len(offsets):
+                return
+            pos = haystack.find(needle_lower, offsets[i + 1])
     
     def search_keyword(self, keyword: str, context_lines: int = 5, max_results: int = 3) -> List[Dict[str, str]]:
         """
@@ -44,27 +115,106 @@ class TextbookKnowledgeBase:
             return []
         
         results = []
-        lines = self.content.split('\n')
-        keyword_lower = keyword.lower()
-        
-        for i, line in enumerate(lines):
-            if keyword_lower in line.lower():
-                # Get context around the match
-                start = max(0, i - context_lines)
-                end = min(len(lines), i + context_lines + 1)
-                context = '\n'.join(lines[start:end])
-                
-                results.append({
-                    'line_number': i + 1,
-                    'matched_line': line.strip(),
-                    'context': context.strip()
-                })
-                
-                if len(results) >= max_results:
-                    break
+        self._ensure_line_table()
+        lines = self.lines
+        
+        for i in self._matching_lines(keyword.lower()):
+            # Get context around the match
+            start = max(0, i - context_lines)
+            end = min(len(lines), i + context_lines + 1)
+            context = '\n'.join(lines[start:end])
+            
+            results.append({
+                'line_number': i + 1,
+                'matched_line': lines[i].strip(),
+                'context': context.strip(),
+                'document': self.name
+            })
+            
+            if len(results) >= max_results:
+                break
         
         return results
     
+    def ranked_search(self, query: str, top_k: int = 3) -> List[Dict]:
+        """
+        Return the passages that best match all terms of the query.
+        
+        Args:
+            query: User's question or search query
+            top_k: Maximum number of passages to return
+            
+        Returns:
+            List of dictionaries with line number, best matching line,
+            passage context, BM25 score and document name, best match first
+        """
+        if not self.index:
+            return []
+        
+        return self._format_hits(query, self.index.search(query, top_k=top_k))
+    
+    @property
+    def vectors(self) -> Optional[VectorIndex]:
+        """Chunk embeddings for vector_search(), loaded on first use."""
+        if self._vectors is None and self.content:
+            with self._vectors_lock:
+                if self._vectors is None:
+                    self._vectors = load_or_build_vectors(self.textbook_path, self.content)
+        return self._vectors
+    
+    def vector_search(self, query: str, top_k: int = 3) -> List[Dict]:
+        """
+        Return the overlapping chunks closest in meaning to the query.
+        
+        Args:
+            query: User's question or search query
+            top_k: Maximum number of chunks to return
+            
+        Returns:
+            Same shape as ranked_search(), scored by cosine similarity
+        """
+        if not self.vectors:
+            return []
+        return self._format_hits(query, self.vectors.search(query, top_k=top_k))
+    
+    def hybrid_search(self, query: str, top_k: int = 5, candidates: int = 10) -> List[Dict]:
+        """
+        Combine keyword and vector search with reciprocal-rank fusion.
+        
+        Args:
+            query: User's question or search query
+            top_k: Maximum number of passages to return
+            candidates: Results taken from each search before fusing
+            
+        Returns:
+            Same shape as ranked_search(), scored by fused rank, with
+            overlapping passages merged and a 'sources' list per result
+        """
+        fused = reciprocal_rank_fusion({
+            'bm25': self.ranked_search(query, top_k=candidates),
+            'vector': self.vector_search(query, top_k=candidates),
+        })
+        return fused[:top_k]
+    
+    def _format_hits(self, query: str, hits: List[Dict]) -> List[Dict]:
+        """Turn index hits into search results with the best matching line."""
+        query_terms = set(tokenize(query))
+        results = []
+        for hit in hits:
+            passage_lines = hit['text'].split('\n')
+            matched_line = next(
+                (line for line in passage_lines if query_terms.intersection(tokenize(line))),
+                passage_lines[0]
+            )
+            results.append({
+                'line_number': hit['line_number'],
+                'matched_line': matched_line.strip(),
+                'context': hit['text'],
+                'score': hit['score'],
+                'document': self.name
+            })
+        return results
+    
     def search_topics(self, topics: List[str]) -> Dict[str, List[Dict]]:
         """
         Search for multiple topics and return organized results.
@@ -77,40 +227,36 @@ class TextbookKnowledgeBase:
         """
         topic_results = {}
         for topic in topics:
-            results = self.search_keyword(topic, context_lines=3, max_results=2)
+            results = self.ranked_search(topic, top_k=2)
             if results:
                 topic_results[topic] = results
         return topic_results
     
+    @property
+    def toc(self) -> TableOfContents:
+        """Chapter/section tree of the textbook, parsed on first use."""
+        if self._toc is None:
+            with self._toc_lock:
+                if self._toc is None:
+                    self._toc = TableOfContents.parse(self.content or "")
+        return self._toc
+    
     def find_section(self, section_name: str) -> Optional[str]:
         """
         Find a specific section or chapter in the textbook.
         
         Args:
-            section_name: Name of the section to find
+            section_name: Section number ("3.4", "chapter 3", "table 3.1")
+                or title, which may be partial or slightly misspelled
             
         Returns:
-            The section content or None if not found
+            The whole section content or None if not found
         """
         if not self.content:
             return None
         
-        # Look for section headers (common patterns)
-        patterns = [
-            rf"(?i)^{re.escape(section_name)}\s*$",
-            rf"(?i)^Chapter.*{re.escape(section_name)}",
-            rf"(?i)^Section.*{re.escape(section_name)}",
-        ]
-        
-        lines = self.content.split('\n')
-        for i, line in enumerate(lines):
-            for pattern in patterns:
-                if re.search(pattern, line):
-                    # Return the next 20 lines as the section content
-                    end = min(len(lines), i + 20)
-                    return '\n'.join(lines[i:end])
-        
-        return None
+        entry = self.toc.resolve(section_name)
+        return self.toc.text(entry) if entry else None
     
     def get_material_properties(self, material: str) -> Optional[str]:
         """
@@ -122,25 +268,37 @@ class TextbookKnowledgeBase:
         Returns:
             Information about the material's properties
         """
+        # Tabulated values from Appendix B first (an indexed lookup)
+        from materials_db import format_value, get_materials_db
+        found = get_materials_db().lookup(material)
+        if found:
+            return '\n'.join(
+                f"{row['material']}{' (' + row['condition'] + ')' if row['condition'] else ''} - "
+                f"{row['property'].replace('_', ' ')}: {format_value(row)} [{row['source']}]"
+                for row in found['properties']
+            )
+
+        if not self.content:
+            return None
+        
         # Search for material with key property terms
         property_terms = ['density', 'strength', 'modulus', 'hardness', 'structure']
         results = []
         
-        lines = self.content.split('\n')
-        material_lower = material.lower()
-        
-        for i, line in enumerate(lines):
-            if material_lower in line.lower():
-                # Check if any property terms are nearby
-                context_start = max(0, i - 2)
-                context_end = min(len(lines), i + 3)
-                context_lines = lines[context_start:context_end]
-                context_text = ' '.join(context_lines).lower()
-                
-                if any(term in context_text for term in property_terms):
-                    results.append('\n'.join(context_lines))
-                    if len(results) >= 2:
-                        break
+        self._ensure_line_table()
+        lines = self.lines
+        lines_lower = self.lines_lower
+        
+        for i in self._matching_lines(material.lower()):
+            # Check if any property terms are nearby
+            context_start = max(0, i - 2)
+            context_end = min(len(lines), i + 3)
+            context_text = ' '.join(lines_lower[context_start:context_end])
+            
+            if any(term in context_text for term in property_terms):
+                results.append('\n'.join(lines[context_start:context_end]))
+                if len(results) >= 2:
+                    break
         
         return '\n\n---\n\n'.join(results) if results else None
     
@@ -154,24 +312,9 @@ class TextbookKnowledgeBase:
         Returns:
             Relevant excerpt from the textbook
         """
-        if not self.content:
-            return None
-        
-        # Extract key terms from query (remove common words)
-        stop_words = {'what', 'is', 'are', 'the', 'a', 'an', 'how', 'why', 'when', 
-                      'where', 'which', 'about', 'of', 'in', 'on', 'to', 'for'}
-        
-        words = query.lower().split()
-        keywords = [w for w in words if w not in stop_words and len(w) > 2]
-        
-        if not keywords:
-            return None
-        
-        # Search for the most relevant keyword
-        for keyword in keywords:
-            results = self.search_keyword(keyword, context_lines=5, max_results=1)
-            if results:
-                return results[0]['context']
+        results = self.ranked_search(query, top_k=1)
+        if results:
+            return results[0]['context']
         
         return None
     
@@ -200,5 +343,206 @@ class TextbookKnowledgeBase:
         return response.strip()
 
 
-# Global instance for easy import
-textbook_kb = TextbookKnowledgeBase()
+# File types picked up from the documents directory
+DOCUMENT_EXTENSIONS = ('.txt', '.md')
+
+# (mtime_ns, size, checksum) of a document file when it was indexed
+Signature = Tuple[int, int, bytes]
+
+
+class KnowledgeLibrary:
+    """
+    Searches the textbook together with every document in a directory.
+
+    Each document keeps its own persisted BM25 and vector indexes, so a
+    refresh only re-reads files whose mtime or size changed and only
+    re-indexes those whose text did. The new set of documents is built on
+    the side and swapped in with a single assignment: searches already
+    running finish on the old set and never wait for a refresh.
+    """
+
+    def __init__(self, textbook: TextbookKnowledgeBase, directory: Optional[str] = None,
+                 poll_interval: float = 30.0):
+        self.textbook = textbook
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._documents: Dict[str, TextbookKnowledgeBase] = {textbook.textbook_path: textbook}
+        self._signatures: Dict[str, Signature] = {}
+        self._refresh_lock = threading.Lock()
+        self._last_check = 0.0
+        self.refresh()
+
+    @property
+    def documents(self) -> Dict[str, TextbookKnowledgeBase]:
+        """Current documents keyed by path (a snapshot; never mutated)."""
+        return self._documents
+
+    def _scan(self) -> List[str]:
+        """Paths of the textbook and of every document in the directory."""
+        paths = [self.textbook.textbook_path]
+        if self.directory and os.path.isdir(self.directory):
+            for name in sorted(os.listdir(self.directory)):
+                path = os.path.join(self.directory, name)
+                if name.lower().endswith(DOCUMENT_EXTENSIONS) and os.path.isfile(path):
+                    paths.append(path)
+        return paths
+
+    def refresh(self) -> Dict[str, List[str]]:
+        """
+        Index new and changed documents, drop deleted ones, and make the
+        result live.
+
+        Returns:
+            Names of the documents 'added', 'updated' and 'removed'
+        """
+        changes = {'added': [], 'updated': [], 'removed': []}
+        with self._refresh_lock:
+            self._last_check = time.monotonic()
+            current = self._documents
+            documents: Dict[str, TextbookKnowledgeBase] = {}
+            signatures: Dict[str, Signature] = {}
+            for path in self._scan():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                old = current.get(path)
+                old_signature = self._signatures.get(path)
+                if old and old_signature and old_signature[:2] == (stat.st_mtime_ns, stat.st_size):
+                    documents[path], signatures[path] = old, old_signature
+                    continue
+
+                if old and old_signature is None:
+                    # Loaded before the library existed (the textbook): adopt it
+                    documents[path] = old
+                    signatures[path] = (stat.st_mtime_ns, stat.st_size, source_checksum(old.content or ""))
+                    continue
+
+                document = TextbookKnowledgeBase(path)
+                checksum = source_checksum(document.content or "")
+                if old and old_signature[2] == checksum:
+                    document = old                 # Touched but unchanged
+                else:
+                    # Build the vectors now so the first search after the
+                    # swap does not pay for it
+                    document.vectors
+                    changes['updated' if old else 'added'].append(document.name)
+                documents[path] = document
+                signatures[path] = (stat.st_mtime_ns, stat.st_size, checksum)
+
+            changes['removed'] = [doc.name for path, doc in current.items() if path not in documents]
+            self.textbook = documents.get(self.textbook.textbook_path, self.textbook)
+            self._documents, self._signatures = documents, signatures
+
+        if any(changes.values()):
+            print(f"📚 Knowledge base refreshed: {changes}")
+        return changes
+
+    def maybe_refresh(self):
+        """Start a background refresh when the poll interval has passed."""
+        if self.poll_interval <= 0 or time.monotonic() - self._last_check < self.poll_interval:
+            return
+        if self._refresh_lock.locked():
+            return
+        self._last_check = time.monotonic()
+        threading.Thread(target=self.refresh, daemon=True).start()
+
+    def _search(self, method: str, query: str, top_k: int) -> List[Dict]:
+        self.maybe_refresh()
+        rankings = {
+            document.name: getattr(document, method)(query, top_k=top_k)
+            for document in self._documents.values()
+        }
+        if len(rankings) == 1:
+            return next(iter(rankings.values()))
+        # Scores are only comparable within a document (BM25 depends on each
+        # one's term statistics), so documents are merged by rank
+        return reciprocal_rank_fusion(rankings)[:top_k]
+
+    def ranked_search(self, query: str, top_k: int = 3) -> List[Dict]:
+        """
+        Best BM25 passages across all documents, merged by rank; see
+        TextbookKnowledgeBase.ranked_search().
+        """
+        return self._search('ranked_search', query, top_k)
+
+    def vector_search(self, query: str, top_k: int = 3) -> List[Dict]:
+        """Closest chunks across all documents, merged by rank; see TextbookKnowledgeBase.vector_search()."""
+        return self._search('vector_search', query, top_k)
+
+    def hybrid_search(self, query: str, top_k: int = 5, candidates: int = 10) -> List[Dict]:
+        """Keyword and vector results across all documents, fused by rank."""
+        fused = reciprocal_rank_fusion({
+            'bm25': self.ranked_search(query, top_k=candidates),
+            'vector': self.vector_search(query, top_k=candidates),
+        })
+        return fused[:top_k]
+
+    def smart_search(self, query: str) -> Optional[str]:
+        """Best matching passage from any document."""
+        results = self.ranked_search(query, top_k=1)
+        return results[0]['context'] if results else None
+
+    def label_documents(self, results: List[Dict]) -> List[Dict]:
+        """Prefix the context of results from documents other than the textbook with their name."""
+        return [
+            result if result['document'] == self.textbook.name
+            else {**result, 'context': f"[{result['document']}]\n{result['context']}"}
+            for result in results
+        ]
+
+    def format_response(self, search_results: List[Dict], query: str) -> str:
+        """Format search results like the textbook does, naming other documents."""
+        return self.textbook.format_response(self.label_documents(search_results), query)
+
+    def stats(self) -> List[Dict]:
+        """Name, size and modification time (as indexed) of each document."""
+        signatures = self._signatures
+        return [{
+            'document': document.name,
+            'path': path,
+            'characters': len(document.content or ""),
+            'modified': signatures[path][0] / 1e9 if path in signatures else None,
+        } for path, document in self._documents.items()]
+
+
+# Shared instance, created on first use so importing this module stays cheap
+_textbook_kb: Optional[TextbookKnowledgeBase] = None
+_textbook_kb_lock = threading.Lock()
+
+
+def get_textbook_kb() -> TextbookKnowledgeBase:
+    """Return the shared knowledge base, loading the textbook on first call."""
+    global _textbook_kb
+    if _library is not None:
+        return _library.textbook  # The latest version after a hot reload
+    if _textbook_kb is None:
+        with _textbook_kb_lock:
+            if _textbook_kb is None:
+                _textbook_kb = TextbookKnowledgeBase()
+    return _textbook_kb
+
+
+_library: Optional[KnowledgeLibrary] = None
+_library_lock = threading.Lock()
+
+
+def get_knowledge_library() -> KnowledgeLibrary:
+    """Return the shared library of the textbook and the documents directory."""
+    global _library
+    if _library is None:
+        with _library_lock:
+            if _library is None:
+                _library = KnowledgeLibrary(
+                    get_textbook_kb(),
+                    os.getenv("DOCUMENTS_DIR", "documents"),
+                    float(os.getenv("DOCUMENTS_POLL_SECONDS", 30)),
+                )
+    return _library
+
+
+def __getattr__(name):
+    # Keeps `from knowledge_base import textbook_kb` working
+    if name == "textbook_kb":
+        return get_textbook_kb()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,19 @@
+import json
 import os
-from flask import Flask, request, jsonify, render_template_string
+from urllib.parse import quote
+from flask import Flask, Response, request, jsonify, render_template_string
 from dotenv import load_dotenv
-import periodictable
-import pubchempy as pcp
-import numpy as np
-from knowledge_base import textbook_kb
-from chemistry_calculator import calculator
-from ai_assistant import ai_assistant
+from element_table import MAX_BULK_IDS, lookup_element, lookup_elements
+from compound_cache import get_compound_cache
+from compound_db import get_compound_db
+from materials_db import format_value, get_materials_db, parse_property_query
+from formula_cache import get_formula_cache, parse_formula
+from http_client import get_http_service, http_stats
+from background_tasks import get_task_store
+from command_router import Intent, IntentTable, PrefixTrie
+from request_executor import current_request, request_scope
+from response_cache import get_response_cache
+from session_store import Session, get_session_store
 
 # Load environment variables
 load_dotenv()
@@ -14,6 +21,33 @@ load_dotenv()
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "default-secret-key")
 
+# ──────────────────────────────────────────────
+# Lazily Loaded Services
+# ──────────────────────────────────────────────
+# The textbook, calculator and Gemini client (and the heavy libraries behind
+# them) are only imported when a request first needs them, which keeps
+# serverless cold starts short for routes that never touch them.
+
+def get_textbook_kb():
+    """Return the shared textbook knowledge base."""
+    from knowledge_base import get_textbook_kb as load_textbook_kb
+    return load_textbook_kb()
+
+def get_knowledge_library():
+    """Return the shared library of the textbook and other reference documents."""
+    from knowledge_base import get_knowledge_library as load_knowledge_library
+    return load_knowledge_library()
+
+def get_calculator():
+    """Return the shared chemistry calculator."""
+    from chemistry_calculator import get_calculator as load_calculator
+    return load_calculator()
+
+def get_ai_assistant():
+    """Return the shared AI assistant."""
+    from ai_assistant import get_ai_assistant as load_ai_assistant
+    return load_ai_assistant()
+
 # ──────────────────────────────────────────────
 # Chemistry Helper Functions
 # ──────────────────────────────────────────────
@@ -21,44 +55,88 @@ app.secret_key = os.getenv("SECRET_KEY", "default-secret-key")
 def get_element_info(symbol_or_name):
     """Retrieve information about a chemical element."""
     try:
-        for el in periodictable.elements:
-            if el.symbol.lower() == symbol_or_name.lower() or el.name.lower() == symbol_or_name.lower():
-                return {
-                    "name": el.name,
-                    "symbol": el.symbol,
-                    "number": el.number,
-                    "mass": round(el.mass, 4),
-                    "density": el.density if hasattr(el, "density") else "N/A",
-                }
-        return None
+        return lookup_element(symbol_or_name)
     except Exception as e:
         return {"error": str(e)}
 
+# PubChem PUG REST: the fields of a compound record, looked up by name
+PUBCHEM_PROPERTIES_URL = ("https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/name/{name}/property/"
+                          "IUPACName,MolecularFormula,MolecularWeight,IsomericSMILES/JSON")
+
+def pubchem_properties_url(compound_name):
+    """PUG REST URL for a compound's record fields."""
+    return PUBCHEM_PROPERTIES_URL.format(name=quote(compound_name, safe=""))
+
+def pubchem_record(response, compound_name):
+    """Compound record from a PUG REST properties response; None if PubChem does not know the name."""
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    properties = response.json()["PropertyTable"]["Properties"]
+    if not properties:
+        return None
+    compound = properties[0]
+    return {
+        "name": compound.get("IUPACName") or compound_name,
+        "molecular_formula": compound.get("MolecularFormula"),
+        "molecular_weight": float(compound["MolecularWeight"]) if compound.get("MolecularWeight") else None,
+        # Newer PubChem responses call the isomeric SMILES just "SMILES"
+        "smiles": compound.get("IsomericSMILES") or compound.get("SMILES"),
+        "cid": compound.get("CID"),
+    }
+
+def fetch_compound_from_pubchem(compound_name):
+    """Look up a compound on PubChem over the shared keep-alive connection pool; None if unknown."""
+    response = get_http_service("pubchem").get(pubchem_properties_url(compound_name))
+    return pubchem_record(response, compound_name)
+
 def get_compound_info(compound_name):
-    """Retrieve information about a chemical compound from PubChem."""
+    """Retrieve information about a chemical compound, cached in front of PubChem."""
     try:
-        results = pcp.get_compounds(compound_name, "name")
-        if results:
-            compound = results[0]
-            return {
-                "name": compound.iupac_name or compound_name,
-                "molecular_formula": compound.molecular_formula,
-                "molecular_weight": compound.molecular_weight,
-                "smiles": compound.isomeric_smiles,
-                "cid": compound.cid,
-            }
-        return None
+        # Common compounds are served from the bundled database without a network call
+        info = get_compound_db().lookup(compound_name)
+        if info:
+            return info
+        return get_compound_cache().get(compound_name, fetch_compound_from_pubchem)
     except Exception as e:
         return {"error": str(e)}
 
 def calculate_molar_mass(formula):
     """Calculate the molar mass of a chemical formula."""
     try:
-        f = periodictable.formula(formula)
-        return round(f.mass, 4)
+        return round(parse_formula(formula).molar_mass, 4)
     except Exception as e:
         return {"error": str(e)}
 
+def get_material_response(query):
+    """Answer a material: command from the Appendix B tables, else the textbook."""
+    db = get_materials_db()
+    parsed = parse_property_query(query)
+    if parsed:
+        rows = db.query(parsed["property"], parsed["minimum"], parsed["maximum"], parsed["category"], limit=15)
+        if not rows:
+            return f"🔍 No tabulated materials match '{query}'."
+        lines = [
+            f"• {row['material']}{' (' + row['condition'] + ')' if row['condition'] else ''}: {format_value(row)}"
+            for row in rows
+        ]
+        return f"🧱 <b>{parsed['property'].replace('_', ' ').title()}</b> ({rows[0]['source']})<br>" + "<br>".join(lines)
+
+    info = db.lookup(query)
+    if info:
+        lines = [
+            f"• {row['property'].replace('_', ' ')}"
+            f"{' (' + row['condition'] + ')' if row['condition'] else ''}: {format_value(row)}"
+            for row in info["properties"][:25]
+        ]
+        return f"🧱 <b>{info['material']}</b> ({info['category']})<br>" + "<br>".join(lines)
+
+    library = get_knowledge_library()
+    results = library.ranked_search(query, top_k=2)
+    if results:
+        return library.format_response(results, query)
+    return f"🔍 No results found in textbook for '{query}'. Try different keywords or ask a general question!"
+
 # ──────────────────────────────────────────────
 # Chat Function
 # ──────────────────────────────────────────────
@@ -84,82 +162,84 @@ You have access to a comprehensive Materials Science and Engineering textbook th
 Always be accurate, educational, and encouraging. Use emojis to make learning fun!
 If you're unsure about something, say so rather than guessing."""
 
-def get_chat_response(user_message, conversation_history=None):
+def get_chat_response(user_message, conversation_history=None, use_cache=True):
     """Get a response from the chatbot with AI or built-in knowledge."""
     if conversation_history is None:
         conversation_history = []
 
-    lower_msg = user_message.lower()
+    ai_assistant = get_ai_assistant()
     
     # Try AI assistant first for comprehensive answers
     if ai_assistant.is_available():
-        ai_response = ai_assistant.generate_response(user_message, conversation_history)
+        ai_response = ai_assistant.generate_response(user_message, conversation_history, use_cache)
         if ai_response:
             return ai_response
     
     # Fall back to pattern-based responses if AI unavailable
+    return get_fallback_response(user_message)
+
+def get_fallback_response(user_message):
+    """Get a pattern-based response from built-in knowledge (no AI)."""
+    response = FALLBACK_INTENTS.respond(user_message)
+    if response is not None:
+        return response
+
+    # Try searching the textbook as a fallback (shared with the materials
+    # intent's search within a request)
+    textbook_result = current_request().run("textbook_search", get_knowledge_library().smart_search, user_message)
+    if textbook_result:
+        return f"📚 <b>From Materials Science Textbook:</b><br><br>{textbook_result[:700]}..."
     
-    # Materials Science topics - check textbook first
-    materials_keywords = ['material', 'steel', 'alloy', 'crystal structure', 'fcc', 'bcc', 
-                          'hcp', 'ceramic', 'polymer', 'composite', 'stress', 'strain',
-                          'modulus', 'elasticity', 'plasticity', 'hardness', 'tensile',
-                          'phase diagram', 'microstructure', 'grain', 'dislocation',
-                          'annealing', 'quenching', 'tempering', 'diffusion', 'corrosion',
-                          'fracture', 'fatigue', 'creep', 'iron-carbon', 'aluminum oxide',
-                          'silicon carbide', 'thermal properties', 'electrical properties']
-    
-    # Check if query is about materials science
-    if any(keyword in lower_msg for keyword in materials_keywords):
-        textbook_result = textbook_kb.smart_search(user_message)
-        if textbook_result:
-            return f"📚 <b>From Materials Science & Engineering Textbook:</b><br><br>{textbook_result[:800]}..."
-    
-    # Water/H2O questions
-    if "water" in lower_msg or "h2o" in lower_msg or "h₂o" in lower_msg:
-        return "💧 <b>Water (H₂O)</b> is a chemical compound made of two hydrogen atoms and one oxygen atom. It's essential for life, has a bent molecular shape (104.5° bond angle), and is an excellent solvent. Molecular weight: 18.015 g/mol. Try 'compound: water' for more details!"
-    
-    # Hydrogen questions
-    elif ("hydrogen" in lower_msg or "h" == lower_msg.strip()) and not lower_msg.startswith("element:"):
-        return "🫧 <b>Hydrogen (H)</b> is the lightest and most abundant element in the universe! It's a colorless, odorless, highly flammable gas. Atomic number: 1, Atomic mass: 1.008 u. It forms water when combined with oxygen. Try 'element: hydrogen' for complete details!"
-    
-    # Periodic table questions
-    elif "periodic table" in lower_msg:
-        return "📋 <b>The Periodic Table</b> organizes all 118 known chemical elements by atomic number, electron configuration, and recurring chemical properties. Elements are arranged in rows (periods) and columns (groups/families). It was created by Dmitri Mendeleev in 1869. Use 'element: [name]' to learn about specific elements!"
-    
-    # Balance/equation questions
-    elif "balance" in lower_msg or "equation" in lower_msg:
-        if "fe" in lower_msg and "o2" in lower_msg:
-            return "⚖️ To balance <b>Fe + O₂ → Fe₂O₃</b>:<br>4Fe + 3O₂ → 2Fe₂O₃<br><br>Remember: Count atoms on each side and adjust coefficients until equal!"
-        else:
-            return "⚖️ <b>Balancing Chemical Equations:</b><br>1. Count atoms of each element on both sides<br>2. Adjust coefficients (not subscripts)<br>3. Start with the most complex molecule<br>4. Balance remaining elements<br>Example: 2H₂ + O₂ → 2H₂O<br><br>What equation would you like help with?"
-    
-    # Oxygen questions
-    elif "oxygen" in lower_msg and not lower_msg.startswith("element:"):
-        return "💨 <b>Oxygen (O)</b> is essential for life and combustion! Atomic number: 8, makes up 21% of Earth's atmosphere. It's highly reactive and forms oxides with most elements. Try 'element: oxygen' for full details!"
-    
-    # Carbon questions
-    elif "carbon" in lower_msg and not lower_msg.startswith("element:"):
-        return "⚫ <b>Carbon (C)</b> is the basis of all organic chemistry and life! Atomic number: 6. It can form millions of compounds due to its ability to bond with itself and other elements. Found in diamonds, graphite, and all living things. Try 'element: carbon' for more!"
-    
-    # Chemical reaction questions
-    elif "reaction" in lower_msg or "react" in lower_msg:
-        return "⚗️ <b>Chemical Reactions</b> occur when substances interact to form new products. Types include:<br>• Synthesis (A + B → AB)<br>• Decomposition (AB → A + B)<br>• Single replacement<br>• Double replacement<br>• Combustion<br><br>What type of reaction are you interested in?"
-    
-    # pH questions
-    elif "ph" in lower_msg or "acid" in lower_msg or "base" in lower_msg:
-        return "🧪 <b>pH Scale</b> measures acidity/basicity from 0-14:<br>• pH < 7: Acidic (lemon juice, vinegar)<br>• pH = 7: Neutral (pure water)<br>• pH > 7: Basic/Alkaline (soap, bleach)<br><br>pH = -log[H⁺]. Each unit is 10x difference in H⁺ concentration!"
-    
-    # Molecule/molecular questions
-    elif "molecule" in lower_msg or "molecular" in lower_msg:
-        return "🧬 <b>Molecules</b> are two or more atoms bonded together. Examples:<br>• H₂O (water): bent shape<br>• CO₂ (carbon dioxide): linear<br>• CH₄ (methane): tetrahedral<br>• NH₃ (ammonia): trigonal pyramidal<br><br>Use 'compound: [name]' for specific molecules!"
-    
-    # General chemistry question
-    elif "chemistry" in lower_msg or "help" in lower_msg or "what can you" in lower_msg:
-        return "🧪 <b>I'm your Chemistry & Materials Science Assistant!</b> I can help with:<br><br><b>Info Lookups:</b><br>• Element info: 'element: sodium'<br>• Compound details: 'compound: ethanol'<br>• Molar mass: 'mass: NaCl'<br><br><b>Calculations (calc: type | params):</b><br>• Stoichiometry: moles_to_grams, grams_to_moles<br>• Solutions: molarity, dilution<br>• pH: ph, poh, ph_value<br>• Gas Laws: ideal_gas, combined_gas<br>• Composition: percent, limiting_reactant<br><br><b>Knowledge:</b><br>• Balancing equations, reactions, pH<br>• <b>Materials Science</b> textbook search<br><br>Ask anything or try 'calc examples' for calculation help!"
-    
-    # Calculation examples
-    elif "calc" in lower_msg and ("example" in lower_msg or "help" in lower_msg):
-        return """🧮 <b>Calculator Examples:</b><br><br>
+    return f"🧪 Interesting question about '{user_message}'! Try these commands:<br>• <b>element:</b> [name]<br>• <b>compound:</b> [name]<br>• <b>mass:</b> [formula]<br>• <b>calc:</b> [type] | [params] (try 'calc examples')<br><br>Or ask about: water, hydrogen, equations, pH, materials science, or calculations!"
+
+def reply(text):
+    """Intent response that always gives the same answer."""
+    return lambda message, found: text
+
+def not_element_command(lower_msg):
+    """Leave "element: oxygen" and the like to the element lookup."""
+    return not lower_msg.startswith("element:")
+
+def materials_answer(message, found):
+    """Materials Science topics - check textbook first; no answer without a hit."""
+    textbook_result = current_request().run("textbook_search", get_knowledge_library().smart_search, message)
+    if textbook_result:
+        return f"📚 <b>From Materials Science & Engineering Textbook:</b><br><br>{textbook_result[:800]}..."
+    return None
+
+def balance_answer(message, found):
+    """Balancing help, with the worked example for iron and oxygen."""
+    lower_msg = message.lower()
+    if "fe" in lower_msg and "o2" in lower_msg:
+        return "⚖️ To balance <b>Fe + O₂ → Fe₂O₃</b>:<br>4Fe + 3O₂ → 2Fe₂O₃<br><br>Remember: Count atoms on each side and adjust coefficients until equal!"
+    return "⚖️ <b>Balancing Chemical Equations:</b><br>1. Count atoms of each element on both sides<br>2. Adjust coefficients (not subscripts)<br>3. Start with the most complex molecule<br>4. Balance remaining elements<br>Example: 2H₂ + O₂ → 2H₂O<br><br>What equation would you like help with?"
+
+MATERIALS_KEYWORDS = ('material', 'steel', 'alloy', 'crystal structure', 'fcc', 'bcc',
+                      'hcp', 'ceramic', 'polymer', 'composite', 'stress', 'strain',
+                      'modulus', 'elasticity', 'plasticity', 'hardness', 'tensile',
+                      'phase diagram', 'microstructure', 'grain', 'dislocation',
+                      'annealing', 'quenching', 'tempering', 'diffusion', 'corrosion',
+                      'fracture', 'fatigue', 'creep', 'iron-carbon', 'aluminum oxide',
+                      'silicon carbide', 'thermal properties', 'electrical properties')
+
+# Offline answers in priority order: the first intent whose keywords occur
+# in the message (and that gives an answer) wins
+FALLBACK_INTENTS = IntentTable([
+    Intent("materials", MATERIALS_KEYWORDS, materials_answer),
+    Intent("water", ("water", "h2o", "h₂o"), reply("💧 <b>Water (H₂O)</b> is a chemical compound made of two hydrogen atoms and one oxygen atom. It's essential for life, has a bent molecular shape (104.5° bond angle), and is an excellent solvent. Molecular weight: 18.015 g/mol. Try 'compound: water' for more details!")),
+    Intent("hydrogen", ("hydrogen",), reply("🫧 <b>Hydrogen (H)</b> is the lightest and most abundant element in the universe! It's a colorless, odorless, highly flammable gas. Atomic number: 1, Atomic mass: 1.008 u. It forms water when combined with oxygen. Try 'element: hydrogen' for complete details!"),
+           exact=("h",), guard=not_element_command),
+    Intent("periodic_table", ("periodic table",), reply("📋 <b>The Periodic Table</b> organizes all 118 known chemical elements by atomic number, electron configuration, and recurring chemical properties. Elements are arranged in rows (periods) and columns (groups/families). It was created by Dmitri Mendeleev in 1869. Use 'element: [name]' to learn about specific elements!")),
+    Intent("balance", ("balance", "equation"), balance_answer),
+    Intent("oxygen", ("oxygen",), reply("💨 <b>Oxygen (O)</b> is essential for life and combustion! Atomic number: 8, makes up 21% of Earth's atmosphere. It's highly reactive and forms oxides with most elements. Try 'element: oxygen' for full details!"),
+           guard=not_element_command),
+    Intent("carbon", ("carbon",), reply("⚫ <b>Carbon (C)</b> is the basis of all organic chemistry and life! Atomic number: 6. It can form millions of compounds due to its ability to bond with itself and other elements. Found in diamonds, graphite, and all living things. Try 'element: carbon' for more!"),
+           guard=not_element_command),
+    Intent("reaction", ("reaction", "react"), reply("⚗️ <b>Chemical Reactions</b> occur when substances interact to form new products. Types include:<br>• Synthesis (A + B → AB)<br>• Decomposition (AB → A + B)<br>• Single replacement<br>• Double replacement<br>• Combustion<br><br>What type of reaction are you interested in?")),
+    Intent("ph", ("ph", "acid", "base"), reply("🧪 <b>pH Scale</b> measures acidity/basicity from 0-14:<br>• pH < 7: Acidic (lemon juice, vinegar)<br>• pH = 7: Neutral (pure water)<br>• pH > 7: Basic/Alkaline (soap, bleach)<br><br>pH = -log[H⁺]. Each unit is 10x difference in H⁺ concentration!")),
+    Intent("molecule", ("molecule", "molecular"), reply("🧬 <b>Molecules</b> are two or more atoms bonded together. Examples:<br>• H₂O (water): bent shape<br>• CO₂ (carbon dioxide): linear<br>• CH₄ (methane): tetrahedral<br>• NH₃ (ammonia): trigonal pyramidal<br><br>Use 'compound: [name]' for specific molecules!")),
+    Intent("help", ("chemistry", "help", "what can you"), reply("🧪 <b>I'm your Chemistry & Materials Science Assistant!</b> I can help with:<br><br><b>Info Lookups:</b><br>• Element info: 'element: sodium'<br>• Compound details: 'compound: ethanol'<br>• Molar mass: 'mass: NaCl'<br><br><b>Calculations (calc: type | params):</b><br>• Stoichiometry: moles_to_grams, grams_to_moles<br>• Solutions: molarity, dilution<br>• pH: ph, poh, ph_value<br>• Gas Laws: ideal_gas, combined_gas<br>• Composition: percent, limiting_reactant<br><br><b>Knowledge:</b><br>• Balancing equations, reactions, pH<br>• <b>Materials Science</b> textbook search<br><br>Ask anything or try 'calc examples' for calculation help!")),
+    Intent("calc_examples", ("calc",), reply("""🧮 <b>Calculator Examples:</b><br><br>
 <b>Stoichiometry:</b><br>
 • calc: moles_to_grams | formula=H2O | moles=2<br>
 • calc: grams_to_moles | formula=NaCl | grams=10<br>
@@ -176,16 +256,9 @@ def get_chat_response(user_message, conversation_history=None):
 <b>Other:</b><br>
 • calc: percent | formula=H2O<br>
 • calc: limiting | r1=Fe | g1=10 | c1=4 | r2=O2 | g2=5 | c2=3
-        """
-    
-    # Default helpful response
-    else:
-        # Try searching the textbook as a fallback
-        textbook_result = textbook_kb.smart_search(user_message)
-        if textbook_result:
-            return f"📚 <b>From Materials Science Textbook:</b><br><br>{textbook_result[:700]}..."
-        
-        return f"🧪 Interesting question about '{user_message}'! Try these commands:<br>• <b>element:</b> [name]<br>• <b>compound:</b> [name]<br>• <b>mass:</b> [formula]<br>• <b>calc:</b> [type] | [params] (try 'calc examples')<br><br>Or ask about: water, hydrogen, equations, pH, materials science, or calculations!"
+        """),
+           requires=("example", "help")),
+])
 
 # ──────────────────────────────────────────────
 # HTML Template
@@ -301,7 +374,7 @@ HTML_TEMPLATE = """
         </div>
     </div>
     <script>
-        let conversationHistory = [];
+        let sessionId = sessionStorage.getItem('sessionId');
         
         async function sendMessage() {
             const input = document.getElementById('userInput');
@@ -316,16 +389,14 @@ HTML_TEMPLATE = """
             const thinkingId = 'thinking-' + Date.now();
             addMessage('🤔 Thinking...', 'bot-msg', thinkingId);
             
-            // Add user message to history
-            conversationHistory.push({role: 'user', content: msg});
-            
             try {
-                const res = await fetch('/chat', {
+                const res = await fetch('/chat/stream', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({
                         message: msg,
-                        history: conversationHistory
+                        session_id: sessionId,
+                        async_explanation: true
                     })
                 });
                 
@@ -333,24 +404,62 @@ HTML_TEMPLATE = """
                     throw new Error(`Server returned ${res.status}`);
                 }
                 
-                const data = await res.json();
-                
-                // Remove thinking indicator
-                const thinkingEl = document.getElementById(thinkingId);
-                if (thinkingEl) thinkingEl.remove();
-                
-                // Add bot response
-                addMessage(data.response, 'bot-msg');
+                // Read Server-Sent Events as they arrive
+                const reader = res.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                let botEl = null;
+                let text = '';
+                let data = null;
                 
-                // Add bot response to history
-                conversationHistory.push({role: 'assistant', content: data.response});
+                const showBot = (html) => {
+                    if (!botEl) {
+                        // Replace thinking indicator with the bot response
+                        const thinkingEl = document.getElementById(thinkingId);
+                        if (thinkingEl) thinkingEl.remove();
+                        botEl = addMessage(html, 'bot-msg');
+                    } else {
+                        botEl.innerHTML = html;
+                    }
+                };
                 
-                // Keep history limited to last 10 exchanges (20 messages)
-                if (conversationHistory.length > 20) {
-                    conversationHistory = conversationHistory.slice(-20);
+                while (true) {
+                    const {value, done} = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, {stream: true});
+                    let end;
+                    while ((end = buffer.indexOf('\\n\\n')) !== -1) {
+                        const frame = buffer.slice(0, end);
+                        buffer = buffer.slice(end + 2);
+                        let event = 'message', payload = '';
+                        for (const line of frame.split('\\n')) {
+                            if (line.startsWith('event: ')) event = line.slice(7);
+                            else if (line.startsWith('data: ')) payload += line.slice(6);
+                        }
+                        if (event === 'token') {
+                            text += JSON.parse(payload).text;
+                            showBot(text);
+                        } else if (event === 'done') {
+                            data = JSON.parse(payload);
+                            showBot(data.response);
+                            // The server keeps the conversation; remember which one
+                            if (data.session_id) {
+                                sessionId = data.session_id;
+                                sessionStorage.setItem('sessionId', sessionId);
+                            }
+                        } else if (event === 'explanation') {
+                            // Calculation explanations arrive after the result
+                            const explanation = JSON.parse(payload);
+                            if (explanation.status === 'done' && explanation.explanation) {
+                                botEl.innerHTML += '<br><br>💡 ' + explanation.explanation;
+                            }
+                        }
+                    }
                 }
                 
-                console.log('Conversation history:', conversationHistory.length, 'messages');
+                if (!data) {
+                    throw new Error('Response ended early');
+                }
                 
             } catch (e) {
                 console.error('Chat error:', e);
@@ -372,6 +481,7 @@ HTML_TEMPLATE = """
             if (id) div.id = id;
             document.getElementById('chatMessages').appendChild(div);
             div.scrollIntoView({behavior: 'smooth'});
+            return div;
         }
     </script>
 </body>
@@ -387,160 +497,252 @@ def index():
     """Serve the chatbot UI."""
     return render_template_string(HTML_TEMPLATE)
 
+# Return calc: results without waiting for the AI explanation unless the
+# request says otherwise
+ASYNC_CALC_EXPLANATIONS = os.getenv("ASYNC_CALC_EXPLANATIONS", "False") == "True"
+
+# Seconds a /chat/stream response stays open for a calc: explanation
+STREAM_EXPLANATION_WAIT = float(os.getenv("STREAM_EXPLANATION_WAIT", 60))
+
 @app.route("/chat", methods=["POST"])
 def chat():
     """Handle chat messages."""
     data = request.get_json()
     user_message = data.get("message", "").strip()
-    conversation_history = data.get("history", [])
+    session = load_session(data, user_message)
+    payload = handle_message(
+        user_message,
+        session,
+        data.get("async_explanation", ASYNC_CALC_EXPLANATIONS),
+        data.get("use_cache", True),
+    )
+    return jsonify(record_exchange(session, user_message, payload))
+
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """
+    Handle chat messages, sending the answer as Server-Sent Events.
+
+    AI answers arrive as "token" events while Gemini generates them;
+    commands and fallback answers are sent whole in a "done" event carrying
+    the same payload /chat would return. A calc: explanation still being
+    generated follows as an "explanation" event on the same stream (shaped
+    like GET /explanation/<id>) instead of an explanation_id to poll, which
+    on serverless hosts could reach another instance.
+    """
+    data = request.get_json()
+    user_message = data.get("message", "").strip()
+    session = load_session(data, user_message)
+    async_explanation = data.get("async_explanation", ASYNC_CALC_EXPLANATIONS)
+    use_cache = data.get("use_cache", True)
+    ai_assistant = get_ai_assistant()
+
+    def events():
+        with request_scope() as executor:
+            is_command = COMMANDS.match(user_message) is not None
+            if user_message and not is_command and ai_assistant.is_available():
+                text = ""
+                for piece in ai_assistant.generate_response_stream(user_message, session, use_cache):
+                    text += piece
+                    yield sse_event("token", {"text": piece})
+                payload = {"response": text or get_fallback_response(user_message)}
+                payload["timings"] = executor.timings()
+            else:
+                payload = handle_message(user_message, session, async_explanation, use_cache)
+        task_id = payload.pop("explanation_id", None)
+        yield sse_event("done", record_exchange(session, user_message, payload))
+        if task_id:
+            task = get_task_store().wait(task_id, STREAM_EXPLANATION_WAIT)
+            yield sse_event("explanation", explanation_payload(task))
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def load_session(data: dict, user_message: str) -> Session:
+    """
+    The conversation a request belongs to.
+
+    Clients that send a "history" list and no "session_id" get a throwaway
+    session built from it; everyone else gets a stored session, new when
+    no (or an unknown) session_id is sent.
+    """
+    if data.get("session_id") is None and "history" in data:
+        return Session.from_history(data["history"], user_message)
+    return get_session_store().get(data.get("session_id"))
+
+def record_exchange(session: Session, user_message: str, payload: dict) -> dict:
+    """Add the answered message to the session; returns the payload with its id."""
+    if user_message:
+        session.add_exchange(user_message, payload["response"])
+    if session.id:
+        payload["session_id"] = session.id
+    return payload
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
+def handle_message(user_message, conversation_history, async_explanation=False, use_cache=True):
+    """
+    Answer one chat message; returns the /chat response payload.
+
+    use_cache=False makes the AI generate a fresh answer instead of reusing
+    one given earlier for the same question, context and history.
+    """
     if not user_message:
-        return jsonify({"response": "Please enter a message! 🧪"})
-
-    # Check for element lookup commands
-    lower_msg = user_message.lower()
-
-    if lower_msg.startswith("element:"):
-        query = user_message[8:].strip()
-        info = get_element_info(query)
-        if info and "error" not in info:
-            response = (
-                f"🔬 <b>{info['name']}</b> ({info['symbol']})<br>"
-                f"Atomic Number: {info['number']}<br>"
-                f"Atomic Mass: {info['mass']} u<br>"
-                f"Density: {info['density']} g/cm³"
-            )
-        else:
-            response = get_chat_response(user_message)
-
-    elif lower_msg.startswith("compound:"):
-        query = user_message[9:].strip()
-        info = get_compound_info(query)
-        if info and "error" not in info:
-            response = (
-                f"🧬 <b>{info['name']}</b><br>"
-                f"Formula: {info['molecular_formula']}<br>"
-                f"Molecular Weight: {info['molecular_weight']} g/mol<br>"
-                f"SMILES: {info['smiles']}<br>"
-                f"PubChem CID: {info['cid']}"
-            )
-        else:
-            response = get_chat_response(user_message)
+        return {"response": "Please enter a message! 🧪"}
 
-    elif lower_msg.startswith("mass:"):
-        formula = user_message[5:].strip()
-        result = calculate_molar_mass(formula)
-        if isinstance(result, float):
-            response = f"⚖️ Molar mass of <b>{formula}</b>: {result} g/mol"
+    # Independent steps run in parallel within the request's deadline;
+    # the payload reports how long each took
+    with request_scope() as executor:
+        # Built-in commands (element:, calc:, ...) are found by their prefix
+        match = COMMANDS.match(user_message)
+        if match:
+            prefix, handler = match
+            payload = handler(user_message[len(prefix):].strip(), user_message, async_explanation)
         else:
-            response = get_chat_response(user_message)
-
-    elif lower_msg.startswith("textbook:") or lower_msg.startswith("material:"):
-        # Extract the query after the command
-        query = user_message.split(":", 1)[1].strip()
-        textbook_result = textbook_kb.smart_search(query)
-        if textbook_result:
-            response = f"📚 <b>From Materials Science & Engineering Textbook:</b><br><br>{textbook_result[:800]}..."
+            payload = {"response": get_chat_response(user_message, conversation_history, use_cache)}
+    payload["timings"] = executor.timings()
+    return payload
+
+# ──────────────────────────────────────────────
+# Chat Commands
+# ──────────────────────────────────────────────
+# Each handler takes the text after its prefix, the whole message and
+# whether calc: explanations are fetched later, and returns the /chat
+# payload. Register new commands with @command("prefix:").
+
+COMMANDS = PrefixTrie()
+
+def command(prefix):
+    """Register a chat command handler for messages starting with prefix."""
+    def register(handler):
+        COMMANDS.add(prefix, handler)
+        return handler
+    return register
+
+@command("element:")
+def element_command(query, user_message, async_explanation):
+    info = get_element_info(query)
+    if info and "error" not in info:
+        response = (
+            f"🔬 <b>{info['name']}</b> ({info['symbol']})<br>"
+            f"Atomic Number: {info['number']}<br>"
+            f"Atomic Mass: {info['mass']} u<br>"
+            f"Density: {info['density']} g/cm³"
+        )
+    else:
+        response = get_chat_response(user_message)
+    return {"response": response}
+
+@command("compound:")
+def compound_command(query, user_message, async_explanation):
+    executor = current_request()
+    info = executor.wait(executor.submit("compound_lookup", get_compound_info, query), name="compound_lookup")
+    if info and "error" not in info:
+        response = format_compound(info)
+    else:
+        response = get_chat_response(user_message)
+    return {"response": response}
+
+def format_compound(info):
+    """Chat answer for a compound record."""
+    return (
+        f"🧬 <b>{info['name']}</b><br>"
+        f"Formula: {info['molecular_formula']}<br>"
+        f"Molecular Weight: {info['molecular_weight']} g/mol<br>"
+        f"SMILES: {info['smiles']}<br>"
+        f"PubChem CID: {info['cid']}"
+    )
+
+@command("mass:")
+def mass_command(formula, user_message, async_explanation):
+    result = calculate_molar_mass(formula)
+    if isinstance(result, float):
+        response = f"⚖️ Molar mass of <b>{formula}</b>: {result} g/mol"
+    else:
+        response = get_chat_response(user_message)
+    return {"response": response}
+
+@command("material:")
+def material_command(query, user_message, async_explanation):
+    return {"response": get_material_response(query)}
+
+@command("textbook:")
+def textbook_command(query, user_message, async_explanation):
+    library = get_knowledge_library()
+    results = library.ranked_search(query, top_k=2)
+    if results:
+        response = library.format_response(results, query)
+    else:
+        response = f"🔍 No results found in textbook for '{query}'. Try different keywords or ask a general question!"
+    return {"response": response}
+
+@command("calc:")
+def calc_command(query, user_message, async_explanation):
+    # Parse calculation commands: calc: type | param1=value | param2=value
+    extra = {}
+    try:
+        calc_type, result = run_calc_command(query)
+
+        # Format response
+        if "error" in result:
+            response = f"❌ <b>Calculation Error:</b> {result['error']}"
         else:
-            response = f"🔍 No results found in textbook for '{query}'. Try different keywords or ask a general question!"
+            response = f"🧮 <b>Calculation Result:</b><br><pre>{format_calc_result(result)}</pre>"
+            ai_assistant = get_ai_assistant()
 
-    # ==================== CALCULATION COMMANDS ====================
-    
-    elif lower_msg.startswith("calc:"):
-        # Parse calculation commands: calc: type | param1=value | param2=value
-        try:
-            parts = user_message[5:].strip().split("|")
-            calc_type = parts[0].strip().lower()
-            params = {}
-            
-            for part in parts[1:]:
-                if "=" in part:
-                    key, value = part.split("=", 1)
-                    key = key.strip()
-                    value = value.strip()
-                    try:
-                        params[key] = float(value)
-                    except:
-                        params[key] = value
-            
-            # Route to appropriate calculator
-            if calc_type in ["moles_to_grams", "moles to grams", "mol to g"]:
-                result = calculator.moles_to_grams(params.get("formula"), params.get("moles"))
-            elif calc_type in ["grams_to_moles", "grams to moles", "g to mol"]:
-                result = calculator.grams_to_moles(params.get("formula"), params.get("grams"))
-            elif calc_type in ["moles_to_molecules", "mol to molecules"]:
-                result = calculator.moles_to_molecules(params.get("moles"))
-            elif calc_type in ["molecules_to_moles", "molecules to mol"]:
-                result = calculator.molecules_to_moles(params.get("molecules"))
-            elif calc_type in ["molarity", "concentration"]:
-                result = calculator.calculate_molarity(
-                    moles=params.get("moles"),
-                    grams=params.get("grams"),
-                    formula=params.get("formula"),
-                    volume_L=params.get("volume")
-                )
-            elif calc_type in ["dilution", "m1v1=m2v2"]:
-                result = calculator.dilution(
-                    M1=params.get("M1"),
-                    V1=params.get("V1"),
-                    M2=params.get("M2"),
-                    V2=params.get("V2")
-                )
-            elif calc_type in ["ph", "ph_from_h"]:
-                result = calculator.calculate_pH(params.get("H"))
-            elif calc_type in ["poh", "ph_from_oh"]:
-                result = calculator.calculate_pOH(params.get("OH"))
-            elif calc_type in ["ph_value", "ph info"]:
-                result = calculator.pH_from_value(params.get("pH"))
-            elif calc_type in ["ideal_gas", "pv=nrt", "gas law"]:
-                result = calculator.ideal_gas_law(
-                    P=params.get("P"),
-                    V=params.get("V"),
-                    n=params.get("n"),
-                    T=params.get("T")
-                )
-            elif calc_type in ["combined_gas", "gas laws"]:
-                result = calculator.combined_gas_law(
-                    P1=params.get("P1"),
-                    V1=params.get("V1"),
-                    T1=params.get("T1"),
-                    P2=params.get("P2"),
-                    V2=params.get("V2"),
-                    T2=params.get("T2")
-                )
-            elif calc_type in ["percent", "percent_composition", "composition"]:
-                result = calculator.percent_composition(params.get("formula"))
-            elif calc_type in ["limiting", "limiting_reactant", "limiting reagent"]:
-                result = calculator.limiting_reactant(
-                    reactant1_formula=params.get("r1"),
-                    reactant1_grams=params.get("g1"),
-                    reactant1_coef=int(params.get("c1", 1)),
-                    reactant2_formula=params.get("r2"),
-                    reactant2_grams=params.get("g2"),
-                    reactant2_coef=int(params.get("c2", 1))
-                )
+            if async_explanation:
+                # Return the result now; the client fetches the explanation later
+                if ai_assistant.is_available():
+                    extra["explanation_id"] = get_task_store().submit(
+                        ai_assistant.generate_calculation_explanation, calc_type, result
+                    )
             else:
-                result = {"error": f"Unknown calculation type '{calc_type}'"}
-            
-            # Format response
-            if "error" in result:
-                response = f"❌ <b>Calculation Error:</b> {result['error']}"
-            else:
-                # Get AI explanation if available
-                ai_explanation = ai_assistant.generate_calculation_explanation(calc_type, result)
-                
-                response = f"🧮 <b>Calculation Result:</b><br><pre>{format_calc_result(result)}</pre>"
-                
+                # Get AI explanation if available; one that misses the request
+                # deadline is handed to the task store for the client to fetch
+                executor = current_request()
+                explanation_step = executor.submit_detached(
+                    "explanation", ai_assistant.generate_calculation_explanation, calc_type, result
+                )
+                ai_explanation = executor.wait(explanation_step, name="explanation")
+
                 if ai_explanation:
                     response += f"<br><br>💡 {ai_explanation}"
-        
-        except Exception as e:
-            response = f"❌ <b>Calculation Error:</b> {str(e)}<br><br>📝 <b>Format:</b> calc: type | param1=value | param2=value<br>Example: calc: moles_to_grams | formula=H2O | moles=2"
+                elif not explanation_step.done():
+                    extra["explanation_id"] = get_task_store().track(explanation_step)
 
-    else:
-        response = get_chat_response(user_message, conversation_history)
+    except Exception as e:
+        response = calc_usage_error(e)
+
+    return {"response": response, **extra}
+
+def run_calc_command(query):
+    """Run the calculation in a calc: command; returns (calculation type, result)."""
+    parts = query.split("|")
+    calc_type = parts[0].strip().lower()
+    return calc_type, get_calculator().run(calc_type, parse_calc_params(parts[1:]))
+
+def calc_usage_error(error):
+    """Chat answer for a calc: command that could not be run."""
+    return f"❌ <b>Calculation Error:</b> {str(error)}<br><br>📝 <b>Format:</b> calc: type | param1=value | param2=value<br>Example: calc: moles_to_grams | formula=H2O | moles=2"
 
-    return jsonify({"response": response})
+def parse_calc_params(parts):
+    """Turn "key=value" pieces of a calc: command into parameters, numbers as floats."""
+    params = {}
+    for part in parts:
+        if "=" in part:
+            key, value = part.split("=", 1)
+            key = key.strip()
+            value = value.strip()
+            try:
+                params[key] = float(value)
+            except ValueError:
+                params[key] = value
+    return params
 
 def format_calc_result(result: dict) -> str:
     """Format calculation results for display."""
@@ -549,6 +751,78 @@ def format_calc_result(result: dict) -> str:
         formatted += f"{key}: {value}\n"
     return formatted
 
+# Upper bound on rows accepted by one /calc/batch request
+BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", 100000))
+
+@app.route("/session/<session_id>", methods=["DELETE"])
+def delete_session(session_id):
+    """API endpoint that forgets a conversation."""
+    if get_session_store().delete(session_id):
+        return jsonify({"deleted": session_id})
+    return jsonify({"error": "Session not found"}), 404
+
+@app.route("/explanation/<task_id>", methods=["GET"])
+def explanation(task_id):
+    """API endpoint to fetch an explanation started by an async calc: request."""
+    payload = explanation_payload(get_task_store().status(task_id))
+    return jsonify(payload), 404 if payload["status"] == "unknown" else 200
+
+def explanation_payload(task: dict) -> dict:
+    """The client's view of an explanation task (TaskStore.status() result)."""
+    if task["status"] == "unknown":
+        return {"status": "unknown", "error": "Explanation not found or expired"}
+    if task["status"] == "done":
+        return {"status": "done", "explanation": task["result"]}
+    return task
+
+@app.route("/calc/batch", methods=["POST"])
+def calc_batch():
+    """
+    Run one calculation type over many inputs in a single vectorized pass.
+
+    Accepts JSON ({"type": "ph", "columns": {"H": [...]}} or
+    {"type": "ph", "rows": [{"H": 0.001}, ...]}) or CSV with a header row
+    (Content-Type: text/csv, ?type=ph). Results are streamed back as
+    newline-delimited JSON or CSV (?format=ndjson|csv; CSV input defaults
+    to CSV output).
+    """
+    from batch_calculator import (
+        read_csv_columns, rows_to_columns, run_batch, stream_csv, stream_ndjson
+    )
+
+    if request.mimetype == "text/csv":
+        calc_type = request.args.get("type", "")
+        columns = read_csv_columns(request.get_data(as_text=True))
+        output_format = request.args.get("format", "csv")
+    else:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+        rows = data.get("rows", [])
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            return jsonify({"error": "'rows' must be a list of objects"}), 400
+        calc_type = data.get("type", "")
+        columns = data.get("columns") or rows_to_columns(rows)
+        output_format = data.get("format") or request.args.get("format", "ndjson")
+
+    if not isinstance(calc_type, str):
+        return jsonify({"error": "'type' must be a string"}), 400
+    if not isinstance(columns, dict) or not all(isinstance(values, list) for values in columns.values()):
+        return jsonify({"error": "'columns' must map names to lists of values"}), 400
+
+    num_rows = max((len(values) for values in columns.values()), default=0)
+    if num_rows > BATCH_MAX_ROWS:
+        return jsonify({"error": f"At most {BATCH_MAX_ROWS} rows per request"}), 413
+
+    try:
+        result = run_batch(calc_type, columns)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if output_format == "csv":
+        return Response(stream_csv(result), mimetype="text/csv")
+    return Response(stream_ndjson(result), mimetype="application/x-ndjson")
+
 @app.route("/element/<symbol>", methods=["GET"])
 def element(symbol):
     """API endpoint to get element info."""
@@ -557,6 +831,84 @@ def element(symbol):
         return jsonify(info)
     return jsonify({"error": "Element not found"}), 404
 
+@app.route("/elements", methods=["GET"])
+def elements():
+    """API endpoint to get many elements at once: /elements?ids=Fe,O,8"""
+    ids = [i for i in request.args.get("ids", "").split(",") if i.strip()]
+    if not ids:
+        return jsonify({"error": "Pass element symbols, names or numbers as ?ids=Fe,O,8"}), 400
+    if len(ids) > MAX_BULK_IDS:
+        return jsonify({"error": f"At most {MAX_BULK_IDS} ids per request"}), 400
+    return jsonify(lookup_elements(ids))
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    """API endpoint with cache hit/miss counters."""
+    from semantic_cache import get_semantic_cache
+    return jsonify({
+        "formula_cache": get_formula_cache().stats(),
+        "compound_cache": get_compound_cache().stats(),
+        "response_cache": get_response_cache().stats(),
+        "semantic_cache": get_semantic_cache().stats(),
+        "sessions": get_session_store().stats(),
+        "ai_usage": get_ai_assistant().usage_stats(),
+        "http": http_stats(),
+    })
+
+@app.route("/textbook/toc", methods=["GET"])
+def textbook_toc():
+    """API endpoint with the textbook's chapter/section tree (?captions=true adds figures and tables)."""
+    kinds = ["chapter", "section", "end_matter", "appendix", "back_matter"]
+    if request.args.get("captions", "").lower() in ("1", "true", "yes"):
+        kinds += ["figure", "table"]
+    return jsonify({"contents": get_textbook_kb().toc.tree(kinds=tuple(kinds))})
+
+@app.route("/textbook/section/<path:section_id>", methods=["GET"])
+def textbook_section(section_id):
+    """API endpoint with the full text of a section, chosen by id, number or title."""
+    toc = get_textbook_kb().toc
+    entry = toc.resolve(section_id)
+    if entry is None:
+        return jsonify({"error": "Section not found"}), 404
+    return jsonify({
+        **entry.to_dict(),
+        "parent": entry.parent,
+        "children": [toc.entries[child].to_dict() for child in toc.children.get(entry.id, [])],
+        "text": toc.text(entry),
+    })
+
+@app.route("/documents", methods=["GET"])
+def documents():
+    """API endpoint listing the documents searched alongside the textbook."""
+    return jsonify({"documents": get_knowledge_library().stats()})
+
+@app.route("/documents/reload", methods=["POST"])
+def documents_reload():
+    """API endpoint that indexes new and changed documents right away."""
+    return jsonify(get_knowledge_library().refresh())
+
+@app.route("/materials", methods=["GET"])
+def materials():
+    """API endpoint for range queries: /materials?property=yield_strength&min=500&category=metals"""
+    prop = request.args.get("property", "").strip()
+    if not prop:
+        return jsonify({"error": "Pass a property, e.g. ?property=yield_strength&min=500"}), 400
+    try:
+        minimum = float(request.args["min"]) if request.args.get("min") else None
+        maximum = float(request.args["max"]) if request.args.get("max") else None
+    except ValueError:
+        return jsonify({"error": "min and max must be numbers"}), 400
+    rows = get_materials_db().query(prop, minimum, maximum, request.args.get("category"))
+    return jsonify({"property": prop, "count": len(rows), "results": rows})
+
+@app.route("/materials/<path:name>", methods=["GET"])
+def material(name):
+    """API endpoint with every tabulated property of a material."""
+    info = get_materials_db().lookup(name)
+    if info:
+        return jsonify(info)
+    return jsonify({"error": "Material not found"}), 404
+
 @app.route("/compound/<name>", methods=["GET"])
 def compound(name):
     """API endpoint to get compound info."""
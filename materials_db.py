@@ -0,0 +1,599 @@
+"""
+Materials Database Module
+Property values from the textbook's Appendix B tables (density, modulus,
+strength, thermal and electrical properties of metals, ceramics, polymers,
+fibers and composites) in an indexed SQLite store.
+
+The tables are extracted offline into data/materials.tsv (one row per
+material, condition and property). At runtime the file is loaded into an
+in-memory SQLite database with indexes on material name and on
+(property, value), so lookups and range queries never scan the textbook.
+"""
+
+import csv
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_DATA_PATH = os.path.join(DATA_DIR, "materials.tsv")
+
+TSV_FIELDS = ["table", "category", "material", "condition", "property", "unit", "low", "high"]
+
+# Columns of each Appendix B table, in print order: (property, unit), or
+# None for the US-customary duplicate of the previous column
+APPENDIX_TABLES = {
+    "B.1": [("density", "g/cm3"), None],
+    "B.2": [("elastic_modulus", "GPa"), None],
+    "B.3": [("poissons_ratio", "")],
+    "B.4": [("yield_strength", "MPa"), ("tensile_strength", "MPa"), ("elongation", "%")],
+    "B.5": [("fracture_toughness", "MPa*m^0.5"), None, ("strength", "MPa")],
+    "B.6": [("thermal_expansion", "1e-6/C"), None],
+    "B.7": [("thermal_conductivity", "W/m-K"), None],
+    "B.8": [("specific_heat", "J/kg-K"), None],
+    "B.9": [("electrical_resistivity", "ohm-m")],
+}
+
+# Tables printed in two columns side by side
+TWO_COLUMN_TABLES = frozenset({"B.3"})
+
+# Words users type for each property
+PROPERTY_ALIASES = {
+    "density": "density",
+    "modulus": "elastic_modulus",
+    "elastic modulus": "elastic_modulus",
+    "modulus of elasticity": "elastic_modulus",
+    "young's modulus": "elastic_modulus",
+    "youngs modulus": "elastic_modulus",
+    "stiffness": "elastic_modulus",
+    "poisson's ratio": "poissons_ratio",
+    "poissons ratio": "poissons_ratio",
+    "poisson ratio": "poissons_ratio",
+    "yield strength": "yield_strength",
+    "yield": "yield_strength",
+    "tensile strength": "tensile_strength",
+    "ultimate tensile strength": "tensile_strength",
+    "uts": "tensile_strength",
+    "elongation": "elongation",
+    "ductility": "elongation",
+    "fracture toughness": "fracture_toughness",
+    "toughness": "fracture_toughness",
+    "strength": "strength",
+    "thermal expansion": "thermal_expansion",
+    "coefficient of thermal expansion": "thermal_expansion",
+    "cte": "thermal_expansion",
+    "thermal conductivity": "thermal_conductivity",
+    "conductivity": "thermal_conductivity",
+    "specific heat": "specific_heat",
+    "heat capacity": "specific_heat",
+    "resistivity": "electrical_resistivity",
+    "electrical resistivity": "electrical_resistivity",
+}
+
+# Category headings of the tables, recognized by a keyword
+CATEGORY_KEYWORDS = [
+    ("COMPOSITE", "composites"),
+    ("FIBER", "fibers"),
+    ("POLYMERS", "polymers"),
+    ("GRAPHITE", "ceramics"),
+    ("CERAMICS", "ceramics"),
+    ("SEMICONDUCTING", "ceramics"),
+    ("METALS", "metals"),
+]
+
+CATEGORY_ALIASES = {
+    "metal": "metals", "metals": "metals", "alloys": "metals", "alloy": "metals",
+    "ceramic": "ceramics", "ceramics": "ceramics",
+    "polymer": "polymers", "polymers": "polymers", "plastics": "polymers",
+    "fiber": "fibers", "fibers": "fibers",
+    "composite": "composites", "composites": "composites",
+}
+
+# Sub-headings inside the metals section (not materials), without spaces
+# since OCR sometimes splits their words ("Refrac tory Metals")
+SUBCATEGORIES = frozenset(heading.replace(" ", "") for heading in (
+    "Plain Carbon and Low-Alloy Steels", "Stainless Steels", "Cast Irons",
+    "Aluminum Alloys", "Copper Alloys", "Magnesium Alloys", "Titanium Alloys",
+    "Precious Metals", "Refractory Metals", "Miscellaneous Nonferrous Alloys",
+))
+
+# Fiber, composite and wood conditions printed without a bullet
+DIRECTIONS = re.compile(r"^(?:(?:Longitudinal|Transverse)(?: direction)?|(?:Parallel|Perpendicular) to grain)$")
+
+COMPARISONS = {">": ">", ">=": ">=", "<": "<", "<=": "<=", "above": ">", "over": ">",
+               "greater than": ">", "more than": ">", "at least": ">=", "below": "<",
+               "under": "<", "less than": "<", "at most": "<="}
+
+Value = Tuple[Optional[float], Optional[float]]
+
+
+def normalize_material(name: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a material name."""
+    return " ".join(re.sub(r"[^a-z0-9%.]+", " ", name.lower()).split())
+
+
+def material_names(material: str) -> Set[str]:
+    """
+    Normalized names a material answers to besides its exact name: its
+    parenthesized or comma-separated aliases, each with and without
+    qualifiers and a trailing grade ("Gold (commercially pure)" → "gold",
+    "Aramid (Kevlar 49)" → "kevlar 49" and "kevlar"). A name merely
+    containing another ("C17200 (beryllium-copper)") is not "copper".
+    """
+    parts = [material, re.sub(r"\([^()]*\)", "", material)]
+    parts += [alias for inner in re.findall(r"\(([^()]*)\)", material) for alias in inner.split(",")]
+    names = set()
+    for part in parts:
+        head = re.split(r"\s*[(,]", part.strip())[0]
+        for name in (part, head, re.sub(r"\s+\d[\w.%-]*$", "", head)):
+            name = normalize_material(name)
+            if name:
+                names.add(name)
+    return names
+
+
+class MaterialsDatabase:
+    """Indexed lookups and range queries over the Appendix B property values."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_DATA_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE properties (material TEXT, key TEXT, condition TEXT, category TEXT, "
+            "property TEXT, unit TEXT, low REAL, high REAL, source TEXT)"
+        )
+        self._db.execute("CREATE INDEX idx_material ON properties (key)")
+        self._db.execute("CREATE INDEX idx_low ON properties (property, low)")
+        self._db.execute("CREATE INDEX idx_high ON properties (property, high)")
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                self.load(csv.DictReader(f, delimiter="\t"))
+        elif path:
+            print(f"⚠️ Materials data not found at {path}")
+
+    def load(self, rows):
+        """Insert rows shaped like data/materials.tsv."""
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO properties VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(
+                    row["material"], normalize_material(row["material"]), row["condition"] or None,
+                    row["category"], row["property"], row["unit"],
+                    float(row["low"]) if row["low"] else None,
+                    float(row["high"]) if row["high"] else None,
+                    f"Table {row['table']}",
+                ) for row in rows]
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
+
+    def _rows(self, sql: str, params=()) -> List[dict]:
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def lookup(self, material: str) -> Optional[dict]:
+        """
+        All tabulated properties of a material.
+
+        Args:
+            material: Material name; an exact name wins, otherwise every
+                material it names without its qualifiers, grade or
+                designation (see material_names)
+
+        Returns:
+            {"material", "category", "properties": [...]}, or None when no
+            tabulated material is the one asked for (say "copper", where
+            the tables only hold copper alloys)
+        """
+        key = normalize_material(material)
+        if not key:
+            return None
+        columns = "material, condition, category, property, unit, low, high, source"
+        rows = self._rows(f"SELECT {columns} FROM properties WHERE key = ?", (key,))
+        if not rows:
+            # Prefix match can use the index as a range scan
+            rows = self._named(self._rows(
+                f"SELECT {columns} FROM properties WHERE key >= ? AND key < ? ORDER BY key",
+                (key, key + "￿"),
+            ), key)
+        if not rows:
+            pattern = key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            rows = self._named(self._rows(
+                f"SELECT {columns} FROM properties WHERE key LIKE ? ESCAPE '\\' ORDER BY key",
+                (f"%{pattern}%",),
+            ), key)
+        if not rows:
+            return None
+        names = sorted({row["material"] for row in rows})
+        return {
+            "material": names[0] if len(names) == 1 else material,
+            "matches": names,
+            "category": rows[0]["category"],
+            "properties": rows,
+        }
+
+    @staticmethod
+    def _named(rows: List[dict], key: str) -> List[dict]:
+        """The rows of materials that key names, not merely appears in."""
+        return [row for row in rows if key in material_names(row["material"])]
+
+    def query(self, prop: str, minimum: Optional[float] = None, maximum: Optional[float] = None,
+              category: Optional[str] = None, limit: int = 50) -> List[dict]:
+        """
+        Materials whose value of a property lies in a range.
+
+        A tabulated range (say 220-250 MPa) matches when any part of it does.
+
+        Args:
+            prop: Property key (see APPENDIX_TABLES) or alias
+            minimum: Lower bound, inclusive (None = unbounded)
+            maximum: Upper bound, inclusive (None = unbounded)
+            category: metals, ceramics, polymers, fibers or composites
+            limit: Maximum number of rows
+
+        Returns:
+            Matching rows, highest value first
+        """
+        prop = PROPERTY_ALIASES.get(prop.lower().replace("_", " "), prop)
+        sql = ("SELECT material, condition, category, property, unit, low, high, source "
+               "FROM properties WHERE property = ?")
+        params: list = [prop]
+        if minimum is not None:
+            sql += " AND COALESCE(high, low) >= ?"
+            params.append(minimum)
+        if maximum is not None:
+            sql += " AND low <= ?"
+            params.append(maximum)
+        if category:
+            sql += " AND category = ?"
+            params.append(CATEGORY_ALIASES.get(category.lower(), category.lower()))
+        sql += " ORDER BY COALESCE(high, low) DESC LIMIT ?"
+        params.append(limit)
+        return self._rows(sql, params)
+
+    def stats(self) -> dict:
+        """Number of materials and values per property."""
+        rows = self._rows(
+            "SELECT property, COUNT(*) AS n, COUNT(DISTINCT material) AS materials "
+            "FROM properties GROUP BY property ORDER BY property"
+        )
+        return {row["property"]: {"values": row["n"], "materials": row["materials"]} for row in rows}
+
+
+def format_value(row: dict) -> str:
+    """Printable value of a property row, e.g. "220–250 MPa"."""
+    low, high = row["low"], row["high"]
+    if high is None:
+        text = f">{low:g}"
+    elif high != low:
+        text = f"{low:g}–{high:g}"
+    else:
+        text = f"{low:g}"
+    return f"{text} {row['unit']}".strip()
+
+
+def parse_property_query(text: str) -> Optional[dict]:
+    """
+    Parse questions like "metals with yield strength > 500 MPa" or
+    "polymers with density below 1.0".
+
+    Returns:
+        {"property", "minimum", "maximum", "category"} or None if the text
+        is not a range query
+    """
+    lowered = " ".join(text.lower().split())
+    aliases = "|".join(re.escape(a) for a in sorted(PROPERTY_ALIASES, key=len, reverse=True))
+    comparisons = "|".join(re.escape(c) for c in sorted(COMPARISONS, key=len, reverse=True))
+    number = r"(-?\d+(?:\.\d+)?(?:e-?\d+)?)"
+    match = re.search(
+        rf"(?:(\w+)\s+(?:with|having|where)\s+)?(?:an?\s+|the\s+)?({aliases})\s*"
+        rf"(?:(?:is|of)\s+)?(?:({comparisons})\s*{number}|between\s+{number}\s+and\s+{number})",
+        lowered,
+    )
+    if not match:
+        return None
+    category, alias, comparison, value, low, high = match.groups()
+    result = {
+        "property": PROPERTY_ALIASES[alias],
+        "minimum": None,
+        "maximum": None,
+        "category": CATEGORY_ALIASES.get(category) if category else None,
+    }
+    if comparison:
+        if COMPARISONS[comparison] in (">", ">="):
+            result["minimum"] = float(value)
+        else:
+            result["maximum"] = float(value)
+    else:
+        result["minimum"], result["maximum"] = float(low), float(high)
+    return result
+
+
+# ==================== EXTRACTION ====================
+
+NUMBER = r"\d+(?:\s?\.\s?\d+)?"
+# OCR renders the superscript minus of "10^-7" as one of these
+EXPONENT_MINUS = "-–—“”\"~^_'"
+
+
+def _exponent(text: str) -> float:
+    text = text.strip()
+    sign = -1 if text and text[0] in EXPONENT_MINUS else 1
+    return sign * float(text.lstrip(EXPONENT_MINUS + " "))
+
+
+def parse_value(text: str) -> Optional[Value]:
+    """
+    Parse one printed table value into (low, high).
+
+    Handles "7.85", "-0.6", "220-250 (32-36)", "210 (30) (min)", "486*",
+    "1.60 X 10- 7", ">10 13" and "10 -10 14". Returns (None, None) for a
+    dash (no value) and None when the text is not a value at all.
+    """
+    text = text.strip()
+    if text in ("—", "-", "–", "nil"):
+        return None, None
+    text = text.split("(")[0].strip()          # US-customary value in parentheses
+    text = re.sub(r"[\s*]+[a-gA-G]?$", "", text).replace("X", "x")
+    lower_bound = text.startswith(">")
+    text = text.lstrip("<>~ ")
+
+    scientific = re.fullmatch(rf"({NUMBER})\s*x\s*10\s*([{re.escape(EXPONENT_MINUS)}\s]*\d+)"
+                              rf"(?:\s*-\s*({NUMBER})\s*x\s*10\s*([{re.escape(EXPONENT_MINUS)}\s]*\d+))?", text)
+    power = re.fullmatch(rf"10\s+([{re.escape(EXPONENT_MINUS)}]?\s*\d+)(?:\s*-\s*10\s+(\d+))?", text)
+    plain = re.fullmatch(rf"(-?{NUMBER})(?:\s*-\s*({NUMBER}))?", text)
+    if scientific:
+        m1, e1, m2, e2 = scientific.groups()
+        low = float(m1.replace(" ", "")) * 10 ** _exponent(e1)
+        high = float(m2.replace(" ", "")) * 10 ** _exponent(e2) if m2 else low
+    elif power:
+        e1, e2 = power.groups()
+        low = 10 ** _exponent(e1)
+        high = 10 ** float(e2) if e2 else low
+    elif plain:
+        v1, v2 = plain.groups()
+        low = float(v1.replace(" ", ""))
+        high = float(v2.replace(" ", "")) if v2 else low
+    else:
+        return None
+    return (low, None) if lower_bound else (low, high)
+
+
+def _split_glued_value(line: str) -> Optional[Tuple[str, Value]]:
+    """
+    Split a material name or condition from the first value OCR glued
+    onto it, as in "Nickel 200 8.89" or "Cl 1000 (electrolytic tough
+    pitch) 388 (16.7)". A number after a plain name is part of the name
+    ("Alloy 356.0", "Monel 400", "Y 2 0 3"), so only a number after a
+    parenthesis, or a decimal after the name's own number, is taken as a
+    value.
+    """
+    match = re.match(rf"^(.*\S)\s+(>?{NUMBER}(?:\s*-\s*{NUMBER})?\*?(?:\s*\([^()]*\))*)$", line)
+    if not match:
+        return None
+    name, text = match.groups()
+    if not (name.endswith(")") or re.search(r"\s\w*\d$", name) and re.match(r"[\d\s]+\.", text)):
+        return None
+    value = parse_value(text)
+    return (name, value) if value else None
+
+
+def _name_key(name: str) -> str:
+    """Spelling-insensitive form of a material name: "(Vf = 0.60)" and "(V f = 0.6)" agree."""
+    return re.sub(r"[^a-z0-9.]", "", re.sub(r"(\.\d*?)0+\b", r"\1", name.lower()))
+
+
+def _category(line: str) -> Optional[str]:
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) < 5 or line.upper() != line:
+        return None
+    for keyword, category in CATEGORY_KEYWORDS:
+        if keyword in line:
+            return category
+    return None
+
+
+def extract_appendix_tables(content: str) -> Iterator[Dict[str, str]]:
+    """
+    Extract the Appendix B property tables from the textbook text.
+
+    Yields:
+        Rows with the TSV_FIELDS keys
+    """
+    lines = [line.strip() for line in content.split("\n")]
+    starts = {}
+    for i, line in enumerate(lines):
+        caption = re.match(r"^Table (B\.(?:\d+|l))\s+(?!\(\s*Continued)", line)
+        if caption:
+            starts.setdefault(caption.group(1).replace("l", "1"), i)
+
+    # B.1 is printed in one column and lists every material, so its names,
+    # categories and conditions are trusted; tables printed in two columns
+    # come out of OCR interleaved
+    categories: Dict[str, str] = {}
+    conditions: Dict[str, set] = {}
+    names: Dict[str, str] = {}
+    seen = set()
+
+    def b1_name(material: str) -> Optional[str]:
+        key = _name_key(material)
+        if key in names:
+            return names[key]
+        longer = [name for name_key, name in names.items() if name_key.startswith(key)]
+        return longer[0] if len(longer) == 1 else None
+
+    for table, columns in APPENDIX_TABLES.items():
+        if table not in starts:
+            continue
+        for row in _extract_table(table, columns, lines[starts[table] + 1:]):
+            material, condition = row["material"], row["condition"]
+            if table == "B.1":
+                categories.setdefault(material, row["category"])
+                conditions.setdefault(material, set()).add(condition)
+                names.setdefault(_name_key(material), material)
+            elif names:
+                known = b1_name(material)
+                if known is None and re.search(r"\s\d[\d.]*$", material):
+                    # A stray footnote or value after a name ("Concrete 6")
+                    known = b1_name(re.sub(r"\s+\d[\d.]*$", "", material))
+                    if known is None:
+                        continue
+                if known is not None:
+                    material = row["material"] = known
+                    row["category"] = categories[known]
+            if table in TWO_COLUMN_TABLES:
+                if material not in categories or condition not in conditions[material]:
+                    continue
+            key = (table, material, condition, row["property"])
+            if key not in seen:
+                seen.add(key)
+                yield row
+
+
+def _extract_table(table: str, columns, lines: List[str]) -> Iterator[Dict[str, str]]:
+    lines = [line for line in lines if line]
+    # The column header printed before the first category, repeated on every page
+    first = next(i for i, line in enumerate(lines) if _category(line))
+    # ...except the first material, which OCR places before the category
+    header = set(lines[:first - 1])
+
+    category = subcategory = family = condition = grade = None
+    values: List[Value] = []
+
+    def emit():
+        if family is None or not any(v != (None, None) for v in values):
+            return
+        printed = values
+        if table == "B.4" and len(values) == 2 and None not in (values[0][0], values[1][0]) \
+                and values[1][0] < values[0][0]:
+            # Yield strength never exceeds tensile strength: the missing
+            # value is the yield strength, not the elongation
+            printed = [(None, None)] + values
+        for column, value in zip(columns, printed):
+            if column is None or value == (None, None):
+                continue
+            prop, unit = column
+            low, high = value
+            if high is not None and low > high:
+                continue                          # Misread value
+            yield {
+                "table": table, "category": category or "", "material": family,
+                "condition": condition or "", "property": prop, "unit": unit,
+                "low": f"{low:g}", "high": "" if high is None else f"{high:g}",
+            }
+
+    for line in lines[first - 1:]:
+        if line.startswith("Sources") or line.startswith("Table B."):
+            if line.startswith("Sources"):
+                break
+            continue
+        if line in header or "Appendix B" in line or re.fullmatch(r"A\d+|All|[•*]?\s*A\d+|[^—–-]", line):
+            continue
+        if re.match(r"^[a-g] [A-Z]", line):      # Footnote
+            continue
+        heading = _category(line)
+        if heading:
+            category, subcategory = heading, None
+            continue
+        if line.replace(" ", "") in SUBCATEGORIES:
+            subcategory = line
+            continue
+
+        if family and family.endswith("=") and re.fullmatch(rf"{NUMBER}\)", line):
+            family = f"{family} {line}"           # Wrapped name end, printed after a condition
+            continue
+
+        value = parse_value(line)
+        if value is None and re.match(r"^[\d<>]", line):
+            value = (None, None)                  # Unreadable value keeps its column
+        glued = _split_glued_value(line) if value is None else None
+        if glued:
+            line, value = glued
+
+        if value is not None and family is not None and not glued:
+            values.append(value)
+            # "210 (30)": the SI value, then the US-customary one in parentheses
+            us_value = re.search(r"\(([^()]*)\)", line)
+            if us_value and len(values) < len(columns) and columns[len(values)] is None:
+                values.append(parse_value(us_value.group(1)) or (None, None))
+            if len(values) == len(columns):
+                yield from emit()
+                values = []
+            continue
+
+        # A material name, a condition of the current material, or the
+        # wrapped end of the previous name
+        line = re.sub(r"\s+[a-g]$", "", line)    # Footnote mark
+        if family and not values and value is None and line[0] not in "•." and not DIRECTIONS.match(line):
+            continues = line[0] == "(" or line[0].islower()
+            if family.endswith(("=", ",")) or line.count(")") > line.count("("):
+                family = f"{family} {line}"       # Wrapped name
+                continue
+            if condition and (continues or line[0] == "@"):
+                condition = f"{condition} {line}"  # Wrapped condition
+                continue
+            if continues:
+                family = f"{family} {line}"
+                continue
+        yield from emit()
+        values = [] if value is None else [value]
+        if line[0] in "•.":
+            grade = condition = line.lstrip("•. ").strip()
+            if condition.count(")") > condition.count("("):
+                grade = condition = condition.rstrip(")").strip()   # OCR lost "(1/2"
+        elif DIRECTIONS.match(line):
+            # A direction of a fiber grade, or of the composite itself
+            condition = f"{grade}, {line}" if grade else line
+        else:
+            # OCR reads the copper alloy prefix C1 as "Cl" or "Cl "
+            family, condition, grade = re.sub(r"\bCl\s?(\d{4})\b", r"C1\1", line), None, None
+        if len(values) == len(columns):
+            yield from emit()
+            values = []
+    yield from emit()
+
+
+def write_data_file(path: str, rows) -> int:
+    """Write extracted rows to a TSV file; returns the number of rows."""
+    rows = list(rows)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TSV_FIELDS, delimiter="\t", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+# Shared instance, loaded on first use
+_materials_db: Optional[MaterialsDatabase] = None
+_materials_db_lock = threading.Lock()
+
+
+def get_materials_db() -> MaterialsDatabase:
+    """Return the shared materials database."""
+    global _materials_db
+    if _materials_db is None:
+        with _materials_db_lock:
+            if _materials_db is None:
+                _materials_db = MaterialsDatabase(os.getenv("MATERIALS_DATA_PATH", DEFAULT_DATA_PATH))
+    return _materials_db
+
+
+if __name__ == "__main__":
+    # Extraction step: python materials_db.py [textbook.txt]
+    import sys
+
+    source = sys.argv[1] if len(sys.argv) > 1 else "materials-science-textbook.txt"
+    with open(source, "r", encoding="utf-8", errors="ignore") as f:
+        text = f.read()
+    count = write_data_file(DEFAULT_DATA_PATH, extract_appendix_tables(text))
+    print(f"✅ Extracted {count} property values from {source} -> {DEFAULT_DATA_PATH}")
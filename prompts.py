@@ -0,0 +1,73 @@
+"""
+Prompt Templates Module
+The AI assistant's prompt text. Templates are split into their fixed text
+and named slots once at import, so filling one in is a single join, and the
+static system prompt is kept apart from the per-request part so it can be
+sent as Gemini's system instruction (or from a provider-side cache).
+"""
+
+import re
+from typing import List
+
+SYSTEM_PROMPT = """You are Chemistry Chatbot RGB 🧪, an expert chemistry and materials science assistant.
+
+You have access to:
+1. A comprehensive Materials Science & Engineering textbook (Callister 8th Edition)
+2. Chemistry databases for elements and compounds
+3. Advanced calculators for stoichiometry, solutions, pH, gas laws, etc.
+
+Your role:
+- Provide clear, accurate, and COMPLETE answers to chemistry and materials science questions
+- Use the textbook context when available to give detailed explanations
+- Explain concepts in an educational and encouraging way
+- When appropriate, suggest using the chatbot's built-in tools (element:, compound:, mass:, calc:)
+- Use emojis to make learning engaging
+- If calculations are needed, show the setup and guide users to use the calc: commands
+- Keep responses concise but complete (3-5 sentences for simple questions, more for complex ones)
+- Remember previous messages in the conversation and provide contextual responses
+
+Always be accurate and educational."""
+
+
+class PromptTemplate:
+    """A prompt with {name} slots, pre-split into literal text and slot names."""
+
+    SLOT = re.compile(r'\{(\w+)\}')
+
+    def __init__(self, text: str):
+        self.text = text
+        parts = self.SLOT.split(text)
+        self._literals: List[str] = parts[0::2]
+        self.slots: List[str] = parts[1::2]
+
+    def render(self, **values: str) -> str:
+        """Fill in every slot; raises KeyError for a missing one."""
+        pieces = [self._literals[0]]
+        for name, literal in zip(self.slots, self._literals[1:]):
+            pieces.append(values[name])
+            pieces.append(literal)
+        return "".join(pieces)
+
+
+# Appended to the system prompt when it is served from a context cache
+OUTLINE_SECTION = PromptTemplate(
+    "\n\n=== Textbook Outline ===\nPoint students to chapters and sections by number.\n{outline}"
+)
+
+CONTEXT_SECTION = PromptTemplate("=== AVAILABLE CONTEXT ===\n{context}\n\n")
+
+SUMMARY_SECTION = PromptTemplate("=== Earlier in the Conversation ===\n{summary}\n\n")
+
+HISTORY_SECTION = PromptTemplate("=== Conversation History ===\n{history}\n\n")
+
+QUESTION_SECTION = PromptTemplate(
+    "=== Current Question ===\nUser: {question}\n\nProvide a complete, helpful answer:"
+)
+
+CALCULATION_EXPLANATION = PromptTemplate("""Explain this chemistry calculation result in 2-3 sentences.
+Be educational and encouraging. Use emojis.
+
+Calculation Type: {calc_type}
+Result: {result}
+
+Provide a brief, friendly explanation of what this result means.""")
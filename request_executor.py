@@ -0,0 +1,282 @@
+"""
+Request Executor Module
+Request-scoped execution for answering one chat message. Independent steps
+(textbook retrieval, the Gemini call, calc: explanations, PubChem lookups)
+run in parallel on a shared thread pool, a step asked for twice with the
+same arguments in one request runs once, and waiting on any step is bounded
+by the request's deadline. The pool only adds parallelism: when all its
+workers are busy, a step waits for its request's own thread instead of
+queueing behind other requests' steps. Steps nobody will wait for (the
+deadline passed or the request ended) are skipped instead of run. Every step's duration is
+recorded so responses can report where the time went.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_DEADLINE = 25.0   # Seconds, below typical serverless time limits
+
+
+class StepPool:
+    """
+    Threads shared by the steps of all requests that can tell whether one
+    is free, so a busy pool never makes a request wait in its queue.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="step")
+        self._free = threading.Semaphore(max_workers)
+
+    def try_submit(self, fn: Callable, *args) -> bool:
+        """Start fn(*args) if a worker is free; False (and nothing started) otherwise."""
+        if not self._free.acquire(blocking=False):
+            return False
+        self._executor.submit(self._run, fn, args, True)
+        return True
+
+    def submit(self, fn: Callable, *args):
+        """Start fn(*args), queueing it if every worker is busy."""
+        self._executor.submit(self._run, fn, args, self._free.acquire(blocking=False))
+
+    def _run(self, fn: Callable, args: tuple, counted: bool):
+        try:
+            fn(*args)
+        finally:
+            if counted:
+                self._free.release()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+# Steps that outlive their request (the deadline passed) keep running, so
+# the pool is shared and bounded rather than per request
+_pool: Optional[StepPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_step_pool() -> StepPool:
+    """Return the shared pool that runs request steps."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = StepPool(max_workers=int(os.getenv("REQUEST_WORKERS", 16)))
+    return _pool
+
+
+class RequestExecutor:
+    """
+    Runs and times the steps of one request.
+
+    Steps are keyed by name and arguments: asking for the same step again
+    returns the first one's result (or waits for it) instead of repeating
+    the work. Without a pool, steps run in the calling thread as they are
+    submitted, so code can use an executor whether or not a request scope
+    is active.
+    """
+
+    def __init__(self, deadline: Optional[float] = DEFAULT_DEADLINE, pool: Optional[StepPool] = None):
+        """
+        Args:
+            deadline: Seconds the request may take (None = no limit)
+            pool: Threads for submitted steps (None = run them inline)
+        """
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline if deadline is not None else None
+        self._pool = pool
+        self.finished = False
+        self._steps: Dict[tuple, Future] = {}
+        self._unstarted: Dict[Future, tuple] = {}   # Left for the waiting thread
+        self._timings: List[dict] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None = no limit)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    # ==================== STEPS ====================
+
+    def submit(self, name: str, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Start a step in the background (or reuse the identical one already
+        started). Past the deadline the step is skipped: waiting on it gives
+        the default straight away.
+        """
+        return self._submit(name, fn, args, kwargs, detached=False)
+
+    def submit_detached(self, name: str, fn: Callable, *args, **kwargs) -> Future:
+        """
+        submit() for a step whose result may be handed off when the request
+        stops waiting (see background_tasks.track): it runs even past the
+        deadline or after the request has ended.
+        """
+        return self._submit(name, fn, args, kwargs, detached=True)
+
+    def _submit(self, name: str, fn: Callable, args: tuple, kwargs: dict, detached: bool) -> Future:
+        future, owner = self._claim(name, fn, args, kwargs)
+        if owner:
+            if not detached and self.expired():
+                self._skip(future, name)
+            elif self._pool is None:
+                self._complete(future, name, fn, args, kwargs)
+            else:
+                # Steps see the request's context variables, nested steps included
+                context = contextvars.copy_context()
+                start = (context.run, self._start, future, name, fn, args, kwargs, detached)
+                if detached:
+                    self._pool.submit(*start)
+                elif not self._pool.try_submit(*start):
+                    with self._lock:
+                        self._unstarted[future] = (name, fn, args, kwargs)
+        return future
+
+    def run(self, name: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run a step in the calling thread (or wait for the identical one) and return its result."""
+        future, owner = self._claim(name, fn, args, kwargs)
+        if owner:
+            self._complete(future, name, fn, args, kwargs)
+        else:
+            self._run_unstarted(future)
+        return future.result()
+
+    def wait(self, future: Future, default: Any = None, name: str = "step") -> Any:
+        """
+        The result of a step, or default if the deadline passes first. The
+        step itself keeps running; its result is simply not waited for. A
+        step that found no free worker runs here, in the waiting thread.
+        """
+        self._run_unstarted(future)
+        try:
+            return future.result(timeout=self.remaining())
+        except CancelledError:
+            return default                        # Skipped
+        except TimeoutError:
+            self._record(name, self.started, "timeout")
+            return default
+
+    async def run_async(self, name: str, awaitable, default: Any = None) -> Any:
+        """
+        Await a step of an async request and time it. Past the deadline the
+        step is cancelled and default returned; errors propagate.
+        """
+        start = time.monotonic()
+        if self.expired():
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            self._record(name, start, "skipped")
+            return default
+        try:
+            result = await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            self._record(name, start, "timeout")
+            return default
+        except Exception:
+            self._record(name, start, "error")
+            raise
+        self._record(name, start, "ok")
+        return result
+
+    def _claim(self, name: str, fn: Callable, args: tuple, kwargs: dict):
+        key = (name, fn, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable arguments (dicts, lists): never shared
+            key = (name, object())
+        with self._lock:
+            future = self._steps.get(key)
+            if future is not None:
+                self._timings.append({"step": name, "ms": 0.0, "status": "reused"})
+                return future, False
+            future = self._steps[key] = Future()
+            return future, True
+
+    def _start(self, future: Future, name: str, fn: Callable, args: tuple, kwargs: dict, detached: bool):
+        # A step still queued when its request stopped waiting would only
+        # hold a worker that live requests need
+        if not detached and (self.finished or self.expired()):
+            self._skip(future, name)
+        else:
+            self._complete(future, name, fn, args, kwargs)
+
+    def _run_unstarted(self, future: Future):
+        with self._lock:
+            step = self._unstarted.pop(future, None)
+        if step is None:
+            return
+        name, fn, args, kwargs = step
+        if self.expired():
+            self._skip(future, name)
+        else:
+            self._complete(future, name, fn, args, kwargs)
+
+    def _skip(self, future: Future, name: str):
+        self._record(name, time.monotonic(), "skipped")
+        future.cancel()
+
+    def _complete(self, future: Future, name: str, fn: Callable, args: tuple, kwargs: dict):
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._record(name, start, "error")
+            future.set_exception(e)
+        else:
+            self._record(name, start, "ok")
+            future.set_result(result)
+
+    def _record(self, name: str, start: float, status: str):
+        with self._lock:
+            self._timings.append({"step": name, "ms": round((time.monotonic() - start) * 1000, 1), "status": status})
+
+    # ==================== REPORTING ====================
+
+    def timings(self) -> List[dict]:
+        """Steps in the order they finished, with their duration and status, then the request total."""
+        with self._lock:
+            timings = list(self._timings)
+        timings.append({"step": "total", "ms": round((time.monotonic() - self.started) * 1000, 1), "status": "ok"})
+        return timings
+
+
+_current: contextvars.ContextVar[Optional[RequestExecutor]] = contextvars.ContextVar("request_executor", default=None)
+
+
+def current_request() -> RequestExecutor:
+    """The active request's executor, or an inline one when no request scope is active."""
+    return _current.get() or RequestExecutor(deadline=None)
+
+
+@contextmanager
+def request_scope(deadline: Optional[float] = None) -> Iterator[RequestExecutor]:
+    """
+    Make a new executor on the shared pool the current request's for the
+    duration of the block. Inside an active scope, the block joins it.
+    """
+    active = _current.get()
+    if active is not None:
+        yield active
+        return
+    if deadline is None:
+        deadline = float(os.getenv("REQUEST_DEADLINE", DEFAULT_DEADLINE))
+    executor = RequestExecutor(deadline=deadline, pool=get_step_pool())
+    token = _current.set(executor)
+    try:
+        yield executor
+    finally:
+        executor.finished = True
+        _current.reset(token)
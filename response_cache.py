@@ -0,0 +1,155 @@
+"""
+Response Cache Module
+Reuses AI answers for repeated questions: an in-process LRU in front of an
+optional SQLite store.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from memory_cache import LRUCache
+
+DEFAULT_TTL = 24 * 3600   # One day
+
+
+def normalize_question(question: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a question."""
+    return re.sub(r'[\s?!.]+$', '', " ".join(question.lower().split()))
+
+
+def response_key(question: str, context: str = "", history: Optional[List[dict]] = None) -> str:
+    """
+    Cache key for an AI answer.
+
+    Args:
+        question: The user's message
+        context: Retrieved textbook/chemistry context included in the prompt
+        history: The conversation messages included in the prompt
+
+    Returns:
+        Hex digest covering the normalized question, the context and the history
+    """
+    history_part = [(m.get('role', 'user'), m.get('content', '')) for m in history or []]
+    payload = json.dumps([
+        normalize_question(question),
+        hashlib.sha256(context.encode('utf-8')).hexdigest(),
+        history_part,
+    ], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Caches AI answers by response_key().
+
+    Lookups check the in-process LRU first, then the SQLite file when one is
+    configured. Entries expire after ttl seconds in both tiers.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL, memory_size: int = 1024):
+        """
+        Args:
+            path: SQLite file for the persistent tier (None = memory only)
+            ttl: Lifetime of a cached answer in seconds
+            memory_size: Number of answers kept in the in-process LRU
+        """
+        self.path = path
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize=memory_size, ttl=ttl)
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+        self._db = self._open(path) if path else None
+
+    def _open(self, path: str) -> Optional[sqlite3.Connection]:
+        """Open (and create) the SQLite store, or None if the path is unusable."""
+        try:
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            print(f"⚠️ Response cache disk tier disabled for {path}: {e}")
+            return None
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached answer for a key, or None."""
+        response = self.memory.get(key)
+        if response is not None or self._db is None:
+            return response
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        response, created_at = row
+        remaining = self.ttl - (time.time() - created_at)
+        if remaining <= 0:
+            return None
+        self.disk_hits += 1
+        self.memory.set(key, response, ttl=remaining)
+        return response
+
+    def put(self, key: str, response: str):
+        """Store an answer under a key."""
+        self.memory.set(key, response)
+        if self._db is None:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, response, time.time())
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not write response cache: {e}")
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the SQLite store; returns the number removed."""
+        if self._db is None:
+            return 0
+        with self._lock:
+            removed = self._db.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            self._db.commit()
+        return removed
+
+    def stats(self) -> dict:
+        """Return memory-tier counters plus disk hits."""
+        return {
+            "memory": self.memory.stats(),
+            "disk_hits": self.disk_hits,
+            "persistent": self._db is not None,
+        }
+
+
+# Shared instance, created on first use
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the shared response cache configured from the environment."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    path=os.getenv("RESPONSE_CACHE_PATH") or None,
+                    ttl=float(os.getenv("RESPONSE_CACHE_TTL", DEFAULT_TTL)),
+                    memory_size=int(os.getenv("RESPONSE_CACHE_SIZE", 1024)),
+                )
+    return _response_cache
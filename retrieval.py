@@ -0,0 +1,107 @@
+"""
+Retrieval Module
+Fuses keyword and vector search results and packs the best passages into a
+prompt token budget.
+"""
+
+import re
+from typing import Dict, List, Set, Tuple
+
+from search_index import tokenize
+
+# Damping constant of reciprocal-rank fusion (the usual value from the literature)
+RRF_K = 60
+
+# Passages sharing at least this fraction of word pairs are treated as one
+DUPLICATE_OVERLAP = 0.5
+
+# Rough characters per token for English text; Gemini counts are close to this
+CHARS_PER_TOKEN = 4
+
+# Don't bother adding a truncated passage with less room than this
+MIN_PASSAGE_TOKENS = 40
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate number of model tokens in a text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def shingles(text: str) -> Set[Tuple[str, str]]:
+    """Consecutive term pairs of a text, used to spot overlapping passages."""
+    terms = tokenize(text)
+    return set(zip(terms, terms[1:]))
+
+
+def is_near_duplicate(a: Set, b: Set) -> bool:
+    """True when one passage's shingles are mostly contained in the other's."""
+    if not a or not b:
+        return a == b
+    return len(a & b) / min(len(a), len(b)) >= DUPLICATE_OVERLAP
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[Dict]], k: int = RRF_K) -> List[Dict]:
+    """
+    Merge ranked result lists with reciprocal-rank fusion.
+
+    Each result scores sum(1 / (k + rank)) over the lists it appears in.
+    Results from different lists whose text overlaps (say, a BM25 passage
+    and a vector chunk covering the same lines) count as one result that
+    keeps the first text seen.
+
+    Args:
+        rankings: Result lists keyed by source name, best first; results
+            need a 'context' key
+        k: Fusion damping constant
+
+    Returns:
+        Fused results, best first, each with 'score' replaced by the fused
+        score and a 'sources' list
+    """
+    fused = []
+    for source, results in rankings.items():
+        for rank, result in enumerate(results, 1):
+            contribution = 1.0 / (k + rank)
+            result_shingles = shingles(result['context'])
+            for item, item_shingles in fused:
+                if is_near_duplicate(result_shingles, item_shingles):
+                    item['score'] += contribution
+                    if source not in item['sources']:
+                        item['sources'].append(source)
+                    break
+            else:
+                fused.append(({**result, 'score': contribution, 'sources': [source]}, result_shingles))
+
+    ranked = sorted((item for item, _ in fused), key=lambda item: -item['score'])
+    for item in ranked:
+        item['score'] = round(item['score'], 6)
+    return ranked
+
+
+def pack_passages(passages: List[Dict], token_budget: int) -> List[str]:
+    """
+    Take passage texts in order until the token budget is spent.
+
+    The first passage that does not fit whole is cut at the last line (or
+    sentence) break that fits, if enough room is left to be useful.
+
+    Returns:
+        Passage texts whose estimated tokens add up to at most token_budget
+    """
+    packed = []
+    remaining = token_budget
+    for passage in passages:
+        text = passage['context'].strip()
+        cost = estimate_tokens(text)
+        if cost <= remaining:
+            packed.append(text)
+            remaining -= cost
+            continue
+        if remaining >= MIN_PASSAGE_TOKENS:
+            cut = text[:remaining * CHARS_PER_TOKEN]
+            breaks = [m.end() for m in re.finditer(r'\n|[.!?]\s', cut)]
+            if breaks:
+                cut = cut[:breaks[-1]]
+            packed.append(cut.strip())
+        break
+    return packed
@@ -0,0 +1,352 @@
+"""
+Search Index Module
+In-memory inverted index with BM25 ranking over textbook passages.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+from typing import List, Dict, Optional
+
+import numpy as np
+
+# Words that carry no meaning for ranking
+STOP_WORDS = frozenset({
+    'what', 'is', 'are', 'the', 'a', 'an', 'how', 'why', 'when', 'where',
+    'which', 'about', 'of', 'in', 'on', 'to', 'for', 'and', 'or', 'as',
+    'at', 'by', 'be', 'it', 'its', 'this', 'that', 'these', 'those', 'with',
+    'from', 'was', 'were', 'can', 'do', 'does', 'me', 'tell', 'explain',
+})
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Target size of one passage in characters
+PASSAGE_CHARS = 800
+
+# On-disk index layout: magic, source checksum, then section sizes
+INDEX_MAGIC = b'CKBIDX01'
+INDEX_HEADER = struct.Struct('<8s32s5Q')
+
+
+def normalize_term(word: str) -> str:
+    """Fold simple plurals so 'alloys' and 'alloy' share a posting list."""
+    if len(word) > 4:
+        if word.endswith('ies'):
+            return word[:-3] + 'y'
+        if word.endswith('s') and not word.endswith('ss'):
+            return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized index terms."""
+    return [
+        normalize_term(word)
+        for word in TOKEN_PATTERN.findall(text.lower())
+        if len(word) > 1 and word not in STOP_WORDS
+    ]
+
+
+class BM25Index:
+    """
+    Inverted index over fixed-size passages, ranked with Okapi BM25.
+
+    Postings are kept in flat arrays (compressed sparse rows): the postings
+    of term t are post_docs[post_start[t]:post_start[t + 1]] with matching
+    term frequencies in post_tfs.
+    """
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, passage_blob: bytes, terms: Dict[str, int], post_start: np.ndarray,
+                 post_docs: np.ndarray, post_tfs: np.ndarray,
+                 passage_starts: np.ndarray, passage_lines: np.ndarray,
+                 doc_lengths: np.ndarray, checksum: bytes = b''):
+        self.passage_blob = passage_blob
+        self.checksum = checksum
+        self.terms = terms
+        self.post_start = post_start
+        self.post_docs = post_docs
+        self.post_tfs = post_tfs
+        self.passage_starts = passage_starts
+        self.passage_lines = passage_lines
+        self.doc_lengths = doc_lengths
+
+        # Per-passage length normalization, computed once
+        num_passages = len(doc_lengths)
+        avg_length = float(doc_lengths.mean()) if num_passages else 0.0
+        if avg_length:
+            self._length_norm = self.K1 * (1 - self.B + self.B * doc_lengths / avg_length)
+        else:
+            self._length_norm = np.zeros(num_passages)
+
+    @classmethod
+    def build(cls, lines: List[str], passage_chars: int = PASSAGE_CHARS,
+              checksum: bytes = b'') -> "BM25Index":
+        """
+        Group lines into passages and index them.
+
+        Args:
+            lines: Lines of the source text
+            passage_chars: Minimum number of characters per passage
+            checksum: Digest of the source text, stored with the index
+
+        Returns:
+            A ready-to-query index
+        """
+        passages = []
+        passage_starts = [0]
+        passage_lines = []
+        postings: Dict[str, List] = {}
+        doc_lengths = []
+
+        start_line = 0
+        size = 0
+        for i, line in enumerate(lines):
+            size += len(line) + 1
+            if size >= passage_chars or i == len(lines) - 1:
+                doc_id = len(passages)
+                text = '\n'.join(lines[start_line:i + 1])
+                encoded = text.encode('utf-8')
+                passages.append(encoded)
+                passage_starts.append(passage_starts[-1] + len(encoded))
+                passage_lines.append(start_line)
+
+                counts: Dict[str, int] = {}
+                tokens = tokenize(text)
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                for token, tf in counts.items():
+                    postings.setdefault(token, []).append((doc_id, tf))
+                doc_lengths.append(len(tokens))
+
+                start_line = i + 1
+                size = 0
+
+        terms = {}
+        post_start = [0]
+        post_docs = []
+        post_tfs = []
+        for term_id, term in enumerate(sorted(postings)):
+            terms[term] = term_id
+            for doc_id, tf in postings[term]:
+                post_docs.append(doc_id)
+                post_tfs.append(tf)
+            post_start.append(len(post_docs))
+
+        return cls(
+            b''.join(passages),
+            terms,
+            np.array(post_start, dtype=np.uint32),
+            np.array(post_docs, dtype=np.uint32),
+            np.array(post_tfs, dtype=np.uint16),
+            np.array(passage_starts, dtype=np.uint32),
+            np.array(passage_lines, dtype=np.uint32),
+            np.array(doc_lengths, dtype=np.uint32),
+            checksum,
+        )
+
+    def save(self, path: str):
+        """
+        Write the index to a compact binary file.
+
+        Sections are stored back to back after a fixed header and padded to
+        8 bytes so they can be mapped straight into NumPy arrays by load().
+        """
+        vocab = '\n'.join(sorted(self.terms, key=self.terms.get)).encode('utf-8')
+        sections = [
+            self.post_start.astype('<u4').tobytes(),
+            self.post_docs.astype('<u4').tobytes(),
+            self.post_tfs.astype('<u2').tobytes(),
+            self.passage_starts.astype('<u4').tobytes(),
+            self.passage_lines.astype('<u4').tobytes(),
+            self.doc_lengths.astype('<u4').tobytes(),
+            vocab,
+            bytes(self.passage_blob),
+        ]
+        header = INDEX_HEADER.pack(
+            INDEX_MAGIC, self.checksum, len(self.terms), len(self.post_docs),
+            len(self), len(vocab), len(self.passage_blob)
+        )
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            for section in sections:
+                f.write(section)
+                f.write(b'\0' * (-len(section) % 8))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """
+        Map an index written by save() into memory without copying it.
+
+        Raises:
+            ValueError: If the file is not a search index
+        """
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(mm) < INDEX_HEADER.size:
+            raise ValueError(f"{path} is not a search index")
+        magic, checksum, num_terms, num_postings, num_passages, vocab_len, blob_len = \
+            INDEX_HEADER.unpack_from(mm)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a search index")
+
+        offset = INDEX_HEADER.size
+
+        def take(dtype: str, count: int) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(mm, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes + (-array.nbytes % 8)
+            return array
+
+        post_start = take('<u4', num_terms + 1)
+        post_docs = take('<u4', num_postings)
+        post_tfs = take('<u2', num_postings)
+        passage_starts = take('<u4', num_passages + 1)
+        passage_lines = take('<u4', num_passages)
+        doc_lengths = take('<u4', num_passages)
+        vocab = take('u1', vocab_len)
+        passage_blob = memoryview(take('u1', blob_len))
+
+        terms = bytes(vocab).decode('utf-8').split('\n') if vocab_len else []
+        return cls(
+            passage_blob,
+            dict(zip(terms, range(len(terms)))),
+            post_start,
+            post_docs,
+            post_tfs,
+            passage_starts,
+            passage_lines,
+            doc_lengths,
+            checksum,
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def passage_text(self, passage_id: int) -> str:
+        """Return the text of one passage."""
+        start = int(self.passage_starts[passage_id])
+        end = int(self.passage_starts[passage_id + 1])
+        return bytes(self.passage_blob[start:end]).decode('utf-8').strip()
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict]:
+        """
+        Rank passages against every term of the query.
+
+        Args:
+            query: Free-text query
+            top_k: Maximum number of passages to return
+
+        Returns:
+            List of dictionaries with passage id, score, line number and text,
+            best match first
+        """
+        num_passages = len(self)
+        if not num_passages or top_k <= 0:
+            return []
+
+        scores = np.zeros(num_passages)
+        matched = False
+        for term in set(tokenize(query)):
+            term_id = self.terms.get(term)
+            if term_id is None:
+                continue
+            start = int(self.post_start[term_id])
+            end = int(self.post_start[term_id + 1])
+            docs = self.post_docs[start:end]
+            tfs = self.post_tfs[start:end].astype(np.float64)
+
+            df = end - start
+            idf = math.log(1 + (num_passages - df + 0.5) / (df + 0.5))
+            scores[docs] += idf * tfs * (self.K1 + 1) / (tfs + self._length_norm[docs])
+            matched = True
+
+        if not matched:
+            return []
+
+        top_k = min(top_k, num_passages)
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        results = []
+        for passage_id in ranked:
+            score = float(scores[passage_id])
+            if score <= 0:
+                break
+            passage_id = int(passage_id)
+            results.append({
+                'passage_id': passage_id,
+                'score': round(score, 4),
+                'line_number': int(self.passage_lines[passage_id]) + 1,
+                'text': self.passage_text(passage_id),
+            })
+        return results
+
+
+def source_checksum(content: str) -> bytes:
+    """Digest of the source text used to detect a stale index file."""
+    return hashlib.sha256(content.encode('utf-8')).digest()
+
+
+def index_path_for(source_path: str) -> str:
+    """Location of the persisted index for a source file."""
+    return os.path.splitext(source_path)[0] + '.idx'
+
+
+def load_or_build_index(source_path: str, content: str) -> Optional[BM25Index]:
+    """
+    Load the persisted index for a source file, rebuilding it when stale.
+
+    The index file stores a checksum of the text it was built from. When it
+    is missing, unreadable or was built from different text, the index is
+    rebuilt from content and written back if the location is writable.
+
+    Args:
+        source_path: Path of the source text
+        content: The source text
+
+    Returns:
+        The index, or None for empty text
+    """
+    if not content:
+        return None
+
+    checksum = source_checksum(content)
+    path = index_path_for(source_path)
+    if os.path.exists(path):
+        try:
+            index = BM25Index.load(path)
+            if index.checksum == checksum:
+                return index
+            print(f"⚠️ Search index {path} is stale, rebuilding")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load search index {path}: {e}")
+
+    index = BM25Index.build(content.split('\n'), checksum=checksum)
+    try:
+        index.save(path)
+    except OSError as e:
+        print(f"⚠️ Could not save search index {path}: {e}")
+    return index
+
+
+if __name__ == "__main__":
+    # Build step: python search_index.py [textbook.txt ...]
+    import sys
+
+    for source in sys.argv[1:] or ["materials-science-textbook.txt"]:
+        with open(source, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+        built = BM25Index.build(text.split('\n'), checksum=source_checksum(text))
+        built.save(index_path_for(source))
+        print(f"✅ Indexed {source}: {len(built)} passages, {len(built.terms)} terms "
+              f"-> {index_path_for(source)}")
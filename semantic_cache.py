@@ -0,0 +1,183 @@
+"""
+Semantic Cache Module
+Serves a stored AI answer when a new question is a close paraphrase of one
+answered before ("what's BCC?" / "explain body-centered cubic").
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from embeddings import HashingEmbedder, numbers, question_terms
+from response_cache import DEFAULT_TTL
+
+DEFAULT_THRESHOLD = 0.9
+
+# Best-match similarities are counted in these bins for threshold tuning
+HISTOGRAM_EDGES = [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 1.0]
+
+
+# Words that put terms on two sides: "convert grams to moles", "is X stronger than Y"
+SIDE_WORDS = re.compile(r"\b(?:than|to|into|from|in|vs|versus)\b")
+
+
+def _sides(question: str) -> Dict[str, int]:
+    """Each term of a question → the stretch between side words it first appears in."""
+    sides = {}
+    for i, part in enumerate(SIDE_WORDS.split(question.lower())):
+        for term in question_terms(part):
+            sides.setdefault(term, i)
+    return sides
+
+
+def same_question(question: str, other: str) -> bool:
+    """
+    Whether two similar questions ask the same thing. Embeddings barely see
+    numbers or word order, so "2 moles" vs "3 moles" and "convert grams to
+    moles" vs "convert moles to grams" are checked here: the numbers must
+    match, and terms the questions share must be on the same side of words
+    like "to" and "than".
+    """
+    if numbers(question) != numbers(other):
+        return False
+    sides, other_sides = _sides(question), _sides(other)
+    return all(sides[term] == other_sides[term] for term in sides.keys() & other_sides.keys())
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache from question embeddings to answers.
+
+    Embeddings live in the rows of one preallocated matrix, so a lookup is a
+    single matrix-vector product. When the cache is full, the least recently
+    used answer is replaced.
+    """
+
+    def __init__(self, embedder: Optional[HashingEmbedder] = None, maxsize: int = 2048,
+                 threshold: float = DEFAULT_THRESHOLD, ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            embedder: Question embedder (a default HashingEmbedder if None)
+            maxsize: Maximum number of answers kept
+            threshold: Minimum cosine similarity for a question to count as a repeat
+            ttl: Lifetime of an answer in seconds
+        """
+        self.embedder = embedder or HashingEmbedder(questions=True)
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        self._vectors = np.zeros((maxsize, self.embedder.dim), dtype=np.float32)
+        self._expires = np.zeros(maxsize)      # 0 marks an empty slot
+        self._last_used = np.zeros(maxsize)
+        self._questions = [None] * maxsize
+        self._answers = [None] * maxsize
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.rejected = 0
+        self.lookup_seconds = 0.0
+        self.max_lookup_seconds = 0.0
+        self.histogram = [0] * len(HISTOGRAM_EDGES)
+
+    def _best_match(self, vector: np.ndarray, now: float):
+        """Slot and similarity of the closest live entry (slot -1 if there is none)."""
+        similarities = self._vectors @ vector
+        similarities[self._expires <= now] = -1.0
+        slot = int(np.argmax(similarities))
+        if similarities[slot] < 0:
+            return -1, 0.0
+        return slot, float(similarities[slot])
+
+    def lookup(self, question: str) -> Optional[str]:
+        """Return the answer stored for the closest earlier question, if it is close enough."""
+        start = time.perf_counter()
+        vector = self.embedder.embed(question)
+        with self._lock:
+            now = time.monotonic()
+            slot, similarity = self._best_match(vector, now) if vector.any() else (-1, 0.0)
+            answer = None
+            if slot >= 0 and similarity >= self.threshold:
+                if same_question(question, self._questions[slot]):
+                    answer = self._answers[slot]
+                    self._last_used[slot] = now
+                    self.hits += 1
+                else:
+                    self.rejected += 1
+            self.lookups += 1
+            for i in range(len(HISTOGRAM_EDGES) - 1, -1, -1):
+                if similarity >= HISTOGRAM_EDGES[i]:
+                    self.histogram[i] += 1
+                    break
+            elapsed = time.perf_counter() - start
+            self.lookup_seconds += elapsed
+            self.max_lookup_seconds = max(self.max_lookup_seconds, elapsed)
+        return answer
+
+    def add(self, question: str, answer: str):
+        """Remember the answer to a question."""
+        vector = self.embedder.embed(question)
+        if not vector.any():
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot, similarity = self._best_match(vector, now)
+            if slot < 0 or similarity < 0.999 or not same_question(question, self._questions[slot]):
+                # Reuse an empty or expired slot, else the least recently used one
+                slot = int(np.argmin(np.where(self._expires <= now, -1.0, self._last_used)))
+            self._vectors[slot] = vector
+            self._expires[slot] = now + self.ttl
+            self._last_used[slot] = now
+            self._questions[slot] = question
+            self._answers[slot] = answer
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._expires[:] = 0
+            self._questions = [None] * self.maxsize
+            self._answers = [None] * self.maxsize
+            self.lookups = self.hits = self.rejected = 0
+            self.lookup_seconds = self.max_lookup_seconds = 0.0
+            self.histogram = [0] * len(HISTOGRAM_EDGES)
+
+    def stats(self) -> dict:
+        """Return size, hit rate, lookup latency and a histogram of best-match similarities."""
+        with self._lock:
+            return {
+                "size": int(np.count_nonzero(self._expires > time.monotonic())),
+                "maxsize": self.maxsize,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "rejected": self.rejected,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "mean_lookup_ms": round(1000 * self.lookup_seconds / self.lookups, 3) if self.lookups else 0.0,
+                "max_lookup_ms": round(1000 * self.max_lookup_seconds, 3),
+                "similarity_histogram": {
+                    f">={edge}": count for edge, count in zip(HISTOGRAM_EDGES, self.histogram)
+                },
+            }
+
+
+# Shared instance, created on first use
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Return the shared semantic cache configured from the environment."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticCache(
+                    maxsize=int(os.getenv("SEMANTIC_CACHE_SIZE", 2048)),
+                    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD)),
+                    ttl=float(os.getenv("RESPONSE_CACHE_TTL", DEFAULT_TTL)),
+                )
+    return _semantic_cache
@@ -0,0 +1,177 @@
+"""
+Session Store Module
+Server-side conversation state, so clients send a session id instead of the
+whole history. Each session keeps a few recent messages, cleaned of HTML
+once when they are added, and folds older messages into a rolling summary
+of bounded size. Sessions live in an in-process LRU with expiry.
+"""
+
+import html
+import os
+import re
+import threading
+import uuid
+from collections import deque
+from typing import List, Optional
+
+from memory_cache import LRUCache
+
+# Messages kept word for word (the last three exchanges)
+RECENT_MESSAGES = 6
+
+# Longest message kept in the transcript; answers are cut after this
+MAX_MESSAGE_CHARS = 1500
+
+# Size of the rolling summary of older messages, and of each point in it
+SUMMARY_CHARS = 800
+SUMMARY_POINT_CHARS = 160
+
+# Longest history accepted from clients that still send one
+MAX_HISTORY_MESSAGES = 40
+
+DEFAULT_TTL = 6 * 3600   # Six hours of inactivity
+
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
+def clean_message(content: str, limit: int = MAX_MESSAGE_CHARS) -> str:
+    """Plain text of a chat message: tags stripped (line breaks become spaces), entities decoded, whitespace collapsed."""
+    text = re.sub(r'<(?:br|/?p|/?div|/?li|/?tr)\b[^>]*>', ' ', content or "", flags=re.IGNORECASE)
+    text = " ".join(html.unescape(re.sub(r'<[^<]+?>', '', text)).split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def first_sentence(text: str, limit: int = SUMMARY_POINT_CHARS) -> str:
+    """The opening sentence of a text, cut to limit characters."""
+    match = re.match(r'(.+?[.!?])(\s|$)', text)
+    sentence = match.group(1) if match else text
+    return sentence if len(sentence) <= limit else sentence[:limit - 1].rstrip() + "…"
+
+
+class Session:
+    """
+    One conversation: recent messages word for word plus a summary of the
+    rest. Both are bounded, so prompts stop growing with the conversation.
+    """
+
+    def __init__(self, session_id: Optional[str] = None):
+        """
+        Args:
+            session_id: Id in the session store (None for a throwaway session)
+        """
+        self.id = session_id
+        self.turns = 0
+        self._recent: deque = deque()
+        self._summary: deque = deque()
+        self._summary_chars = 0
+        self._messages: Optional[List[dict]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_history(cls, history: Optional[List[dict]], current_message: str = "") -> "Session":
+        """
+        A throwaway session from a client-sent history.
+
+        The client may already have appended the current message; it is
+        dropped so the question is not repeated in its own history.
+        """
+        history = list(history or [])[-MAX_HISTORY_MESSAGES:]
+        if (history and history[-1].get('role', 'user') == 'user'
+                and history[-1].get('content', '').strip() == current_message.strip()):
+            history.pop()
+        session = cls()
+        for message in history:
+            session.add(message.get('role', 'user'), message.get('content', ''))
+        return session
+
+    def add(self, role: str, content: str):
+        """Append a message, folding the oldest recent one into the summary when full."""
+        message = {'role': 'user' if role == 'user' else 'assistant', 'content': clean_message(content)}
+        with self._lock:
+            self._recent.append(message)
+            while len(self._recent) > RECENT_MESSAGES:
+                self._fold(self._recent.popleft())
+            self.turns += 1
+            self._messages = None
+
+    def add_exchange(self, user_message: str, response: str):
+        """Record a question and the answer given to it."""
+        self.add('user', user_message)
+        self.add('assistant', response)
+
+    def _fold(self, message: dict):
+        label = "User asked" if message['role'] == 'user' else "Assistant answered"
+        point = f"{label}: {first_sentence(message['content'])}"
+        self._summary.append(point)
+        self._summary_chars += len(point) + 1
+        while self._summary_chars > SUMMARY_CHARS and len(self._summary) > 1:
+            self._summary_chars -= len(self._summary.popleft()) + 1
+
+    def messages(self) -> List[dict]:
+        """
+        The history to put in a prompt: a 'summary' message (when older
+        messages were folded) followed by the recent messages, oldest first.
+        """
+        messages = self._messages
+        if messages is None:
+            with self._lock:
+                messages = [{'role': 'summary', 'content': "\n".join(self._summary)}] if self._summary else []
+                messages += list(self._recent)
+                self._messages = messages
+        return messages
+
+    def __len__(self) -> int:
+        return self.turns
+
+
+class SessionStore:
+    """Bounded store of sessions by id; the least recently used are evicted."""
+
+    def __init__(self, maxsize: int = 1000, ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            maxsize: Number of sessions kept
+            ttl: Seconds of inactivity after which a session is forgotten
+        """
+        self._sessions = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, session_id: Optional[str] = None) -> Session:
+        """
+        The session with this id, or a new empty one: under the given id when
+        it is well formed but unknown (expired, evicted or kept by another
+        worker), under a fresh id otherwise.
+        """
+        if not session_id or not SESSION_ID_PATTERN.match(session_id):
+            session_id = uuid.uuid4().hex
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = Session(session_id)
+        # Storing again restarts the inactivity timer
+        self._sessions.set(session_id, session)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        """Forget a session; returns whether it existed."""
+        return self._sessions.pop(session_id) is not None
+
+    def stats(self) -> dict:
+        """Number of sessions and lookup counters."""
+        return self._sessions.stats()
+
+
+# Shared instance, created on first use
+_session_store: Optional[SessionStore] = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Return the shared session store."""
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                _session_store = SessionStore(
+                    maxsize=int(os.getenv("SESSION_STORE_SIZE", 1000)),
+                    ttl=float(os.getenv("SESSION_TTL", DEFAULT_TTL)),
+                )
+    return _session_store
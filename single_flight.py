@@ -0,0 +1,100 @@
+"""
+Single Flight Module
+Request coalescing: while a call for a key is in flight, identical calls
+(same key) wait for it and share its result instead of making their own
+upstream request. When a class sends "compound: aspirin" at the same
+moment, PubChem sees one lookup.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SharedCallCancelled(Exception):
+    """Raised in the callers sharing a call whose leader was cancelled."""
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key, across threads and event loops.
+    Only calls that overlap in time are shared; nothing is remembered once
+    a call finishes. An exception raised by the shared call is raised in
+    every caller.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def begin(self, key: Hashable) -> Tuple[Future, bool]:
+        """
+        Join the call in flight for key, or lead a new one. Returns the
+        call's future and whether the caller leads it; a leader must call
+        end() with the outcome, which every follower then receives.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = self._calls[key] = Future()
+            # A running future cannot be cancelled, so a follower that goes
+            # away (its task cancelled through wrap_future) leaves the
+            # shared call alone
+            future.set_running_or_notify_cancel()
+            self.calls += 1
+            return future, True
+
+    def end(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None):
+        """Finish a call led with begin(): hand the outcome to its followers."""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if future.done():
+            return
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass                                  # Finished meanwhile
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Return fn(*args, **kwargs), or the result of the identical call already in flight."""
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.end(key, future, error=e)
+            raise
+        self.end(key, future, result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """do() for a coroutine function; followers wait without blocking their event loop."""
+        future, leader = self.begin(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            # The leader's request went away; its followers fall back instead of being cancelled too
+            self.end(key, future, error=SharedCallCancelled(f"shared call {key!r} was cancelled"))
+            raise
+        except BaseException as e:
+            self.end(key, future, error=e)
+            raise
+        self.end(key, future, result)
+        return result
+
+    def stats(self) -> dict:
+        """Upstream calls made, calls that shared one already in flight, and calls in flight now."""
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._calls)}
@@ -0,0 +1,107 @@
+"""
+Offline test for the async (ASGI) serving mode
+"""
+import asyncio
+import json
+
+import ai_assistant
+from asgi_app import app
+from http_client import get_http_service
+
+
+async def call(method, path, body=None):
+    """Send one request straight to the ASGI app; returns (status, body text)."""
+    messages = [{"type": "http.request", "body": json.dumps(body).encode() if body is not None else b""}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"content-type", b"application/json")], "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1234),
+    }
+    await app(scope, receive, send)
+    return sent[0]["status"], b"".join(message.get("body", b"") for message in sent[1:]).decode()
+
+
+def test_async_routes():
+    """Commands, compounds and explanations are answered by the async handlers."""
+    async def run():
+        status, body = await call("POST", "/chat", {"message": "mass: H2O", "history": []})
+        payload = json.loads(body)
+        assert status == 200 and "18.015" in payload["response"]
+        assert payload["timings"][-1]["step"] == "total"
+        status, body = await call("GET", "/compound/aspirin")
+        assert status == 200 and json.loads(body)["cid"] == 2244
+        status, body = await call("GET", "/explanation/not-a-task")
+        assert status == 404 and json.loads(body)["status"] == "unknown"
+        status, body = await call("POST", "/chat/stream", {"message": "calc: ph | H=0.001", "history": []})
+        assert status == 200 and body.startswith("event: done") and "pH: 3.0" in body
+    asyncio.run(run())
+    print("✓ Async chat, stream, compound and explanation routes")
+
+
+def test_concurrency_and_flask_fallback():
+    """Many chats run at once; other routes are served by the Flask app."""
+    async def run():
+        results = await asyncio.gather(*(
+            call("POST", "/chat", {"message": "element: Fe", "history": []}) for _ in range(50)
+        ))
+        assert all(status == 200 and "iron" in body for status, body in results)
+        status, body = await call("GET", "/element/Na")
+        assert status == 200 and json.loads(body)["name"].lower() == "sodium"
+    asyncio.run(run())
+    print("✓ 50 concurrent chats; Flask routes still served")
+
+
+class FakeAssistant:
+    """Records whether shutdown closed its connections."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_lifespan_closes_clients():
+    """Shutdown closes the PubChem client and the assistant's Gemini connections."""
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    async def run():
+        get_http_service("pubchem").async_client
+        await app({"type": "lifespan"}, receive, send)
+
+    assistant, ai_assistant._ai_assistant = ai_assistant._ai_assistant, FakeAssistant()
+    try:
+        fake = ai_assistant._ai_assistant
+        asyncio.run(run())
+    finally:
+        ai_assistant._ai_assistant = assistant
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert fake.closed and get_http_service("pubchem")._async_client is None
+    print("✓ Shutdown closes the PubChem and Gemini clients")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing ASGI App (offline)")
+    print("=" * 50)
+    test_async_routes()
+    test_concurrency_and_flask_fallback()
+    test_lifespan_closes_clients()
+    print("=" * 50)
+    print("✅ ASGI tests PASSED")
@@ -0,0 +1,79 @@
+"""
+Offline test for background tasks and explanations sent on /chat/stream
+"""
+import asyncio
+import time
+
+import main
+from background_tasks import TaskStore
+
+
+class FakeAssistant:
+    """Stands in for Gemini: explains any calculation after a short delay."""
+
+    def is_available(self):
+        return True
+
+    def generate_calculation_explanation(self, calc_type, result):
+        time.sleep(0.2)
+        return f"Explained {calc_type}"
+
+
+def test_task_store():
+    """Tasks are found by id until they expire; waiting returns their outcome."""
+    store = TaskStore(max_workers=2, ttl=0.5)
+    slow = store.submit(time.sleep, 0.2)
+    failing = store.submit(int, "not a number")
+    assert store.status(slow) == {"status": "pending"}
+    assert store.wait(slow, timeout=0.01) == {"status": "pending"}
+    assert store.wait(slow, timeout=1) == {"status": "done", "result": None}
+    assert store.wait(failing, timeout=1)["status"] == "error"
+    assert store.status("no-such-task") == {"status": "unknown"}
+    print("✓ Tasks looked up and waited for by id")
+
+    async def start_and_wait():
+        task_id = store.start(asyncio.sleep(0.05, result="later"))
+        return await store.wait_async(task_id, timeout=1), await store.wait_async(slow, timeout=1)
+    assert asyncio.run(start_and_wait()) == ({"status": "done", "result": "later"},
+                                             {"status": "done", "result": None})
+
+    time.sleep(0.6)
+    assert store.status(slow) == {"status": "unknown"}
+    print("✓ Tasks expire after their TTL")
+
+
+def test_stream_sends_explanation():
+    """/chat/stream sends the explanation as an event after "done"; /chat still returns an id."""
+    client = main.app.test_client()
+    message = {"message": "calc: ph | H=0.001", "history": [], "async_explanation": True}
+    get_ai_assistant = main.get_ai_assistant
+    main.get_ai_assistant = FakeAssistant
+    try:
+        body = client.post("/chat/stream", json=message).get_data(as_text=True)
+        payload = client.post("/chat", json=message).get_json()
+    finally:
+        main.get_ai_assistant = get_ai_assistant
+
+    events = [frame.split("\n")[0] for frame in body.strip().split("\n\n")]
+    assert events == ["event: done", "event: explanation"], events
+    assert "explanation_id" not in body and "pH: 3.0" in body
+    assert '"explanation": "Explained ph"' in body
+    print("✓ Stream: done, then explanation")
+
+    explanation = client.get(f"/explanation/{payload['explanation_id']}")
+    while explanation.get_json()["status"] == "pending":
+        time.sleep(0.05)
+        explanation = client.get(f"/explanation/{payload['explanation_id']}")
+    assert explanation.get_json() == {"status": "done", "explanation": "Explained ph"}
+    assert client.get("/explanation/no-such-task").status_code == 404
+    print("✓ /chat explanations are still fetched by id")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Background Tasks (offline)")
+    print("=" * 50)
+    test_task_store()
+    test_stream_sends_explanation()
+    print("=" * 50)
+    print("✅ Background task tests PASSED")
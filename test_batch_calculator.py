@@ -0,0 +1,74 @@
+"""
+Offline test for the vectorized batch calculator and /calc/batch
+"""
+import json
+import math
+
+from batch_calculator import BatchCalculator, iter_result_rows, run_batch
+from chemistry_calculator import ChemistryCalculator
+from main import app
+
+
+def test_matches_scalar_calculator():
+    """Batch rows carry the same keys and values as the scalar methods."""
+    scalar = ChemistryCalculator()
+    row = next(iter_result_rows(run_batch("moles_to_grams", {"formula": ["H2O"], "moles": [2]})))
+    assert row.items() >= scalar.moles_to_grams("H2O", 2).items() and row["error"] is None
+    row = next(iter_result_rows(run_batch("dilution", {"M1": [2], "V1": [1], "V2": [4]})))
+    assert row.items() >= scalar.dilution(2, 1, V2=4).items()
+    for calc_type, inputs, expected in (
+        ("moles_to_molecules", {"moles": [1]}, scalar.moles_to_molecules(1)),
+        ("ph", {"H": [0.001]}, scalar.calculate_pH(0.001)),
+        ("ideal_gas", {"P": [1], "V": [22.4], "n": [1]}, scalar.ideal_gas_law(P=1, V=22.4, n=1)),
+    ):
+        row = next(iter_result_rows(run_batch(calc_type, inputs)))
+        assert set(row) == set(expected) | {"error"}, calc_type
+    print("✓ Batch results use the scalar calculator's keys and values")
+
+
+def test_missing_inputs():
+    """Missing formulas and dilution inputs are reported per row."""
+    result = BatchCalculator().moles_to_grams(["H2O", None, "", float("nan")], [1, 1, 1, 1])
+    assert result["grams"][0] == 18.015 and all(math.isnan(grams) for grams in result["grams"][1:])
+    assert list(result["error"]) == [None] + ["Missing formula"] * 3
+
+    result = BatchCalculator().dilution([2, None, 2], [1, 1, None], [None, None, None], [4, 4, 4])
+    assert result["final_molarity"][0] == 0.5
+    assert list(result["error"]) == [None] + ["Need M1, V1, and either M2 or V2"] * 2
+    print("✓ Missing inputs are flagged, not computed")
+
+
+def test_bad_requests():
+    """Malformed batches are rejected with 400, naming what is wrong."""
+    for inputs, message in (
+        (("dilution", {"M1": [1]}), "needs columns: V1"),
+        (("ph", {"H": ["acid"]}), "Not a number"),
+        (("ph", {"H": [[1]]}), "Not a number"),
+        ((["ph"], {"H": [1]}), "must be a string"),
+    ):
+        try:
+            run_batch(*inputs)
+        except ValueError as e:
+            assert message in str(e), str(e)
+        else:
+            raise AssertionError(f"{inputs} was accepted")
+
+    client = app.test_client()
+    for body in ({"type": "ph", "columns": [1, 2]}, {"type": ["ph"], "columns": {"H": [1]}},
+                 {"type": "ph", "columns": {"H": 1}}, {"type": "ph", "rows": "H"}, [1, 2]):
+        response = client.post("/calc/batch", json=body)
+        assert response.status_code == 400 and "error" in response.get_json(), body
+    response = client.post("/calc/batch", json={"type": "ph", "rows": [{"H": 0.01}]})
+    assert response.status_code == 200 and json.loads(response.get_data(as_text=True))["pH"] == 2.0
+    print("✓ Malformed batches get a 400")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Batch Calculator (offline)")
+    print("=" * 50)
+    test_matches_scalar_calculator()
+    test_missing_inputs()
+    test_bad_requests()
+    print("=" * 50)
+    print("✅ Batch calculator tests PASSED")
@@ -0,0 +1,64 @@
+"""
+Offline test for the table-driven chat command router
+"""
+import random
+
+from command_router import Intent, IntentTable, KeywordMatcher, PrefixTrie
+
+
+def test_prefix_trie():
+    """The longest registered prefix wins, case-insensitively."""
+    trie = PrefixTrie()
+    for prefix in ("calc:", "calc:batch", "element:", "mass:"):
+        trie.add(prefix, prefix.upper())
+    assert trie.match("Element: Fe") == ("element:", "ELEMENT:")
+    assert trie.match("calc:batch ph") == ("calc:batch", "CALC:BATCH")
+    assert trie.match("calc: ph | H=0.001") == ("calc:", "CALC:")
+    assert trie.match("calculate this") is None
+    assert trie.match("what is element: Fe?") is None
+    assert trie.prefixes() == ["calc:", "calc:batch", "element:", "mass:"]
+    print("✓ Command prefixes matched in one pass")
+
+
+def test_keyword_matcher():
+    """One scan finds exactly the keywords a per-keyword `in` test would."""
+    keywords = ["ph", "phase diagram", "he", "she", "hers", "h2o", "a", "aab", "base"]
+    matcher = KeywordMatcher(keywords)
+    assert matcher.find("Draw the PHASE DIAGRAM") == {"he", "ph", "phase diagram", "a"}
+    rng = random.Random(7)
+    for _ in range(2000):
+        text = "".join(rng.choice("phasedigrmb2o ") for _ in range(rng.randint(0, 30)))
+        assert matcher.find(text) == {k for k in keywords if k in text}, text
+    print("✓ Keyword scan agrees with substring tests")
+
+
+def test_intent_order():
+    """The first matching intent that answers wins; guards and requirements apply."""
+    table = IntentTable([
+        Intent("maybe", ("steel",), lambda message, found: None),
+        Intent("water", ("water",), lambda message, found: "water"),
+        Intent("hydrogen", ("hydrogen",), lambda message, found: "hydrogen",
+               exact=("h",), guard=lambda lower: not lower.startswith("element:")),
+        Intent("help", ("help",), lambda message, found: "help"),
+        Intent("calc", ("calc",), lambda message, found: "calc", requires=("example", "help")),
+        Intent("steel", ("steel",), lambda message, found: "steel"),
+    ])
+    assert table.respond("Hydrogen in water") == "water"
+    assert table.respond(" H ") == "hydrogen"
+    assert table.respond("element: hydrogen") is None
+    assert table.respond("calc help") == "help"
+    assert table.respond("calc examples") == "calc"
+    assert table.respond("calc") is None
+    assert table.respond("stainless steel") == "steel", "an intent without an answer falls through"
+    print("✓ Intents answered in priority order")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Command Router (offline)")
+    print("=" * 50)
+    test_prefix_trie()
+    test_keyword_matcher()
+    test_intent_order()
+    print("=" * 50)
+    print("✅ Command router tests PASSED")
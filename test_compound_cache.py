@@ -0,0 +1,160 @@
+"""
+Offline test for the PubChem compound cache
+Uses a local stand-in for PubChem, so no network access is needed.
+"""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from compound_cache import CompoundCache
+
+# Stand-in for PubChem: a few known compounds
+FAKE_PUBCHEM = {
+    "water": {"name": "oxidane", "molecular_formula": "H2O", "molecular_weight": "18.015",
+              "smiles": "O", "cid": 962},
+    "ethanol": {"name": "ethanol", "molecular_formula": "C2H6O", "molecular_weight": "46.07",
+                "smiles": "CCO", "cid": 702},
+}
+
+
+class FakePubChem:
+    """Counts lookups so the tests can check when the cache goes upstream."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, name):
+        self.calls += 1
+        return FAKE_PUBCHEM.get(name.strip().lower())
+
+
+def test_memory_and_disk_tiers():
+    """A second lookup is served from memory; a new process reads SQLite."""
+    path = os.path.join(tempfile.mkdtemp(), "compounds.sqlite3")
+    pubchem = FakePubChem()
+
+    cache = CompoundCache(path=path)
+    assert cache.get("Water", pubchem)["cid"] == 962
+    assert cache.get("  water ", pubchem)["cid"] == 962
+    assert pubchem.calls == 1
+    assert cache.get_by_cid(962)["molecular_formula"] == "H2O"
+    print("✓ Repeated lookups served from memory")
+
+    restarted = CompoundCache(path=path)
+    assert restarted.get("WATER", pubchem)["smiles"] == "O"
+    assert pubchem.calls == 1
+    assert restarted.stats()["disk_hits"] == 1
+    print("✓ Lookups survive a restart through SQLite")
+
+
+def test_negative_caching():
+    """Unknown names are remembered until their shorter TTL expires."""
+    path = os.path.join(tempfile.mkdtemp(), "compounds.sqlite3")
+    pubchem = FakePubChem()
+
+    cache = CompoundCache(path=path, negative_ttl=0.2)
+    assert cache.get("unobtainium", pubchem) is None
+    assert cache.get("Unobtainium", pubchem) is None
+    assert pubchem.calls == 1
+    assert CompoundCache(path=path, negative_ttl=0.2).get("unobtainium", pubchem) is None
+    assert pubchem.calls == 1
+    print("✓ Unknown names are negatively cached")
+
+    time.sleep(0.3)
+    assert cache.get("unobtainium", pubchem) is None
+    assert pubchem.calls == 2
+    print("✓ Negative entries expire")
+
+
+def test_ttl_expiry():
+    """Found compounds are fetched again once their TTL has passed."""
+    pubchem = FakePubChem()
+    cache = CompoundCache(path=None, ttl=0.2)
+    cache.get("ethanol", pubchem)
+    time.sleep(0.3)
+    cache.get("ethanol", pubchem)
+    assert pubchem.calls == 2
+    print("✓ Expired compounds are fetched again")
+
+
+def test_disk_hit_keeps_remaining_ttl():
+    """An entry read back from SQLite expires when it was stored to, not a full TTL later."""
+    path = os.path.join(tempfile.mkdtemp(), "compounds.sqlite3")
+    pubchem = FakePubChem()
+    CompoundCache(path=path, ttl=0.4).get("water", pubchem)
+    time.sleep(0.25)
+
+    restarted = CompoundCache(path=path, ttl=0.4)
+    assert restarted.get("water", pubchem)["cid"] == 962
+    assert restarted.get_by_cid(962)["cid"] == 962
+    assert pubchem.calls == 1
+    time.sleep(0.25)
+    assert restarted.get_by_cid(962) is None
+    restarted.get("water", pubchem)
+    assert pubchem.calls == 2
+    print("✓ Disk hits keep only their remaining lifetime")
+
+
+def test_errors_are_not_cached():
+    """A failing upstream call is retried on the next lookup."""
+    cache = CompoundCache(path=None)
+    attempts = []
+
+    def flaky(name):
+        attempts.append(name)
+        if len(attempts) == 1:
+            raise ConnectionError("PubChem unavailable")
+        return FAKE_PUBCHEM["water"]
+
+    try:
+        cache.get("water", flaky)
+    except ConnectionError:
+        pass
+    assert cache.get("water", flaky)["cid"] == 962
+    assert len(attempts) == 2
+    print("✓ Upstream errors are not cached")
+
+
+def test_async_lookups_off_the_loop():
+    """get_async() reads and writes SQLite in worker threads, not on the event loop."""
+    path = os.path.join(tempfile.mkdtemp(), "compounds.sqlite3")
+    pubchem = FakePubChem()
+    CompoundCache(path=path).get("water", pubchem)
+    cache = CompoundCache(path=path)
+    threads = []
+    for method in ("_load_name", "_store"):
+        original = getattr(cache, method)
+
+        def recorded(*args, original=original):
+            threads.append(threading.current_thread())
+            return original(*args)
+        setattr(cache, method, recorded)
+
+    async def fetch(name):
+        return pubchem(name)
+
+    async def run():
+        assert (await cache.get_async("Water", fetch))["cid"] == 962          # disk hit
+        assert (await cache.get_async("ethanol", fetch))["cid"] == 702        # fetched and stored
+        assert await cache.get_async("water", fetch) is not None              # memory hit
+        return threading.current_thread()
+    loop_thread = asyncio.run(run())
+    assert len(threads) == 3 and loop_thread not in threads
+    assert pubchem.calls == 2 and cache.stats()["disk_hits"] == 1
+    print("✓ Async lookups keep SQLite off the event loop")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Compound Cache (offline)")
+    print("=" * 50)
+    test_memory_and_disk_tiers()
+    test_negative_caching()
+    test_ttl_expiry()
+    test_disk_hit_keeps_remaining_ttl()
+    test_errors_are_not_cached()
+    test_async_lookups_off_the_loop()
+    print("=" * 50)
+    print("✅ Compound cache tests PASSED")
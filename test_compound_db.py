@@ -0,0 +1,69 @@
+"""
+Offline test for the bundled memory-mapped compound database
+"""
+import filecmp
+import os
+import tempfile
+
+from compound_db import (
+    DEFAULT_DB_PATH, DEFAULT_SEED_PATH, CompoundDatabase, read_seed_file, write_database
+)
+
+COMPOUNDS = [
+    ((962, "oxidane", "H2O", 18.015, "O"), ["water", "H2O"]),
+    ((702, "ethanol", "C2H6O", 46.07, "CCO"), ["ethyl alcohol", "Alcohol"]),
+    ((887, "methanol", "CH4O", None, "CO"), ["wood alcohol", "alcohol"]),
+    ((5793, "glucose", "C6H12O6", 180.16, ""), ["dextrose"]),
+]
+
+
+def test_lookup():
+    """Binary search finds every key, first and last included, and misses cleanly."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "compounds.bin")
+        assert write_database(path, COMPOUNDS) == (4, 10)
+        db = CompoundDatabase(path)
+        assert len(db) == 4
+
+        assert db.lookup("water") == {"name": "oxidane", "molecular_formula": "H2O",
+                                      "molecular_weight": 18.015, "smiles": "O", "cid": 962}
+        assert db.lookup("  Ethyl   ALCOHOL ")["cid"] == 702
+        assert db.lookup("alcohol")["cid"] == 702, "a shared synonym belongs to the first compound"
+        assert db.lookup("methanol")["molecular_weight"] is None
+        keys = [db._key(i) for i in range(db.num_keys)]
+        assert keys == sorted(keys)
+        assert db.lookup(keys[0].decode())["cid"] == 702          # "alcohol"
+        assert db.lookup(keys[-1].decode())["cid"] == 887         # "wood alcohol"
+        for missing in ("aardvark", "zzz", "wate", "waters", ""):
+            assert db.lookup(missing) is None, missing
+        print("✓ Hits, misses, first and last keys, case and aliases")
+
+        assert CompoundDatabase(os.path.join(tmp, "missing.bin")).lookup("water") is None
+        with open(path, "wb") as f:
+            f.write(b"not a database")
+        assert CompoundDatabase(path).lookup("water") is None
+        print("✓ Missing or corrupt files give an empty database")
+
+
+def test_rebuild_from_seed():
+    """Building from the seed file reproduces the bundled database byte for byte."""
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = os.path.join(tmp, "first.bin"), os.path.join(tmp, "second.bin")
+        write_database(first, read_seed_file(DEFAULT_SEED_PATH))
+        write_database(second, read_seed_file(DEFAULT_SEED_PATH))
+        assert filecmp.cmp(first, second, shallow=False)
+        assert filecmp.cmp(first, DEFAULT_DB_PATH, shallow=False), "data/compounds.bin is out of date"
+        db = CompoundDatabase(first)
+        assert db.lookup("dihydrogen monoxide")["cid"] == 962
+        assert db.lookup("Acetic Acid")["molecular_weight"] == 60.052
+        print("✓ Rebuilding from the seed changes nothing")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Compound Database (offline)")
+    print("=" * 50)
+    test_lookup()
+    test_rebuild_from_seed()
+    print("=" * 50)
+    print("✅ Compound database tests PASSED")
@@ -0,0 +1,55 @@
+"""
+Offline test for the element lookup table and /elements
+"""
+from element_table import MAX_BULK_IDS, get_element_table, lookup_element, lookup_elements
+from main import app
+
+
+def test_lookup():
+    """Symbols, names, aliases and numbers all find the same shared record."""
+    iron = lookup_element("Fe")
+    assert iron["name"] == "iron" and iron["number"] == 26 and iron["mass"] == 55.845
+    assert lookup_element("IRON") is iron and lookup_element(26) is iron and lookup_element(" 26 ") is iron
+    assert lookup_element("aluminium") is lookup_element("Al")
+    assert lookup_element("sulphur")["symbol"] == "S"
+    assert lookup_element("wolfram")["symbol"] == "W"
+    for missing in ("Xx", "0", "unobtainium", ""):
+        assert lookup_element(missing) is None, missing
+    try:
+        get_element_table()["fe"] = {}
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("the shared table must be read-only")
+
+    result = lookup_elements(["O", "sodium", "Xx", "8"])
+    assert [record["symbol"] for record in result["elements"]] == ["O", "Na", "O"]
+    assert result["not_found"] == ["Xx"]
+    print("✓ Symbol, name, alias and number lookups")
+
+
+def test_elements_route_bounds():
+    """/elements needs at least one id and accepts at most MAX_BULK_IDS."""
+    client = app.test_client()
+    response = client.get("/elements?ids=Fe,aluminium,,8, ")
+    assert response.status_code == 200
+    assert [record["symbol"] for record in response.get_json()["elements"]] == ["Fe", "Al", "O"]
+
+    for query in ("", "?ids=", "?ids=,,", f"?ids={','.join(['Fe'] * (MAX_BULK_IDS + 1))}"):
+        response = client.get(f"/elements{query}")
+        assert response.status_code == 400 and "error" in response.get_json(), query
+    response = client.get(f"/elements?ids={','.join(['Fe'] * MAX_BULK_IDS)}")
+    assert response.status_code == 200 and len(response.get_json()["elements"]) == MAX_BULK_IDS
+
+    assert client.get("/element/26").get_json()["symbol"] == "Fe"
+    print("✓ /elements rejects empty and oversized requests")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Element Table (offline)")
+    print("=" * 50)
+    test_lookup()
+    test_elements_route_bounds()
+    print("=" * 50)
+    print("✅ Element table tests PASSED")
@@ -0,0 +1,56 @@
+"""
+Offline test for the memoized formula parser
+"""
+import threading
+
+from formula_cache import FormulaCache
+
+
+def test_hits_are_shared():
+    """Repeated formulas, whitespace aside, reuse one parsed result."""
+    cache = FormulaCache(maxsize=8)
+    water = cache.parse("H2O")
+    assert round(water.molar_mass, 3) == 18.015 and water.atoms == {"H": 2, "O": 1}
+    assert cache.parse("  H2O ") is water
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.parse("NaCl"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(result == results[0] for result in results)
+    assert cache.parse("NaCl") is cache.parse("NaCl")
+    stats = cache.stats()
+    assert stats["size"] == 2 and stats["hits"] >= 3
+    print("✓ Repeated formulas are parsed once")
+
+
+def test_bounded_and_errors_not_cached():
+    """The cache never grows past maxsize and invalid formulas are not remembered."""
+    cache = FormulaCache(maxsize=3)
+    for formula in ("H2O", "CO2", "NaCl", "CH4", "C2H6O"):
+        cache.parse(formula)
+    assert cache.stats()["size"] == 3
+    assert cache.cache.get("H2O") is None and cache.cache.get("C2H6O") is not None
+    print("✓ Cache stays bounded, evicting the least recently used")
+
+    for _ in range(2):
+        try:
+            cache.parse("Xq2")
+        except ValueError as e:
+            assert "Xq" in str(e)
+        else:
+            raise AssertionError("an invalid formula was accepted")
+    assert cache.cache.get("Xq2") is None and cache.stats()["size"] == 3
+    print("✓ Parse errors are raised every time, never cached")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Formula Cache (offline)")
+    print("=" * 50)
+    test_hits_are_shared()
+    test_bounded_and_errors_not_cached()
+    print("=" * 50)
+    print("✅ Formula cache tests PASSED")
@@ -0,0 +1,140 @@
+"""
+Offline test for the pooled outbound HTTP layer
+"""
+import asyncio
+import time
+
+import httpx
+
+from http_client import CircuitBreaker, CircuitOpenError, HttpService, backoff_delay
+from main import pubchem_properties_url, pubchem_record
+
+
+def service_with(handler, **options) -> HttpService:
+    """An HttpService whose pooled client answers from handler instead of the network."""
+    service = HttpService("test", backoff=0.001, **options)
+    service._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return service
+
+
+def test_retries():
+    """Server errors and dropped connections are retried; client errors are not."""
+    statuses = [503, 502, 200]
+    service = service_with(lambda request: httpx.Response(statuses.pop(0), json={"ok": True}))
+    assert service.get("https://example.test/").status_code == 200
+    assert service.stats()["retries"] == 2 and service.stats()["failures"] == 0
+
+    def drop(request):
+        raise httpx.ConnectError("connection reset", request=request)
+    service = service_with(drop, retries=1)
+    try:
+        service.get("https://example.test/")
+        assert False, "expected ConnectError"
+    except httpx.ConnectError:
+        pass
+    assert service.stats()["retries"] == 1 and service.stats()["failures"] == 1
+
+    service = service_with(lambda request: httpx.Response(404))
+    assert service.get("https://example.test/").status_code == 404 and service.stats()["retries"] == 0
+    assert all(0 <= backoff_delay(attempt, 0.25, 4.0) <= min(4.0, 0.25 * 2 ** attempt) for attempt in range(8))
+    print("✓ Retries with jittered backoff")
+
+
+def test_circuit_breaker():
+    """Repeated failures open the breaker; after the reset time one trial call decides."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    service = service_with(lambda request: httpx.Response(500), retries=0, breaker=breaker)
+    for _ in range(2):
+        assert service.get("https://example.test/").status_code == 500
+    assert breaker.state == "open"
+    try:
+        service.get("https://example.test/")
+        assert False, "expected CircuitOpenError"
+    except CircuitOpenError:
+        pass
+    time.sleep(0.06)
+    assert breaker.state == "half_open" and breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    print("✓ Circuit breaker opens, rejects and recovers")
+
+
+def test_abandoned_trial():
+    """A trial call that is cancelled or fails oddly reopens the breaker instead of wedging it half open."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    service = HttpService("test", breaker=breaker)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    async def cancelled_trial():
+        task = asyncio.ensure_future(service.call_async(asyncio.sleep, 10))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancelled_trial())
+    assert breaker.state == "open" and breaker.failures == 1
+    time.sleep(0.06)
+
+    def redirect(request):
+        raise httpx.TooManyRedirects("Exceeded maximum allowed redirects", request=request)
+    service = service_with(redirect, breaker=breaker)
+    try:
+        service.get("https://example.test/")
+        assert False, "expected TooManyRedirects"
+    except httpx.TooManyRedirects:
+        pass
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    assert breaker.allow()
+    print("✓ Abandoned trial calls release the breaker")
+
+
+def test_async_client_per_loop():
+    """Moving to another event loop closes the previous loop's client."""
+    service = HttpService("test")
+
+    async def client():
+        return service.async_client
+
+    first = asyncio.run(client())
+
+    async def second_loop():
+        second = service.async_client
+        await asyncio.sleep(0.01)
+        return second
+
+    assert asyncio.run(second_loop()) is not first and first.is_closed
+    print("✓ Clients of finished event loops are closed")
+
+
+def test_pubchem_record():
+    """PubChem REST responses become compound records."""
+    def pubchem(request):
+        assert request.url.path.endswith("/compound/name/acetic acid/property/"
+                                         "IUPACName,MolecularFormula,MolecularWeight,IsomericSMILES/JSON")
+        return httpx.Response(200, json={"PropertyTable": {"Properties": [{
+            "CID": 176, "MolecularFormula": "C2H4O2", "MolecularWeight": "60.05",
+            "SMILES": "CC(=O)O", "IUPACName": "acetic acid"}]}})
+    service = service_with(pubchem)
+    record = pubchem_record(service.get(pubchem_properties_url("acetic acid")), "acetic acid")
+    assert record == {"name": "acetic acid", "molecular_formula": "C2H4O2", "molecular_weight": 60.05,
+                      "smiles": "CC(=O)O", "cid": 176}
+    assert pubchem_record(httpx.Response(404), "nothing") is None
+    print("✓ PubChem records parsed")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing HTTP Client (offline)")
+    print("=" * 50)
+    test_retries()
+    test_circuit_breaker()
+    test_abandoned_trial()
+    test_async_client_per_loop()
+    test_pubchem_record()
+    print("=" * 50)
+    print("✅ HTTP client tests PASSED")
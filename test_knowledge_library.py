@@ -0,0 +1,93 @@
+"""
+Offline test for the multi-document knowledge base and its hot reload
+"""
+import os
+import tempfile
+
+from knowledge_base import KnowledgeLibrary, TextbookKnowledgeBase
+
+TEXTBOOK = """Annealing is a heat treatment in which a material is held at an
+elevated temperature and then slowly cooled.
+
+Quenching cools steel rapidly in water or oil to form martensite.
+"""
+
+LAB_MANUAL = """Lab 3: Hardness Testing
+Measure the Rockwell hardness of each specimen before and after tempering.
+"""
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_documents_and_hot_reload():
+    """New, changed and deleted documents are picked up by refresh()."""
+    with tempfile.TemporaryDirectory() as tmp:
+        docs = os.path.join(tmp, "documents")
+        os.mkdir(docs)
+        textbook_path = os.path.join(tmp, "textbook.txt")
+        write(textbook_path, TEXTBOOK)
+        library = KnowledgeLibrary(TextbookKnowledgeBase(textbook_path), docs, poll_interval=0)
+
+        assert library.ranked_search("martensite")[0]["document"] == "textbook.txt"
+        assert library.ranked_search("rockwell hardness") == []
+        print("✓ Textbook searched with its document name")
+
+        manual = os.path.join(docs, "lab-manual.md")
+        write(manual, LAB_MANUAL)
+        before = library.documents
+        assert library.refresh() == {"added": ["lab-manual.md"], "updated": [], "removed": []}
+        assert len(before) == 1, "snapshots held by readers never change"
+        hit = library.ranked_search("rockwell hardness")[0]
+        assert hit["document"] == "lab-manual.md"
+        assert library.format_response([hit], "rockwell").count("[lab-manual.md]") == 1
+        print("✓ New document indexed and searchable")
+
+        # Same text, new mtime: nothing is re-indexed
+        document = library.documents[manual]
+        stat = os.stat(manual)
+        os.utime(manual, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert not any(library.refresh().values())
+        assert library.documents[manual] is document
+
+        write(manual, LAB_MANUAL.replace("Rockwell", "Vickers"))
+        os.utime(manual, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        assert library.refresh()["updated"] == ["lab-manual.md"]
+        assert library.ranked_search("vickers")[0]["document"] == "lab-manual.md"
+        assert library.documents[textbook_path] is library.textbook
+        print("✓ Only changed documents re-indexed")
+
+        os.remove(manual)
+        assert library.refresh()["removed"] == ["lab-manual.md"]
+        assert library.ranked_search("vickers") == []
+        print("✓ Deleted document dropped")
+
+
+def test_documents_merged_by_rank():
+    """BM25 scores from different documents are not compared directly."""
+    with tempfile.TemporaryDirectory() as tmp:
+        docs = os.path.join(tmp, "documents")
+        os.mkdir(docs)
+        # "hardness" is rare in the textbook (high scores) and in every
+        # passage of the notes (low scores)
+        filler = "Grain boundaries in annealed steel move as the crystals grow.\n" * 14
+        textbook_path = os.path.join(tmp, "textbook.txt")
+        write(textbook_path, filler * 6 + "Hardness rises after quenching.\n" + filler * 6
+              + "Hardness falls after tempering.\n" + filler * 6)
+        write(os.path.join(docs, "notes.md"), "Hardness test of specimen A.\n" * 80)
+        library = KnowledgeLibrary(TextbookKnowledgeBase(textbook_path), docs, poll_interval=0)
+
+        results = library.ranked_search("hardness", top_k=2)
+        assert [result["document"] for result in results] == ["textbook.txt", "notes.md"]
+        print("✓ Documents merged by rank, not raw score")
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Multi-Document Knowledge Base (offline)")
+    print("=" * 50)
+    test_documents_and_hot_reload()
+    test_documents_merged_by_rank()
+    print("=" * 50)
+    print("✅ Knowledge library tests PASSED")
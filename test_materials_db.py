@@ -0,0 +1,239 @@
+"""
+Offline test for the Appendix B materials property tables
+"""
+import os
+import tempfile
+
+from knowledge_base import TextbookKnowledgeBase
+from materials_db import (
+    MaterialsDatabase, extract_appendix_tables, material_names, parse_property_query, parse_value
+)
+
+# OCR'd layout: the first name lands before the category, US values
+# follow SI values, conditions are bulleted and pages repeat the header
+APPENDIX = """Table B.4 Typical Room-Temperature Yield Strength, Tensile Strength, and Ductility
+
+Yield
+Strength
+Material
+Steel alloy 1020
+METALS AND METAL ALLOYS
+Plain Carbon and Low-Alloy Steels
+• Hot rolled
+210 (30) (min)
+380 (55) (min)
+25 (min)
+• Cold drawn
+350 (51) (min)
+420 (61) (min)
+15 (min)
+Steel alloy 4340
+• Oil-quenched and tempered
+(@ 315°C)
+1620 (235)
+1760 (255)
+12
+Table B.4 (Continued)
+Yield
+Strength
+Material
+Gold (commercially pure) a
+• Annealed
+nil
+130 (19)
+45
+POLYMERS
+Nylon 6,6
+• Dry, as molded
+55.1-82.8 (8-12)
+94.5 (13.7)
+15-80
+Sources: ASM Handbooks.
+
+Table B.9 Room-Temperature Electrical Resistivity Values
+
+Electrical Resistivity, fl-m
+Material
+Steel alloy 1020
+METALS AND METAL ALLOYS
+1.60 X 10“ 7
+Gold (commercially pure)
+2.35 X 10 -8
+POLYMERS
+Nylon 6,6
+10 12 -10 13
+Sources: ASM Handbooks.
+"""
+
+# Real Appendix B rows as OCR'd: the SI value glued onto some names, the
+# US-customary value on its own line, "Cl" for C1 and split headings
+GLUED = """Table B.l Room-Temperature Density Values for Various Engineering Materials
+
+Density
+Material
+(g/cm3)
+(lbm/in.3)
+Alloy 356.0
+METALS AND METAL ALLOYS
+Aluminum Alloys
+2.69
+0.0971
+Copper Alloys
+Cl1000 (electrolytic tough pitch) 8.89
+0.321
+Titanium Alloys
+Commercially pure (ASTM grade 1) 4.51
+0.163
+Refrac tory Metals
+Molybdenum (commercially pure) 10.22
+0.369
+Miscellaneous Nonferrous Alloys
+Nickel 200 8.89
+0.321
+CERAMICS AND SEMICONDUCTING MATERIALS
+Concrete
+2.4
+0.087
+Sources: ASM Handbooks.
+
+Table B.8 Room-Temperature Specific Heat Values for Various Engineering Materials
+
+Specific Heat
+Material
+(J/kg-K)
+(10-2 Btu/lbm-°F)
+Alloy 356.0
+METALS AND METAL ALLOYS
+963 b
+23.0 b
+Copper Alloys
+Cl 1000 (electrolytic tough pitch) 385
+9.2
+Titanium Alloys
+Commercially pure (ASTM grade 1) 528*
+12 .6*
+CERAMICS AND SEMICONDUCTING MATERIALS
+Concrete 6
+850-1150
+20.3-27.5
+VO
+1
+10- 6
+Sources: ASM Handbooks.
+"""
+
+
+def test_parse_value():
+    """Printed values, ranges and OCR'd powers of ten parse."""
+    assert parse_value("220-250 (32-36)") == (220, 250)
+    assert parse_value("486*") == (486, 486)
+    assert parse_value("— ") == (None, None)
+    assert parse_value(">10 13") == (1e13, None)
+    low, high = parse_value("1.60 X 10“ 7")
+    assert abs(low - 1.6e-7) < 1e-12 and low == high
+    assert parse_value("Steel alloy 1020") is None
+    print("✓ Table values parsed")
+
+
+def test_extract_and_query():
+    """Extracted rows load into indexed lookups and range queries."""
+    rows = list(extract_appendix_tables(APPENDIX))
+    db = MaterialsDatabase(path=None)
+    db.load(rows)
+
+    steel = db.lookup("steel alloy 1020")
+    assert steel["category"] == "metals"
+    hot_rolled = {row["property"]: row["low"] for row in steel["properties"] if row["condition"] == "Hot rolled"}
+    assert hot_rolled == {"yield_strength": 210, "tensile_strength": 380, "elongation": 25}
+    assert db.lookup("gold")["material"] == "Gold (commercially pure)"
+    assert not any(row["property"] == "yield_strength" for row in db.lookup("gold")["properties"])
+    assert db.lookup("unobtainium") is None
+    print("✓ Materials looked up by name")
+
+    strong = db.query("yield strength", minimum=500)
+    assert [row["material"] for row in strong] == ["Steel alloy 4340"]
+    assert strong[0]["condition"] == "Oil-quenched and tempered (@ 315°C)"
+    assert [row["material"] for row in db.query("yield_strength", maximum=100, category="polymers")] == ["Nylon 6,6"]
+    assert len(db.query("electrical_resistivity", minimum=1)) == 1
+    print("✓ Range queries answered")
+
+
+def test_glued_values():
+    """SI values glued onto names land in the SI column, not the name."""
+    db = MaterialsDatabase(path=None)
+    db.load(extract_appendix_tables(GLUED))
+    density = {row["material"]: row["low"] for row in db.query("density")}
+    assert density == {"Molybdenum (commercially pure)": 10.22, "Nickel 200": 8.89,
+                       "C11000 (electrolytic tough pitch)": 8.89, "Commercially pure (ASTM grade 1)": 4.51,
+                       "Alloy 356.0": 2.69, "Concrete": 2.4}
+    heat = {row["material"]: row["low"] for row in db.query("specific heat")}
+    assert heat == {"Concrete": 850, "Alloy 356.0": 963, "Commercially pure (ASTM grade 1)": 528,
+                    "C11000 (electrolytic tough pitch)": 385}
+    assert db.query("density", maximum=1.0, category="metals") == []
+    assert db.lookup("1%0") is None         # "%" is a literal, not a LIKE wildcard
+    print("✓ Glued values, OCR'd headings and stray footnotes handled")
+
+
+def test_data_file():
+    """The committed table file holds the printed Appendix B values."""
+    db = MaterialsDatabase()
+    def value(material, prop):
+        return [row["low"] for row in db.lookup(material)["properties"] if row["property"] == prop]
+    assert value("Commercially pure (ASTM grade 1)", "density") == [4.51]
+    assert value("Commercially pure (ASTM grade 1)", "elastic_modulus") == [103]
+    assert value("Nickel 200", "density") == [8.89]
+    assert value("C11000 (electrolytic tough pitch)", "thermal_conductivity") == [388]
+    assert value("C11000 (electrolytic tough pitch)", "specific_heat") == [385]
+    assert db.lookup("C11000 (electrolytic tough pitch)")["category"] == "metals"
+    assert db.query("specific heat", maximum=50, category="metals") == []
+    names = {row["material"] for row in db.query("density", limit=1000)}
+    assert not {"Refrac tory Metals", "Longitudinal", "Concrete 6", "VO"} & names
+    assert all(row["high"] is None or row["low"] <= row["high"]
+               for prop in db.stats() for row in db.query(prop, limit=1000))
+    print("✓ Data file matches the printed tables")
+
+
+def test_partial_names():
+    """A partial name finds the material it names, never one that merely contains it."""
+    db = MaterialsDatabase()
+    assert material_names("Aramid (Kevlar 49)") >= {"aramid", "kevlar 49", "kevlar"}
+    assert "copper" not in material_names("C17200 (beryllium-copper)")
+    assert db.lookup("gold")["material"] == "Gold (commercially pure)"
+    assert db.lookup("cartridge brass")["material"] == "C26000 (cartridge brass)"
+    assert db.lookup("kevlar")["material"] == "Aramid (Kevlar 49)"
+    assert "Glass-ceramic (Pyroceram)" not in db.lookup("glass")["matches"]
+    for material in ("copper", "lead", "aluminum"):
+        assert db.lookup(material) is None, material
+    print("✓ Partial names match only the material they name")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "textbook.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("Pure copper is soft and ductile.\nIts density is 8.9 g/cm3.\n")
+        properties = TextbookKnowledgeBase(path).get_material_properties("copper")
+        assert "Pure copper" in properties and "beryllium" not in properties
+    print("✓ Untabulated materials fall back to the textbook")
+
+
+def test_parse_property_query():
+    """Natural-language range questions become query arguments."""
+    assert parse_property_query("metals with yield strength > 500 MPa") == {
+        "property": "yield_strength", "minimum": 500.0, "maximum": None, "category": "metals"}
+    assert parse_property_query("polymers with a density below 1.0")["maximum"] == 1.0
+    assert parse_property_query("thermal conductivity between 10 and 50")["minimum"] == 10.0
+    assert parse_property_query("steel alloy 4340") is None
+    print("✓ Range questions parsed")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Materials Property Tables (offline)")
+    print("=" * 50)
+    test_parse_value()
+    test_extract_and_query()
+    test_glued_values()
+    test_data_file()
+    test_partial_names()
+    test_parse_property_query()
+    print("=" * 50)
+    print("✅ Materials database tests PASSED")
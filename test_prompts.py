@@ -0,0 +1,100 @@
+"""
+Offline test for prompt templates and prompt assembly
+"""
+from types import SimpleNamespace
+
+from ai_assistant import CONTEXT_CACHE_MIN_TOKENS, AIAssistant
+from prompts import SYSTEM_PROMPT, PromptTemplate
+from retrieval import estimate_tokens
+from session_store import Session
+
+
+def test_template():
+    """Templates are split once and filled in by slot name."""
+    template = PromptTemplate("Q: {question}\nA ({style}): {question}?")
+    assert template.slots == ["question", "style", "question"]
+    assert template.render(question="why", style="short") == "Q: why\nA (short): why?"
+    try:
+        template.render(question="why")
+        assert False, "missing slot accepted"
+    except KeyError:
+        pass
+    print("✓ Templates rendered")
+
+
+def test_prompt_assembly():
+    """The per-request prompt leaves the system prompt to the system instruction."""
+    session = Session()
+    for i in range(5):
+        session.add_exchange(f"Question {i}?", f"<b>Answer {i}.</b>")
+    prompt = AIAssistant().build_prompt("What is FCC?", session, context="FCC is face-centered cubic.")
+    assert SYSTEM_PROMPT not in prompt
+    assert prompt.startswith("=== AVAILABLE CONTEXT ===\nFCC is face-centered cubic.\n\n")
+    assert "=== Earlier in the Conversation ===\nUser asked: Question 0?" in prompt
+    assert "Assistant: Answer 4.\n\n=== Current Question ===\nUser: What is FCC?" in prompt
+    assert prompt.endswith("Provide a complete, helpful answer:")
+
+    bare = AIAssistant().build_prompt("What is FCC?", None, context="")
+    assert bare == "=== Current Question ===\nUser: What is FCC?\n\nProvide a complete, helpful answer:"
+    print("✓ Prompts assembled from sections")
+
+
+class FakeGemini:
+    """Stand-in for the Gemini client: records created caches and the configs it is sent."""
+
+    def __init__(self):
+        self.created = []
+        self.configs = []
+        self.lost = set()
+        self.caches = SimpleNamespace(create=self.create_cache)
+        self.models = SimpleNamespace(generate_content=self.generate_content)
+
+    def create_cache(self, model, config):
+        self.created.append(config)
+        return SimpleNamespace(name=f"cachedContents/{len(self.created)}")
+
+    def generate_content(self, model, contents, config):
+        self.configs.append(config)
+        if config.cached_content in self.lost:
+            raise RuntimeError("cached content not found")
+        return SimpleNamespace(usage_metadata=SimpleNamespace(
+            prompt_token_count=2700, cached_content_token_count=2600))
+
+
+def test_context_cache():
+    """With context caching on, the system prompt is cached once and referenced by every request."""
+    assistant = AIAssistant()
+    assistant.client, assistant.model = FakeGemini(), "gemini-test"
+    assistant.context_cache_enabled = True
+
+    assistant._generate("What is FCC?")
+    assistant._generate("What is BCC?")
+    client = assistant.client
+    assert len(client.created) == 1
+    system_prompt = client.created[0].system_instruction
+    assert system_prompt.startswith(SYSTEM_PROMPT) and "3.4 METALLIC CRYSTAL STRUCTURES" in system_prompt
+    assert estimate_tokens(system_prompt) >= CONTEXT_CACHE_MIN_TOKENS
+    assert [config.cached_content for config in client.configs] == ["cachedContents/1"] * 2
+    assert all(config.system_instruction is None for config in client.configs)
+    assert assistant.usage_stats()["context_cache"] == "cachedContents/1"
+    assert assistant.usage_stats()["cached_tokens"] == 5200
+    print("✓ System prompt cached once and reused")
+
+    assistant._cache_renew_at = 0
+    assistant._generate("What is HCP?")
+    assert len(client.created) == 2 and client.configs[-1].cached_content == "cachedContents/2"
+    client.lost.add("cachedContents/2")
+    assistant._generate("What is a vacancy?")
+    assert len(client.created) == 3 and client.configs[-1].cached_content == "cachedContents/3"
+    print("✓ Expired or lost caches are recreated")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Prompt Templates (offline)")
+    print("=" * 50)
+    test_template()
+    test_prompt_assembly()
+    test_context_cache()
+    print("=" * 50)
+    print("✅ Prompt tests PASSED")
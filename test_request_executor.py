@@ -0,0 +1,126 @@
+"""
+Offline test for request-scoped step execution
+"""
+import asyncio
+import threading
+import time
+
+from request_executor import RequestExecutor, StepPool, current_request, request_scope
+
+
+def test_parallel_and_deduplicated():
+    """Independent steps overlap; an identical step runs once per request."""
+    calls = []
+
+    def search(query):
+        calls.append(query)
+        time.sleep(0.2)
+        return f"results for {query}"
+
+    with request_scope(deadline=5) as executor:
+        started = time.monotonic()
+        first = executor.submit("retrieval", search, "steel")
+        second = executor.submit("lookup", search, "iron")
+        assert executor.wait(first) == "results for steel"
+        assert executor.wait(second) == "results for iron"
+        assert time.monotonic() - started < 0.35, "steps ran one after another"
+        assert current_request().run("retrieval", search, "steel") == "results for steel"
+    assert calls.count("steel") == 1
+    steps = [(timing["step"], timing["status"]) for timing in executor.timings()]
+    assert ("retrieval", "reused") in steps and steps[-1] == ("total", "ok")
+    print("✓ Steps run in parallel and identical ones are shared")
+
+
+def test_deadline():
+    """Waiting stops at the deadline; outside a scope steps simply run inline."""
+    with request_scope(deadline=0.1) as executor:
+        slow = executor.submit("gemini", time.sleep, 1)
+        started = time.monotonic()
+        assert executor.wait(slow, default="fallback", name="gemini") == "fallback"
+        assert time.monotonic() - started < 0.5
+    assert {"step": "gemini", "status": "timeout"}.items() <= executor.timings()[0].items()
+
+    inline = current_request()
+    assert isinstance(inline, RequestExecutor) and inline.remaining() is None
+    assert inline.submit("sum", sum, (1, 2)).done()
+    print("✓ Deadline bounds every wait")
+
+
+def test_skipped_steps():
+    """Steps nobody will wait for are skipped; detached ones still run."""
+    calls = []
+    with request_scope(deadline=0.05) as executor:
+        time.sleep(0.1)
+        late = executor.submit("gemini", calls.append, "late")
+        assert executor.wait(late, default="fallback") == "fallback"
+        detached = executor.submit_detached("explanation", calls.append, "detached")
+        assert detached.result(timeout=1) is None
+    assert calls == ["detached"]
+    assert ("gemini", "skipped") in [(timing["step"], timing["status"]) for timing in executor.timings()]
+
+    # A step left for a request that never waits for it never runs
+    pool = StepPool(max_workers=1)
+    executor = RequestExecutor(deadline=5, pool=pool)
+    busy = executor.submit("busy", time.sleep, 0.2)
+    unwaited = executor.submit("unwaited", calls.append, "unwaited")
+    executor.finished = True
+    busy.result(timeout=1)
+    pool.shutdown(wait=True)
+    assert not unwaited.done() and calls == ["detached"]
+    print("✓ Steps past the deadline or the request are skipped")
+
+
+def test_busy_pool_starves_no_request():
+    """With every worker held by a slow request, other requests run their own steps."""
+    pool = StepPool(max_workers=2)
+    slow = RequestExecutor(deadline=5, pool=pool)
+    held = [slow.submit(f"gemini-{n}", time.sleep, 1) for n in range(2)]
+    durations = []
+
+    def request(n):
+        executor = RequestExecutor(deadline=0.5, pool=pool)
+        started = time.monotonic()
+        lookup = executor.submit("compound_lookup", lambda: f"compound {n}")
+        assert executor.wait(lookup, default="timed out") == f"compound {n}"
+        durations.append(time.monotonic() - started)
+
+    threads = [threading.Thread(target=request, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(durations) == 8 and max(durations) < 0.2, durations
+    assert all(not step.done() for step in held), "the slow request was supposed to hold the pool"
+    pool.shutdown(wait=True)
+    print("✓ A slow request cannot starve the others")
+
+
+def test_run_async():
+    """Async steps are timed and bounded by the deadline."""
+    async def answer(delay):
+        await asyncio.sleep(delay)
+        return "answer"
+
+    async def scenario():
+        executor = RequestExecutor(deadline=0.1)
+        assert await executor.run_async("retrieval", answer(0)) == "answer"
+        assert await executor.run_async("gemini", answer(1), default="fallback") == "fallback"
+        assert await executor.run_async("explanation", answer(0)) is None
+        return [(timing["step"], timing["status"]) for timing in executor.timings()]
+
+    steps = asyncio.run(scenario())
+    assert steps[:3] == [("retrieval", "ok"), ("gemini", "timeout"), ("explanation", "skipped")]
+    print("✓ Async steps respect the deadline")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Request Executor (offline)")
+    print("=" * 50)
+    test_parallel_and_deduplicated()
+    test_deadline()
+    test_skipped_steps()
+    test_busy_pool_starves_no_request()
+    test_run_async()
+    print("=" * 50)
+    print("✅ Request executor tests PASSED")
@@ -0,0 +1,109 @@
+"""
+Offline test for the AI response cache
+"""
+import os
+import tempfile
+import time
+
+from response_cache import ResponseCache, response_key
+from semantic_cache import SemanticCache, same_question
+
+
+def test_key_normalization():
+    """Rephrasings that only differ in case, spacing or final punctuation share a key."""
+    assert response_key("What is FCC?", "ctx") == response_key("  what  is fcc ", "ctx")
+    assert response_key("what is fcc", "ctx") != response_key("what is bcc", "ctx")
+    assert response_key("what is fcc", "ctx") != response_key("what is fcc", "other ctx")
+    history = [{"role": "user", "content": "tell me about metals"}]
+    assert response_key("what is fcc", "ctx", history) != response_key("what is fcc", "ctx")
+    print("✓ Keys cover question, context and history")
+
+
+def test_memory_and_disk_tiers():
+    """Answers survive a restart when a SQLite path is configured."""
+    path = os.path.join(tempfile.mkdtemp(), "responses.sqlite3")
+    key = response_key("explain annealing")
+
+    cache = ResponseCache(path=path)
+    assert cache.get(key) is None
+    cache.put(key, "Annealing is a heat treatment...")
+    assert cache.get(key) == "Annealing is a heat treatment..."
+    print("✓ Answers served from memory")
+
+    restarted = ResponseCache(path=path)
+    assert restarted.get(key) == "Annealing is a heat treatment..."
+    assert restarted.stats()["disk_hits"] == 1
+    print("✓ Answers survive a restart through SQLite")
+
+
+def test_ttl_expiry():
+    """Expired answers are not returned from either tier."""
+    path = os.path.join(tempfile.mkdtemp(), "responses.sqlite3")
+    key = response_key("what is creep")
+    cache = ResponseCache(path=path, ttl=0.2)
+    cache.put(key, "Creep is...")
+    time.sleep(0.3)
+    assert cache.get(key) is None
+    assert cache.purge_expired() == 1
+    print("✓ Expired answers are dropped")
+
+
+def test_semantic_paraphrases():
+    """Paraphrases of an answered question hit; different questions miss."""
+    cache = SemanticCache(maxsize=2)
+    cache.add("What's BCC?", "BCC answer")
+    assert cache.lookup("explain body-centered cubic") == "BCC answer"
+    assert cache.lookup("explain face-centered cubic") is None
+    print("✓ Paraphrases served from the semantic cache")
+
+    cache.add("what is annealing", "annealing answer")
+    assert cache.lookup("bcc?") == "BCC answer"
+    cache.add("what is creep", "creep answer")
+    assert cache.lookup("explain annealing") is None  # least recently used, evicted
+    assert cache.lookup("what is BCC") == "BCC answer"
+    stats = cache.stats()
+    assert stats["lookups"] == 5 and stats["hits"] == 3
+    print("✓ Least recently used answers are evicted")
+
+
+def test_semantic_numbers_and_roles():
+    """Questions differing only in a number or in the order of their sides miss."""
+    cache = SemanticCache()
+    cache.add("How many grams are in 2 moles of water?", "36 g")
+    cache.add("Is aluminum stronger than steel?", "No")
+    cache.add("What is the pH of a 0.01 M HCl solution?", "2")
+    assert cache.lookup("how many grams are in 2 moles of water") == "36 g"
+    assert cache.lookup("How many grams are in 3 moles of water?") is None
+    assert cache.lookup("How many grams are in 2.5 moles of water?") is None
+    assert cache.lookup("Is steel stronger than aluminum?") is None
+    assert cache.lookup("is aluminum stronger than steel") == "No"
+    assert cache.lookup("What is the pH of a 0.1 M HCl solution?") is None
+    assert cache.lookup("What is the pH of a 0.010 M HCl solution?") == "2"
+    assert cache.stats()["hits"] == 3
+    print("✓ Different numbers and reversed comparisons are not served")
+
+    rejected = cache.stats()["rejected"]
+    cache.add("How do I convert grams to moles?", "Divide by the molar mass")
+    cache.add("Convert Celsius into Kelvin", "Add 273.15")
+    assert cache.lookup("how do I convert grams to moles") == "Divide by the molar mass"
+    assert cache.lookup("How do I convert moles to grams?") is None
+    assert cache.lookup("Convert Kelvin into Celsius") is None
+    assert cache.lookup("How do I go from moles to grams?") is None
+    assert cache.lookup("convert celsius into kelvin") == "Add 273.15"
+    assert cache.stats()["rejected"] > rejected, "reversed conversion was never close enough to test"
+    assert not same_question("Convert Celsius into Kelvin", "Convert Kelvin into Celsius")
+    assert same_question("What's the conversion of grams to moles?", "how do I convert grams to moles")
+    print("✓ Reversed conversions are not served")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Response Cache (offline)")
+    print("=" * 50)
+    test_key_normalization()
+    test_memory_and_disk_tiers()
+    test_ttl_expiry()
+    test_semantic_paraphrases()
+    test_semantic_numbers_and_roles()
+    print("=" * 50)
+    print("✅ Response cache tests PASSED")
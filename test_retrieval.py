@@ -0,0 +1,42 @@
+"""
+Offline test for hybrid retrieval: rank fusion and context packing
+"""
+from retrieval import estimate_tokens, pack_passages, reciprocal_rank_fusion
+
+ANNEALING = "Annealing is a heat treatment in which a material is held at elevated temperature and slowly cooled."
+QUENCHING = "Quenching cools steel rapidly in water or oil to form martensite."
+CREEP = "Creep is the slow permanent deformation of materials under constant stress at high temperature."
+
+
+def test_rank_fusion():
+    """Results found by both searches rank first; overlapping passages merge."""
+    fused = reciprocal_rank_fusion({
+        'bm25': [{'context': QUENCHING}, {'context': ANNEALING}],
+        'vector': [{'context': ANNEALING + " Ordinarily it relieves stresses."}, {'context': CREEP}],
+    })
+    assert [r['context'] for r in fused] == [ANNEALING, QUENCHING, CREEP]
+    assert fused[0]['sources'] == ['bm25', 'vector']
+    assert fused[0]['score'] > fused[1]['score'] > fused[2]['score']
+    print("✓ Rank fusion merges near-duplicates and rewards agreement")
+
+
+def test_token_budget():
+    """Passages are packed in order and the overflow is cut at a break."""
+    passages = [{'context': ANNEALING}, {'context': "\n".join([QUENCHING, CREEP] * 5)}]
+    budget = estimate_tokens(ANNEALING) + 50
+    packed = pack_passages(passages, budget)
+    assert packed[0] == ANNEALING
+    assert sum(estimate_tokens(text) for text in packed) <= budget
+    assert packed[1].endswith(("martensite.", "temperature."))
+    assert pack_passages(passages, 10) == []
+    print("✓ Context stays within the token budget")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Hybrid Retrieval (offline)")
+    print("=" * 50)
+    test_rank_fusion()
+    test_token_budget()
+    print("=" * 50)
+    print("✅ Retrieval tests PASSED")
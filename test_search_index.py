@@ -0,0 +1,104 @@
+"""
+Offline test for BM25 ranking and the persisted search index
+"""
+import os
+import tempfile
+
+from search_index import BM25Index, index_path_for, load_or_build_index, source_checksum
+
+CORPUS = "\n".join([
+    "Annealing holds a metal at high temperature and cools it slowly.",
+    "Quenching cools steel rapidly to form martensite.",
+    "Tempering reheats martensite to trade hardness for toughness.",
+    "Brass is an alloy of copper and zinc.",
+])
+
+
+def test_save_load_roundtrip():
+    """A saved index loads back with the same passages, terms and rankings."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.idx")
+        built = BM25Index.build(CORPUS.split("\n"), passage_chars=40, checksum=source_checksum(CORPUS))
+        built.save(path)
+        loaded = BM25Index.load(path)
+
+        assert len(loaded) == len(built) == 4
+        assert loaded.terms == built.terms and loaded.checksum == built.checksum
+        assert [loaded.passage_text(i) for i in range(len(loaded))] == CORPUS.split("\n")
+        for query in ("martensite", "copper zinc alloy", "cools"):
+            assert loaded.search(query) == built.search(query), query
+        assert loaded.search("martensite")[0]["line_number"] == 2
+        print("✓ Index survives a save/load roundtrip")
+
+
+def test_stale_and_corrupt_files_rebuilt():
+    """A changed source or a damaged .idx file makes load_or_build_index rebuild."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "corpus.txt")
+        path = index_path_for(source)
+        assert path == os.path.join(tmp, "corpus.idx")
+
+        first = load_or_build_index(source, CORPUS)
+        assert os.path.exists(path) and BM25Index.load(path).checksum == first.checksum
+        assert load_or_build_index(source, "") is None
+
+        changed = CORPUS + "\nBronze is an alloy of copper and tin."
+        rebuilt = load_or_build_index(source, changed)
+        assert rebuilt.checksum == source_checksum(changed) != first.checksum
+        assert rebuilt.search("bronze tin")
+        assert BM25Index.load(path).checksum == rebuilt.checksum
+        print("✓ Changed source forces a rebuild")
+
+        with open(path, "rb") as f:
+            data = f.read()
+        for damaged in (b"", b"not an index", b"XXXXXXXX" + data[8:], data[:len(data) // 2]):
+            with open(path, "wb") as f:
+                f.write(damaged)
+            try:
+                BM25Index.load(path)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{len(damaged)}-byte damaged index was accepted")
+            index = load_or_build_index(source, changed)
+            assert index.checksum == source_checksum(changed) and index.search("bronze")
+            assert BM25Index.load(path).checksum == index.checksum
+        print("✓ Corrupt or truncated index files are rejected and rebuilt")
+
+
+def test_bm25_ranking():
+    """Rare terms outweigh common ones and long passages are length-normalized."""
+    lines = [
+        "steel grain",
+        "steel martensite",
+        "steel ferrite",
+        "steel pearlite",
+        "martensite",
+        "brass",
+        "brass " + "copper zinc tin lead nickel iron cobalt manganese chromium " * 3,
+        "steel",
+    ]
+    index = BM25Index.build(lines, passage_chars=1)
+    assert len(index) == len(lines)
+
+    ranked = [hit["line_number"] for hit in index.search("steel martensite", top_k=len(lines))]
+    assert ranked[0] == 2, "both terms beat either one"
+    assert ranked.index(5) < min(ranked.index(n) for n in (1, 3, 4, 8)), "rare martensite beats common steel"
+
+    ranked = [hit["line_number"] for hit in index.search("brass")]
+    assert ranked == [6, 7], "same term frequency: the shorter passage wins"
+    scores = [hit["score"] for hit in index.search("brass")]
+    assert scores[0] > scores[1] > 0
+    assert index.search("titanium") == [] and index.search("brass", top_k=0) == []
+    print("✓ BM25 ranks rare terms first and normalizes for length")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Search Index (offline)")
+    print("=" * 50)
+    test_save_load_roundtrip()
+    test_stale_and_corrupt_files_rebuilt()
+    test_bm25_ranking()
+    print("=" * 50)
+    print("✅ Search index tests PASSED")
@@ -0,0 +1,53 @@
+"""
+Offline test for server-side chat sessions
+"""
+from session_store import (MAX_MESSAGE_CHARS, RECENT_MESSAGES, SUMMARY_CHARS, Session, SessionStore,
+                           clean_message)
+
+
+def test_compaction():
+    """Messages are cleaned once; older turns fold into a bounded summary."""
+    assert clean_message("🔬 <b>Iron</b> (Fe)<br>Density: 7.87 g/cm&sup3;") == "🔬 Iron (Fe) Density: 7.87 g/cm³"
+    assert len(clean_message("x" * 5000)) == MAX_MESSAGE_CHARS
+
+    session = Session("abcdefgh")
+    for i in range(50):
+        session.add_exchange(f"Question {i} about metals?", f"<p>Answer {i}. More detail here.</p>" * 40)
+    messages = session.messages()
+    assert messages[0]["role"] == "summary"
+    assert len(messages) == RECENT_MESSAGES + 1
+    assert len(messages[0]["content"]) <= SUMMARY_CHARS
+    assert "Assistant answered: Answer 46." in messages[0]["content"]
+    assert messages[-1] == {"role": "assistant", "content": clean_message("<p>Answer 49. More detail here.</p>" * 40)}
+    assert session.messages() is messages, "transcript is reused until the next message"
+    print("✓ Transcript stays bounded however long the conversation")
+
+
+def test_history_and_store():
+    """Client-sent histories still work; the store evicts old sessions."""
+    history = [{"role": "user", "content": "What is water?"},
+               {"role": "assistant", "content": "<b>Water</b> is H2O."},
+               {"role": "user", "content": "Its boiling point?"}]
+    session = Session.from_history(history, "Its boiling point?")
+    assert [m["content"] for m in session.messages()] == ["What is water?", "Water is H2O."]
+    assert session.id is None
+    print("✓ Client-sent history turned into a throwaway session")
+
+    store = SessionStore(maxsize=2)
+    first = store.get(None)
+    assert first.id and store.get(first.id) is first
+    assert store.get("not a valid id!").id != "not a valid id!"
+    store.get(None)
+    assert store.get(first.id) is not first, "least recently used session evicted"
+    assert store.delete(first.id) and not store.delete(first.id)
+    print("✓ Sessions stored by id with eviction")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Chat Sessions (offline)")
+    print("=" * 50)
+    test_compaction()
+    test_history_and_store()
+    print("=" * 50)
+    print("✅ Session tests PASSED")
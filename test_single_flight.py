@@ -0,0 +1,143 @@
+"""
+Offline test for request coalescing (single flight)
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from compound_cache import CompoundCache
+from single_flight import SharedCallCancelled, SingleFlight
+
+
+def test_threads_share_one_call():
+    """Overlapping calls for one key make one upstream call; other keys are not shared."""
+    flights = SingleFlight()
+    upstream = []
+
+    def fetch(name):
+        upstream.append(name)
+        time.sleep(0.1)
+        return name.upper()
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(lambda i: flights.do("aspirin", fetch, "aspirin"), range(20)))
+    assert results == ["ASPIRIN"] * 20 and upstream == ["aspirin"]
+    assert flights.stats() == {"calls": 1, "shared": 19, "in_flight": 0}
+
+    # Finished calls are not remembered
+    assert flights.do("aspirin", fetch, "aspirin") == "ASPIRIN" and len(upstream) == 2
+    print("✓ Concurrent identical calls share one upstream call")
+
+
+def test_errors_are_shared():
+    """The shared call's exception is raised in every caller."""
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("key", fail)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=call) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+    assert errors == ["upstream down"] * 6 and flights.stats()["calls"] == 1
+    print("✓ Errors reach every caller")
+
+
+def test_async():
+    """Coroutines share a call too, and a cancelled leader does not cancel its followers."""
+    flights = SingleFlight()
+    upstream = []
+
+    async def fetch(name):
+        upstream.append(name)
+        await asyncio.sleep(0.1)
+        return name.upper()
+
+    async def main():
+        results = await asyncio.gather(*(flights.do_async("benzene", fetch, "benzene") for _ in range(50)))
+        assert results == ["BENZENE"] * 50 and upstream == ["benzene"]
+
+        leader = asyncio.ensure_future(flights.do_async("slow", fetch, "slow"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do_async("slow", fetch, "slow"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        try:
+            await follower
+            assert False, "expected SharedCallCancelled"
+        except SharedCallCancelled:
+            pass
+
+    asyncio.run(main())
+    assert flights.stats()["in_flight"] == 0
+    print("✓ Async calls coalesce")
+
+
+def test_cancelled_follower():
+    """A follower that goes away does not cancel the shared call for the others."""
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.1)
+        return "answer"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.do_async("key", fetch))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flights.do_async("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        followers[0].cancel()
+        assert await leader == "answer"
+        assert await asyncio.gather(*followers[1:]) == ["answer", "answer"]
+        assert followers[0].cancelled()
+
+    asyncio.run(main())
+    assert flights.stats() == {"calls": 1, "shared": 3, "in_flight": 0}
+    print("✓ Cancelled followers leave the shared call running")
+
+
+def test_compound_cache_coalesces():
+    """Concurrent misses for one compound trigger one PubChem fetch."""
+    cache = CompoundCache(path=None)
+    fetched = []
+
+    def fetch(name):
+        fetched.append(name)
+        time.sleep(0.1)
+        return {"name": name, "molecular_formula": "C9H8O4"}
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(lambda i: cache.get("Aspirin" if i % 2 else "aspirin", fetch), range(20)))
+    assert all(result["molecular_formula"] == "C9H8O4" for result in results)
+    assert len(fetched) == 1 and cache.stats()["coalesced"] >= 1
+    print("✓ Compound cache shares concurrent fetches")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Single Flight (offline)")
+    print("=" * 50)
+    test_threads_share_one_call()
+    test_errors_are_shared()
+    test_async()
+    test_cancelled_follower()
+    test_compound_cache_coalesces()
+    print("=" * 50)
+    print("✅ Single flight tests PASSED")
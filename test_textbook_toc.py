@@ -0,0 +1,94 @@
+"""
+Offline test for the textbook table of contents
+"""
+from textbook_toc import TableOfContents
+
+BOOK = """Contents
+1. Introduction 1
+1.1 Historical Perspective 2
+
+Learning Objectives
+
+1.1 HISTORICAL PERSPECTIVE
+
+Materials are probably more deep-seated in our culture than most of us realize.
+
+Figure 1.1 The four components of the discipline of
+materials science and engineering.
+
+More history here.
+
+1.2 MATERIALS SCIENCE AND
+ENGINEERING
+
+Structure relates to the arrangement of internal components.
+Figure 1.1 shows the components again.
+
+SUMMARY
+
+Materials science is a broad field.
+
+WHY STUDY Atomic Structure and Interatomic Bonding?
+
+Learning Objectives
+
+2.1 INTRODUCTION
+
+Atoms are made of protons, neutrons and electrons.
+
+Chapter 2 / Atomic Structure and Interatomic Bonding
+
+Table 2.1 The Number of Available Electron States
+
+Shell 1 2 3
+
+2.2 FUNDAMENTAL CONCEPTS
+
+Each atom consists of a very small nucleus.
+"""
+
+
+def test_structure():
+    """Chapters, wrapped section titles, captions and end matter are found."""
+    toc = TableOfContents.parse(BOOK)
+    assert toc.entries["1"].title == "Introduction"
+    assert toc.entries["2"].title == "Atomic Structure and Interatomic Bonding"
+    assert toc.entries["1.2"].title == "MATERIALS SCIENCE AND ENGINEERING"
+    assert toc.entries["figure-1.1"].parent == "1.1"
+    assert toc.entries["table-2.1"].parent == "2.1"
+    assert toc.entries["1-summary"].parent == "1"
+    assert [node["id"] for node in toc.tree()] == ["1", "2"]
+    assert toc.outline().splitlines()[:3] == [
+        "1 Introduction", "  1.1 HISTORICAL PERSPECTIVE", "  1.2 MATERIALS SCIENCE AND ENGINEERING"]
+    print("✓ Table of contents parsed")
+
+    # Sections run to the next heading; chapters start at their opener
+    assert toc.text(toc.entries["1.1"]).endswith("More history here.")
+    assert toc.text(toc.entries["2"]).startswith("WHY STUDY")
+    print("✓ Sections sliced whole")
+
+
+def test_resolve():
+    """Numbers, labels, title prefixes and misspellings resolve."""
+    toc = TableOfContents.parse(BOOK)
+    assert toc.resolve("1.2").id == "1.2"
+    assert toc.resolve("Section 2.2").id == "2.2"
+    assert toc.resolve("chapter 2").id == "2"
+    assert toc.resolve("Fig. 1.1").id == "figure-1.1"
+    assert toc.resolve("table 2.1").id == "table-2.1"
+    assert toc.resolve("historical").id == "1.1"
+    assert toc.resolve("science and engineering").id == "1.2"
+    assert toc.resolve("fundamentl concepts").id == "2.2"
+    assert toc.resolve("section 9.9") is None
+    assert toc.resolve("superconductivity") is None
+    print("✓ Sections resolved by number and title")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Textbook Table of Contents (offline)")
+    print("=" * 50)
+    test_structure()
+    test_resolve()
+    print("=" * 50)
+    print("✅ Table of contents tests PASSED")
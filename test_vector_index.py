@@ -0,0 +1,82 @@
+"""
+Offline test for chunking and the persisted vector index
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from search_index import source_checksum
+from vector_index import VectorIndex, chunk_text, load_or_build_vectors, vectors_path_for
+
+TEXT = "\n".join(f"Line {i:02d}: " + "x" * 40 for i in range(30))   # 50 characters per line
+
+# Four topics of about 900 characters each, so chunks mostly hold one topic
+CORPUS = "\n".join(line for sentence in (
+    "Annealing holds a metal at high temperature and then cools it slowly.",
+    "Quenching cools steel rapidly in water or oil to form hard martensite.",
+    "Brass is an alloy of copper and zinc used for fittings and instruments.",
+    "Creep is slow deformation of a material under constant stress at high temperature.",
+) for line in [sentence] * 12)
+
+
+def test_chunk_text():
+    """Chunks follow line boundaries, cover the text and overlap their neighbours."""
+    chunks = chunk_text(TEXT, chunk_chars=200, overlap_chars=110)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(TEXT)
+    for start, end, first_line in chunks:
+        assert start == 0 or TEXT[start - 1] == "\n", "chunk starts mid-line"
+        assert end == len(TEXT) or TEXT[end] == "\n", "chunk ends mid-line"
+        assert TEXT[start:].startswith(f"Line {first_line:02d}")
+        assert end - start >= 199 or end == len(TEXT)
+    for (start, end, _), (next_start, next_end, _) in zip(chunks, chunks[1:]):
+        assert start < next_start < end < next_end, "chunks must overlap and advance"
+        assert end - next_start == 99, "overlap is the whole lines that fit in overlap_chars"
+
+    assert chunk_text("one line") == [(0, 8, 0)]
+    # Lines longer than a chunk still advance one line at a time
+    long_lines = "a" * 300 + "\n" + "b" * 300
+    assert chunk_text(long_lines, chunk_chars=100, overlap_chars=50) == [(0, 300, 0), (301, 601, 1)]
+    print("✓ Chunks overlap along line boundaries")
+
+
+def test_vector_index_roundtrip():
+    """Built, saved and loaded indexes give the same search results."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "corpus.txt")
+        built = VectorIndex.build(CORPUS, checksum=source_checksum(CORPUS), dim=256)
+        assert len(built) > 4
+        assert "Brass" in built.search("copper zinc brass")[0]["text"]
+        assert all("Brass" not in hit["text"] for hit in built.search("annealing cools slowly", top_k=1))
+        assert built.search("") == [] and built.search("brass", top_k=0) == []
+
+        path = vectors_path_for(source)
+        built.save(path)
+        loaded = VectorIndex.load(path, CORPUS)
+        assert loaded.checksum == built.checksum and len(loaded) == len(built)
+        assert loaded.vectors.dtype == np.float32 and loaded.vectors.shape == (len(built), 256)
+        assert np.allclose(loaded.vectors, built.vectors, atol=1e-3)
+        for query in ("copper zinc brass", "martensite quenching", "slow deformation under stress"):
+            assert [hit["chunk_id"] for hit in loaded.search(query)] == \
+                [hit["chunk_id"] for hit in built.search(query)], query
+        print("✓ Vector index survives a save/load roundtrip")
+
+        changed = CORPUS + "\nBronze is an alloy of copper and tin."
+        rebuilt = load_or_build_vectors(source, changed)
+        assert rebuilt.checksum == source_checksum(changed)
+        assert VectorIndex.load(path, changed).checksum == rebuilt.checksum
+        with open(path, "wb") as f:
+            f.write(b"not a vector index")
+        assert load_or_build_vectors(source, changed).checksum == source_checksum(changed)
+        assert load_or_build_vectors(source, "") is None
+        print("✓ Stale or corrupt vector files are rebuilt")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Vector Index (offline)")
+    print("=" * 50)
+    test_chunk_text()
+    test_vector_index_roundtrip()
+    print("=" * 50)
+    print("✅ Vector index tests PASSED")
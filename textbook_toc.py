@@ -0,0 +1,381 @@
+"""
+Textbook Table of Contents Module
+Parses the textbook once into a tree of chapters, numbered sections, end-of-
+chapter matter, figures, tables and appendices with character offsets, and
+resolves section numbers and (partial or misspelled) titles to entries.
+"""
+
+import difflib
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+# "3.4 METALLIC CRYSTAL STRUCTURES" (body headings are upper case; the
+# printed contents pages use title case and are skipped)
+SECTION_PATTERN = re.compile(r"^(\d{1,2})\.(\d{1,2}) ([A-Z][A-Z0-9 ,'\-/&()]*?)\s*$")
+# Running page headers: "Chapter 3 / The Structure of Crystalline Solids"
+CHAPTER_HEADER_PATTERN = re.compile(r"^Chapter (\d{1,2}) / ([A-Z][^0-9*•]*?)\s*(?:[*•].*)?$")
+# Chapter openers: "WHY STUDY The Structure of Crystalline Solids?"
+CHAPTER_OPENER_PATTERN = re.compile(r"^(WHY STUDY|Learning Objectives\s*$)")
+# "Figure 3.4 caption..." / "Table B.1 title..." (captions start upper case,
+# which skips references like "Figure 3.4 shows")
+CAPTION_PATTERN = re.compile(r"^(Figure|Table) (\d{1,2}|[A-E])\.(\d{1,2}|l)[a-z]?(?:\s+([A-Z(].*?))?\s*$")
+CONTINUED_PATTERN = re.compile(r"^\(\s*Continued\s*\)")
+# Printed contents pages: "5. Diffusion 122"
+CONTENTS_CHAPTER_PATTERN = re.compile(r"^(\d{1,2})\. ([A-Z][A-Za-z ,&\-]+?)\s*\d*\s*$")
+APPENDIX_PATTERN = re.compile(r"^Appendix ([A-E])\b\s*/?\s*(.*?)\s*(?:[*•].*)?$")
+
+# End-of-chapter headings and the id suffix each one gets
+END_MATTER = {
+    'SUMMARY': 'summary',
+    'EQUATION SUMMARY': 'equations',
+    'IMPORTANT TERMS AND CONCEPTS': 'terms',
+    'REFERENCES': 'references',
+    'QUESTIONS AND PROBLEMS': 'problems',
+    'DESIGN PROBLEMS': 'design-problems',
+}
+
+BACK_MATTER = ('Glossary', 'Index')
+
+# Longest table excerpt returned, in characters; tables have no end marker
+MAX_TABLE_CHARS = 3000
+
+# Caption titles are cut to this many characters
+MAX_CAPTION_CHARS = 120
+
+# Entry kinds in the order titles are preferred when resolving names
+KIND_PRIORITY = ('section', 'chapter', 'appendix', 'end_matter', 'back_matter', 'table', 'figure')
+
+
+class TocEntry(NamedTuple):
+    """One node of the table of contents."""
+    id: str             # "3", "3.4", "3-summary", "figure-3.4", "table-B.1", "appendix-B"
+    kind: str           # chapter, section, end_matter, figure, table, appendix, back_matter
+    title: str
+    start: int          # Character offsets of the entry in the textbook
+    end: int
+    line: int           # 1-based line number of the heading
+    parent: Optional[str]
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'title': self.title,
+            'line_number': self.line,
+            'length': self.end - self.start,
+        }
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9.]+", " ", text.lower()).split())
+
+
+def _join_wrapped(lines: List[str]) -> str:
+    """Join lines of a wrapped paragraph, undoing end-of-line hyphenation."""
+    text = ""
+    for line in lines:
+        line = line.strip()
+        if text.endswith(('-', '¬')):
+            text = text.rstrip('¬') + line
+        else:
+            text = f"{text} {line}" if text else line
+    return text
+
+
+def _is_caps_line(text: str) -> bool:
+    letters = [c for c in text if c.isalpha()]
+    return len(letters) >= 3 and text.upper() == text and len(text) < 60
+
+
+class TableOfContents:
+    """Chapter/section tree over the textbook with a title index for lookups."""
+
+    def __init__(self, content: str, entries: List[TocEntry]):
+        self.content = content
+        self.entries: Dict[str, TocEntry] = {entry.id: entry for entry in entries}
+        self.children: Dict[Optional[str], List[str]] = {}
+        for entry in entries:
+            self.children.setdefault(entry.parent, []).append(entry.id)
+
+        # Sorted normalized titles for prefix lookups, best kinds first on ties
+        titled = [
+            (_normalize(entry.title), KIND_PRIORITY.index(entry.kind), entry.id)
+            for entry in entries if entry.title
+        ]
+        titled.sort()
+        self._titles = [title for title, _, _ in titled]
+        self._title_ids = [entry_id for _, _, entry_id in titled]
+
+    @classmethod
+    def parse(cls, content: str) -> "TableOfContents":
+        """Scan the textbook once and build the tree."""
+        lines = content.split('\n')
+        offsets = [0] * (len(lines) + 1)
+        for i, line in enumerate(lines):
+            offsets[i + 1] = offsets[i] + len(line) + 1
+        text_end = len(content)
+
+        # Headings as (line index, kind, id, title, parent)
+        headings = []
+        chapter_titles: Dict[int, Counter] = {}
+        contents_titles: Dict[int, str] = {}
+        openers = []
+        last_section = (0, 0)
+        seen_captions = set()
+        appendix_titles: Dict[str, Counter] = {}
+        appendix_starts: Dict[str, int] = {}
+        back_matter_starts: Dict[str, int] = {}
+
+        for i, raw in enumerate(lines):
+            line = raw.strip()
+            if not line:
+                continue
+
+            header = CHAPTER_HEADER_PATTERN.match(line)
+            if header:
+                chapter_titles.setdefault(int(header.group(1)), Counter())[header.group(2).strip()] += 1
+                continue
+            if CHAPTER_OPENER_PATTERN.match(line):
+                openers.append(i)
+            if last_section == (0, 0):
+                contents = CONTENTS_CHAPTER_PATTERN.match(line)
+                if contents:
+                    contents_titles.setdefault(int(contents.group(1)), contents.group(2))
+
+            if appendix_starts or (last_section[0] >= 22 and line.startswith('Appendix')):
+                appendix = APPENDIX_PATTERN.match(line)
+                if appendix:
+                    letter, title = appendix.groups()
+                    appendix_starts.setdefault(letter, i)
+                    if title:
+                        appendix_titles.setdefault(letter, Counter())[title] += 1
+                    continue
+                if line in BACK_MATTER and appendix_starts:
+                    back_matter_starts.setdefault(line, i)
+                    continue
+
+            section = SECTION_PATTERN.match(line)
+            if section and _is_caps_line(section.group(3)) and not appendix_starts:
+                number = (int(section.group(1)), int(section.group(2)))
+                current = last_section[0]
+                if number > last_section and (
+                        number[0] == current or (number[0] == current + 1 and number[1] <= 3)):
+                    title = section.group(3).strip()
+                    # Titles wrapped onto the next line
+                    for j in (i + 1, i + 2):
+                        following = lines[j].strip() if j < len(lines) else ''
+                        if following:
+                            if _is_caps_line(following) and not SECTION_PATTERN.match(following):
+                                title = f"{title} {following}"
+                            break
+                    headings.append((i, 'section', f"{number[0]}.{number[1]}", title, str(number[0])))
+                    last_section = number
+                continue
+
+            if line in END_MATTER and last_section != (0, 0) and not appendix_starts:
+                chapter = str(last_section[0])
+                entry_id = f"{chapter}-{END_MATTER[line]}"
+                if not any(h[2] == entry_id for h in headings):
+                    headings.append((i, 'end_matter', entry_id, line.title(), chapter))
+                continue
+
+            caption = CAPTION_PATTERN.match(line)
+            if caption and last_section != (0, 0):
+                kind, major, minor, title = caption.groups()
+                entry_id = f"{kind.lower()}-{major}.{1 if minor == 'l' else minor}"
+                if entry_id not in seen_captions and not CONTINUED_PATTERN.match(title or ''):
+                    # The caption paragraph, which may start on a later line
+                    j = i + 1
+                    if not title:
+                        while j < len(lines) and j < i + 4 and not lines[j].strip():
+                            j += 1
+                    paragraph = [title] if title else []
+                    while j < len(lines) and lines[j].strip() and len(paragraph) < 4:
+                        paragraph.append(lines[j])
+                        j += 1
+                    title = _join_wrapped(paragraph)[:MAX_CAPTION_CHARS]
+                    parent = major if major.isdigit() else f"appendix-{major}"
+                    seen_captions.add(entry_id)
+                    headings.append((i, kind.lower(), entry_id, title, parent))
+
+        return cls(content, cls._assemble(
+            lines, offsets, text_end, headings, chapter_titles, contents_titles, openers,
+            appendix_starts, appendix_titles, back_matter_starts,
+        ))
+
+    @staticmethod
+    def _assemble(lines, offsets, text_end, headings, chapter_titles, contents_titles, openers,
+                  appendix_starts, appendix_titles, back_matter_starts) -> List[TocEntry]:
+        """Turn heading positions into entries with start/end offsets."""
+        structural = sorted(
+            (h for h in headings if h[1] in ('section', 'end_matter')), key=lambda h: h[0]
+        )
+        tail_starts = sorted(list(appendix_starts.values()) + list(back_matter_starts.values()))
+        body_end = tail_starts[0] if tail_starts else len(lines)
+
+        # A chapter starts at its opener ("WHY STUDY ...", "Learning
+        # Objectives") when there is one right before its first section
+        chapter_first: Dict[int, int] = {}
+        for i, kind, entry_id, _, parent in structural:
+            if kind == 'section':
+                chapter_first.setdefault(int(parent), i)
+        chapter_starts: Dict[int, int] = {}
+        previous = 0
+        for chapter in sorted(chapter_first):
+            first = chapter_first[chapter]
+            candidates = [i for i in openers if max(previous, first - 300) < i < first]
+            chapter_starts[chapter] = candidates[0] if candidates else first
+            previous = max(h[0] for h in structural if int(h[4]) == chapter)
+
+        entries = []
+        chapters = sorted(chapter_starts)
+        for n, chapter in enumerate(chapters):
+            start = chapter_starts[chapter]
+            end = chapter_starts[chapters[n + 1]] if n + 1 < len(chapters) else body_end
+            titles = chapter_titles.get(chapter)
+            # Running page headers, else the printed contents
+            title = titles.most_common(1)[0][0] if titles else contents_titles.get(chapter, '')
+            entries.append(TocEntry(str(chapter), 'chapter', title, offsets[start],
+                                    offsets[end] - 1, start + 1, None))
+
+        boundaries = sorted({h[0] for h in structural} | set(chapter_starts.values()) | {body_end})
+        for i, kind, entry_id, title, parent in structural:
+            end = boundaries[bisect_left(boundaries, i + 1)]
+            entries.append(TocEntry(entry_id, kind, title, offsets[i], offsets[end] - 1, i + 1, parent))
+
+        tail = sorted(
+            [(i, f"appendix-{letter}", 'appendix', letter) for letter, i in appendix_starts.items()]
+            + [(i, name.lower(), 'back_matter', name) for name, i in back_matter_starts.items()]
+        )
+        for n, (i, entry_id, kind, name) in enumerate(tail):
+            end = tail[n + 1][0] if n + 1 < len(tail) else len(lines)
+            if kind == 'appendix':
+                titles = appendix_titles.get(name)
+                title = f"Appendix {name}: {titles.most_common(1)[0][0]}" if titles else f"Appendix {name}"
+            else:
+                title = name
+            entries.append(TocEntry(entry_id, kind, title, offsets[i], offsets[end] - 1, i + 1, None))
+
+        # Figures span their caption paragraph; tables run to the next heading.
+        # Both belong to the section they appear in, when it is in their chapter
+        all_starts = sorted({h[0] for h in headings} | set(chapter_starts.values()) | set(tail_starts))
+        structural_lines = [h[0] for h in structural]
+        for i, kind, entry_id, title, parent in headings:
+            position = bisect_left(structural_lines, i + 1) - 1
+            if position >= 0 and structural[position][4] == parent:
+                parent = structural[position][2]
+            if kind == 'figure':
+                j = i + 1
+                while j < len(lines) and not lines[j].strip():
+                    j += 1
+                while j < len(lines) and lines[j].strip():
+                    j += 1
+                end = offsets[j] - 1
+            elif kind == 'table':
+                position = bisect_left(all_starts, i + 1)
+                next_start = all_starts[position] if position < len(all_starts) else len(lines)
+                end = min(offsets[next_start] - 1, offsets[i] + MAX_TABLE_CHARS)
+            else:
+                continue
+            entries.append(TocEntry(entry_id, kind, title, offsets[i], max(end, offsets[i]), i + 1, parent))
+
+        # Document order; a chapter comes before a section starting at the same line
+        entries.sort(key=lambda entry: (entry.start, entry.kind != 'chapter'))
+        return [entry._replace(end=min(entry.end, text_end)) for entry in entries]
+
+    # ==================== LOOKUPS ====================
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def text(self, entry: TocEntry) -> str:
+        """The text of an entry, sliced from the textbook."""
+        return self.content[entry.start:entry.end].strip()
+
+    def tree(self, parent: Optional[str] = None, kinds=('chapter', 'section', 'end_matter',
+                                                          'appendix', 'back_matter')) -> List[dict]:
+        """Nested entries under parent (the whole book by default)."""
+        nodes = []
+        for entry_id in self.children.get(parent, []):
+            entry = self.entries[entry_id]
+            if entry.kind in kinds:
+                node = entry.to_dict()
+                children = self.tree(entry_id, kinds)
+                if children:
+                    node['children'] = children
+                nodes.append(node)
+        return nodes
+
+    def outline(self, kinds=('chapter', 'section', 'appendix')) -> str:
+        """The tree as indented text, one "id title" line per entry."""
+        lines = []
+
+        def walk(nodes, depth):
+            for node in nodes:
+                lines.append(f"{'  ' * depth}{node['id']} {node['title']}")
+                walk(node.get('children', []), depth + 1)
+        walk(self.tree(kinds=kinds), 0)
+        return "\n".join(lines)
+
+    def resolve(self, name: str) -> Optional[TocEntry]:
+        """
+        Find an entry by id, number or title.
+
+        Accepts ids ("3.4", "figure-3.4"), labelled numbers ("Section 3.4",
+        "chapter 3", "Fig. 3.4", "Table B.1", "Appendix B") and titles,
+        matched exactly, by prefix, by substring and finally fuzzily.
+
+        Returns:
+            The matching entry, or None
+        """
+        query = name.strip()
+        if not query:
+            return None
+        if query in self.entries:
+            return self.entries[query]
+
+        numbered = re.match(
+            r"(?i)^(chapter|ch\.?|section|sec\.?|§|figure|fig\.?|table|appendix)?\s*"
+            r"(\d{1,2}|[A-E])(?:\.(\d{1,2}))?[a-z]?\s*$", query
+        )
+        if numbered:
+            label, major, minor = numbered.groups()
+            label = (label or '').lower().rstrip('.')
+            major = major.upper() if major.isalpha() else major
+            if label in ('fig', 'figure'):
+                candidates = [f"figure-{major}.{minor}"]
+            elif label == 'table':
+                candidates = [f"table-{major}.{minor}"]
+            elif label == 'appendix' or (major.isalpha() and not minor):
+                candidates = [f"appendix-{major}"]
+            elif minor:
+                candidates = [f"{major}.{minor}"]
+            else:
+                candidates = [major]
+            for candidate in candidates:
+                if candidate in self.entries:
+                    return self.entries[candidate]
+            if major.isdigit() or label:
+                return None
+
+        key = _normalize(query)
+        if not key:
+            return None
+        # Exact title or title prefix
+        position = bisect_left(self._titles, key)
+        if position < len(self._titles) and self._titles[position].startswith(key):
+            return self.entries[self._title_ids[position]]
+        # Substring of a title, preferring headings over captions
+        matches = [
+            (KIND_PRIORITY.index(self.entries[entry_id].kind), len(title), entry_id)
+            for title, entry_id in zip(self._titles, self._title_ids) if key in title
+        ]
+        if matches:
+            return self.entries[min(matches)[2]]
+        # Misspellings
+        close = difflib.get_close_matches(key, self._titles, n=1, cutoff=0.75)
+        if close:
+            return self.entries[self._title_ids[self._titles.index(close[0])]]
+        return None
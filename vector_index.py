@@ -0,0 +1,239 @@
+"""
+Vector Index Module
+Dense retrieval over overlapping textbook chunks with hashed n-gram embeddings.
+
+The embedding matrix is precomputed and stored on disk next to the textbook,
+so a query is one embedding plus one matrix-vector product.
+"""
+
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from embeddings import HashingEmbedder
+from search_index import source_checksum
+
+# Chunk size and how much consecutive chunks overlap, in characters
+CHUNK_CHARS = 800
+OVERLAP_CHARS = 200
+
+# Dimensions of the stored passage embeddings
+VECTOR_DIM = 512
+
+# On-disk layout: magic, source checksum, number of chunks, dimensions
+VECTORS_MAGIC = b'CKBVEC01'
+VECTORS_HEADER = struct.Struct('<8s32s2Q')
+
+
+def chunk_text(content: str, chunk_chars: int = CHUNK_CHARS,
+               overlap_chars: int = OVERLAP_CHARS) -> List[Tuple[int, int, int]]:
+    """
+    Split text into overlapping chunks along line boundaries.
+
+    Args:
+        content: Source text
+        chunk_chars: Minimum number of characters per chunk
+        overlap_chars: Characters (whole lines) shared with the previous chunk
+
+    Returns:
+        (start offset, end offset, first line index) per chunk
+    """
+    line_starts = [0]
+    for i, char in enumerate(content):
+        if char == '\n':
+            line_starts.append(i + 1)
+    line_starts.append(len(content) + 1)
+    num_lines = len(line_starts) - 1
+
+    chunks = []
+    first = 0
+    while first < num_lines:
+        last = first
+        while last < num_lines - 1 and line_starts[last + 1] - line_starts[first] < chunk_chars:
+            last += 1
+        end = line_starts[last + 1] - 1
+        chunks.append((line_starts[first], end, first))
+        if last == num_lines - 1:
+            break
+        # Back up whole lines until the overlap is covered, always advancing
+        next_first = last + 1
+        while next_first - 1 > first and end - line_starts[next_first - 1] <= overlap_chars:
+            next_first -= 1
+        first = next_first
+    return chunks
+
+
+class VectorIndex:
+    """Top-k cosine search over precomputed chunk embeddings."""
+
+    def __init__(self, content: str, chunk_starts: np.ndarray, chunk_ends: np.ndarray,
+                 chunk_lines: np.ndarray, vectors: np.ndarray, checksum: bytes = b''):
+        self.content = content
+        self.chunk_starts = chunk_starts
+        self.chunk_ends = chunk_ends
+        self.chunk_lines = chunk_lines
+        self.checksum = checksum
+        # Stored as float16 to halve the file, but copied to float32 here:
+        # NumPy has no fast float16 matrix product (about 10x slower), so
+        # the memory saving is only on disk
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.embedder = HashingEmbedder(dim=self.vectors.shape[1])
+
+    @classmethod
+    def build(cls, content: str, checksum: bytes = b'', dim: int = VECTOR_DIM) -> "VectorIndex":
+        """Chunk and embed the whole text."""
+        chunks = chunk_text(content)
+        embedder = HashingEmbedder(dim=dim)
+        vectors = embedder.embed_many(content[start:end] for start, end, _ in chunks)
+        return cls(
+            content,
+            np.array([c[0] for c in chunks], dtype=np.uint32),
+            np.array([c[1] for c in chunks], dtype=np.uint32),
+            np.array([c[2] for c in chunks], dtype=np.uint32),
+            vectors,
+            checksum,
+        )
+
+    def save(self, path: str):
+        """Write the chunk table and the float16 embedding matrix to a binary file."""
+        sections = [
+            self.chunk_starts.astype('<u4').tobytes(),
+            self.chunk_ends.astype('<u4').tobytes(),
+            self.chunk_lines.astype('<u4').tobytes(),
+            self.vectors.astype('<f2').tobytes(),
+        ]
+        num_chunks, dim = self.vectors.shape
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(VECTORS_HEADER.pack(VECTORS_MAGIC, self.checksum, num_chunks, dim))
+            for section in sections:
+                f.write(section)
+                f.write(b'\0' * (-len(section) % 8))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, content: str) -> "VectorIndex":
+        """
+        Load an index written by save(); content is the text it was built from.
+
+        Raises:
+            ValueError: If the file is not a vector index
+        """
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(mm) < VECTORS_HEADER.size:
+            raise ValueError(f"{path} is not a vector index")
+        magic, checksum, num_chunks, dim = VECTORS_HEADER.unpack_from(mm)
+        if magic != VECTORS_MAGIC:
+            raise ValueError(f"{path} is not a vector index")
+
+        offset = VECTORS_HEADER.size
+
+        def take(dtype: str, count: int) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(mm, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes + (-array.nbytes % 8)
+            return array
+
+        chunk_starts = take('<u4', num_chunks)
+        chunk_ends = take('<u4', num_chunks)
+        chunk_lines = take('<u4', num_chunks)
+        vectors = take('<f2', num_chunks * dim).reshape(num_chunks, dim)
+        return cls(content, chunk_starts, chunk_ends, chunk_lines, vectors, checksum)
+
+    def __len__(self) -> int:
+        return len(self.chunk_starts)
+
+    def chunk_text(self, chunk_id: int) -> str:
+        """Return the text of one chunk."""
+        return self.content[int(self.chunk_starts[chunk_id]):int(self.chunk_ends[chunk_id])].strip()
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict]:
+        """
+        Rank chunks by cosine similarity to the query.
+
+        Args:
+            query: Free-text query
+            top_k: Maximum number of chunks to return
+
+        Returns:
+            List of dictionaries with chunk id, score, line number and text,
+            best match first
+        """
+        query_vector = self.embedder.embed(query)
+        if not len(self) or top_k <= 0 or not query_vector.any():
+            return []
+
+        scores = self.vectors @ query_vector
+        top_k = min(top_k, len(self))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        results = []
+        for chunk_id in ranked:
+            score = float(scores[chunk_id])
+            if score <= 0:
+                break
+            chunk_id = int(chunk_id)
+            results.append({
+                'chunk_id': chunk_id,
+                'score': round(score, 4),
+                'line_number': int(self.chunk_lines[chunk_id]) + 1,
+                'text': self.chunk_text(chunk_id),
+            })
+        return results
+
+
+def vectors_path_for(source_path: str) -> str:
+    """Location of the persisted vector index for a source file."""
+    return os.path.splitext(source_path)[0] + '.vec'
+
+
+def load_or_build_vectors(source_path: str, content: str) -> Optional[VectorIndex]:
+    """
+    Load the persisted vector index for a source file, rebuilding it when stale.
+
+    Works like search_index.load_or_build_index(): the file stores a checksum
+    of the text it was built from and is rebuilt (and written back when
+    possible) if it is missing, unreadable or out of date.
+
+    Returns:
+        The index, or None for empty text
+    """
+    if not content:
+        return None
+
+    checksum = source_checksum(content)
+    path = vectors_path_for(source_path)
+    if os.path.exists(path):
+        try:
+            index = VectorIndex.load(path, content)
+            if index.checksum == checksum:
+                return index
+            print(f"⚠️ Vector index {path} is stale, rebuilding")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load vector index {path}: {e}")
+
+    index = VectorIndex.build(content, checksum=checksum)
+    try:
+        index.save(path)
+    except OSError as e:
+        print(f"⚠️ Could not save vector index {path}: {e}")
+    return index
+
+
+if __name__ == "__main__":
+    # Build step: python vector_index.py [textbook.txt ...]
+    import sys
+
+    for source in sys.argv[1:] or ["materials-science-textbook.txt"]:
+        with open(source, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+        built = VectorIndex.build(text, checksum=source_checksum(text))
+        built.save(vectors_path_for(source))
+        print(f"✅ Embedded {source}: {len(built)} chunks x {built.vectors.shape[1]} dims "
+              f"-> {vectors_path_for(source)}")